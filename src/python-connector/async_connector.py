@@ -0,0 +1,352 @@
+"""
+Native asyncio variant of QualysAWSConnector.
+
+AsyncQualysAWSConnector talks to the same endpoint with aiohttp instead of
+requests + threads, so hundreds of tenant crawls can share one event loop
+(and, optionally, one aiohttp.ClientSession connection pool) without a
+thread per in-flight page. Parsing, the dataclasses, metrics and schema-drift
+checks are the ones of the blocking connector (connector.ConnectorParsing).
+
+- Every request runs under an asyncio.Semaphore sized from max_concurrency
+  (default config.max_workers), bounding the pages in flight per tenant.
+- Connect and read timeouts come from config.timeout, like the requests
+  timeout of the blocking connector; waiting for a pooled connection is not
+  counted against them.
+- Transient failures (connection errors, timeouts, HTTP 429/5xx) are retried
+  under the blocking Transport's RetryPolicy; Retry-After and X-RateLimit-*
+  pause the whole tenant, and config.rate_limit applies through the same
+  TokenBucket.
+- Cancelling a crawl cancels its in-flight requests and releases their
+  connections; when one page of a concurrent crawl fails, the other pages
+  are cancelled and the error is re-raised.
+
+The response cache, adaptive paging and stream decoding of the blocking
+connector are not used here. Requires the optional aiohttp package.
+"""
+
+import asyncio
+import base64
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Async client unavailable; the blocking connector still works
+
+from auth_config import QualysAuthConfig, get_default_config
+from connector import AWSConnector, ConnectorParsing, ConnectorResponse, QualysAWSConnector, ResponseFormatError
+from json_stream import loads as json_loads
+from metrics import ConnectorMetrics, RequestMetrics
+from schema_drift import SchemaDriftDetector
+from transport import ACCEPT_ENCODING, RetryPolicy, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def build_client_session(limit: int = 100, limit_per_host: int = 0, keep_alive: bool = True) -> "aiohttp.ClientSession":
+    """
+    Create an aiohttp session that several AsyncQualysAWSConnectors can share.
+
+    Authentication, timeouts and TLS verification are set per request by
+    each connector, so tenants with different credentials and platforms can
+    use the same pool. Must be called with an event loop running.
+
+    Args:
+        limit: Connections open at once across every host (0 = no limit)
+        limit_per_host: Connections open at once per platform host (0 = no limit)
+        keep_alive: Reuse connections between requests
+    """
+    if aiohttp is None:
+        raise ImportError("The asyncio connector requires aiohttp: pip install aiohttp")
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            force_close=not keep_alive
+        ),
+        headers={"Accept-Encoding": ACCEPT_ENCODING}
+    )
+
+
+class AsyncQualysAWSConnector(ConnectorParsing):
+    """
+    asyncio client for the Qualys CloudView AWS Connectors API.
+
+    Example:
+        async with AsyncQualysAWSConnector(config) as connector:
+            connectors = await connector.get_all_connectors(page_size=200)
+            async for connector in connector.iter_connectors():
+                ...
+    """
+
+    ENDPOINT = QualysAWSConnector.ENDPOINT
+
+    def __init__(
+        self,
+        config: Optional[QualysAuthConfig] = None,
+        session: Optional["aiohttp.ClientSession"] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Initialize the connector with authentication configuration.
+
+        Args:
+            config: QualysAuthConfig instance. If None, uses default config from env vars.
+            session: Shared aiohttp session (see build_client_session). If None,
+                the connector opens its own on first use and closes it in close().
+            max_concurrency: Requests in flight at once. Defaults to config.max_workers.
+        """
+        if aiohttp is None:
+            raise ImportError("The asyncio connector requires aiohttp: pip install aiohttp")
+        self.config = config or get_default_config()
+        self.config.validate()
+        self.parsers = self.load_parsers() if self.config.compiled_parser else None
+        self.metrics = ConnectorMetrics()
+        self.drift = (
+            SchemaDriftDetector(self.SCHEMA_PATH, self.config.drift_state) if self.config.drift_check else None
+        )
+        self.session = session
+        self._owns_session = session is None
+        self.max_concurrency = max_concurrency or self.config.max_workers
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Only try_acquire() and pause() are used, so the loop is never blocked
+        self.bucket = TokenBucket(self.config.rate_limit, self.config.rate_burst or None)
+        self.retry = RetryPolicy.from_config(self.config)
+        # Built once; aiohttp deprecates passing BasicAuth per request
+        credentials = f"{self.config.username}:{self.config.password}".encode("latin1")
+        self._headers = {"Authorization": f"Basic {base64.b64encode(credentials).decode('ascii')}"}
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=self.config.timeout, sock_read=self.config.timeout
+        )
+
+    async def __aenter__(self) -> "AsyncQualysAWSConnector":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections, unless it was passed in."""
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def _build_url(self, endpoint: str) -> str:
+        """Build full URL from base URL and endpoint."""
+        return f"{self.config.base_url.rstrip('/')}{endpoint}"
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None:
+            self.session = build_client_session(
+                limit=max(self.config.pool_maxsize, self.max_concurrency), keep_alive=self.config.keep_alive
+            )
+        return self.session
+
+    async def _get(self, url: str, params: Dict[str, Any], metrics: RequestMetrics) -> bytes:
+        """
+        GET a URL under the concurrency limit, retrying transient failures.
+
+        Returns:
+            The response body (decompressed)
+
+        Raises:
+            aiohttp.ClientResponseError: If the final status is an error
+            aiohttp.ClientError, asyncio.TimeoutError: If the last attempt
+                fails at the network level
+        """
+        session = self._get_session()
+        attempt = 0
+        while True:
+            wait = self.bucket.try_acquire()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self.bucket.try_acquire()
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with session.get(
+                        url, params=params, headers=self._headers, timeout=self._timeout, ssl=self.config.verify_ssl
+                    ) as response:
+                        metrics.ttfb = time.perf_counter() - start
+                        metrics.status = response.status
+                        wait = self.retry.throttle(response, response.status, self.bucket, metrics)
+                        delay = self.retry.retry_status(url, response.status, attempt, wait)
+                        if delay is None:
+                            body = await response.read()
+                            metrics.response_bytes = len(body)
+                            # Bytes before decompression (aiohttp >= 3.12; decoded size otherwise)
+                            metrics.wire_bytes = getattr(response.content, "total_raw_bytes", len(body))
+                            metrics.total = time.perf_counter() - start
+                            response.raise_for_status()
+                            return body
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                delay = self.retry.retry_error(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            metrics.retries = attempt
+
+    async def _fetch_page_data(
+        self,
+        page: int,
+        page_size: int,
+        query_params: Optional[Dict[str, str]] = None,
+        crawl_id: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page and return the decoded JSON body without parsing connectors.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If API call fails
+            ValueError: If the body is not valid JSON
+        """
+        url = self._build_url(self.ENDPOINT)
+        params = {
+            "pageNo": page,
+            "pageSize": page_size,
+            **(query_params or {})
+        }
+
+        logger.info(f"Fetching AWS connectors from {url}")
+        request_metrics = RequestMetrics(page=page, page_size=page_size, url=url, crawl=crawl_id)
+        try:
+            body = await self._get(url, params, request_metrics)
+            start = time.perf_counter()
+            data = json_loads(body)
+            request_metrics.json_decode = time.perf_counter() - start
+            if self.drift is not None:
+                self.drift.check_page(data, raw=body)
+            request_metrics.records = len(data.get("content", []))
+            logger.info(f"Successfully fetched {request_metrics.records} connectors")
+            return data
+        except asyncio.CancelledError:
+            request_metrics.error = "CancelledError"
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            request_metrics.error = type(e).__name__
+            logger.error(f"Failed to fetch connectors: {type(e).__name__}: {e}")
+            raise
+        except (KeyError, ValueError) as e:
+            request_metrics.error = type(e).__name__
+            logger.error(f"Failed to parse response: {e}")
+            raise ResponseFormatError(f"Invalid API response format: {e}") from e
+        finally:
+            self.metrics.record_request(request_metrics)
+
+    def _parse_page(self, data: Dict[str, Any], crawl_id: int = 0) -> ConnectorResponse:
+        try:
+            return self._parse_response(data, crawl_id)
+        except (KeyError, ValueError) as e:
+            logger.error(f"Failed to parse response: {e}")
+            raise ResponseFormatError(f"Invalid API response format: {e}") from e
+
+    async def fetch_connectors(self, page: int = 0, page_size: int = 50) -> ConnectorResponse:
+        """
+        Fetch one page of AWS connectors.
+
+        Args:
+            page: Page number (0-indexed)
+            page_size: Number of items per page
+
+        Returns:
+            ConnectorResponse containing list of connectors and pagination info
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If API call fails
+            ValueError: If response cannot be parsed
+        """
+        return await self._fetch_page(page, page_size)
+
+    async def _fetch_page(self, page: int, page_size: int, crawl_id: int = 0) -> ConnectorResponse:
+        """fetch_connectors(), counted towards the given crawl."""
+        return self._parse_page(await self._fetch_page_data(page, page_size, crawl_id=crawl_id), crawl_id)
+
+    async def iter_pages(self, page_size: int = 50, prefetch: bool = True) -> AsyncIterator[ConnectorResponse]:
+        """
+        Stream parsed pages in order until the API reports the last page.
+
+        With prefetch enabled, the next page is requested while the caller is
+        still processing the current one. Tracked as one crawl in self.metrics.
+        """
+        crawl_id = self.metrics.start_crawl()
+        pending: Any = asyncio.ensure_future(self._fetch_page_data(0, page_size, crawl_id=crawl_id))
+        page = 0
+        try:
+            while pending is not None:
+                data = await pending
+                pending = None
+                if not data.get("last", True) and data.get("content"):
+                    page += 1
+                    pending = self._fetch_page_data(page, page_size, crawl_id=crawl_id)
+                    if prefetch:
+                        pending = asyncio.ensure_future(pending)
+                yield self._parse_page(data, crawl_id)
+        finally:
+            if asyncio.isfuture(pending):
+                pending.cancel()
+            elif pending is not None:
+                pending.close()  # Coroutine never started
+            self.metrics.end_crawl(crawl_id)
+
+    async def iter_connectors(self, page_size: int = 50, prefetch: bool = True) -> AsyncIterator[AWSConnector]:
+        """
+        Stream connectors one at a time across all pages.
+
+        Args:
+            page_size: Number of items per page
+            prefetch: Fetch the next page while the caller processes the current one
+
+        Yields:
+            AWSConnector objects, in page order
+        """
+        pages = self.iter_pages(page_size, prefetch)
+        try:
+            async for response in pages:
+                for connector in response.connectors:
+                    yield connector
+        finally:
+            await pages.aclose()
+
+    async def get_all_connectors(self, page_size: int = 50, concurrent: bool = False) -> List[AWSConnector]:
+        """
+        Fetch all AWS connectors, handling pagination automatically.
+
+        Args:
+            page_size: Number of items per page
+            concurrent: If True, fetch page 0 first and then the remaining
+                pages together (bounded by the connector's semaphore);
+                otherwise one page after another
+
+        Returns:
+            List of all AWSConnector objects, in page order
+        """
+        if not concurrent:
+            all_connectors = [c async for c in self.iter_connectors(page_size=page_size, prefetch=False)]
+            logger.info(f"Fetched total of {len(all_connectors)} connectors")
+            return all_connectors
+
+        with self.metrics.track_crawl() as crawl_id:
+            first = await self._fetch_page(0, page_size, crawl_id)
+            all_connectors = list(first.connectors)
+            total_pages = first.pagination.total_pages
+            if not first.is_last and total_pages > 1:
+                logger.info(f"Fetching {total_pages - 1} remaining pages")
+                tasks = [
+                    asyncio.ensure_future(self._fetch_page(page, page_size, crawl_id))
+                    for page in range(1, total_pages)
+                ]
+                try:
+                    responses = await asyncio.gather(*tasks)
+                except BaseException:
+                    # One page failed or the crawl was cancelled: stop the rest
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                for response in responses:
+                    all_connectors.extend(response.connectors)
+        logger.info(f"Fetched total of {len(all_connectors)} connectors")
+        return all_connectors
@@ -5,14 +5,31 @@ Uses Basic Authentication with username and password.
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
-# Load environment variables from .env file if it exists
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass  # python-dotenv not installed, will use environment variables directly
+_env_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load environment variables from a .env file if it exists (once per process).
+    
+    Deferred until a config is actually built, so importing this module
+    stays cheap for commands that never need one (e.g. --help).
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass  # python-dotenv not installed, will use environment variables directly
+
+
+class ConfigError(ValueError):
+    """Missing or invalid configuration (credentials or a QUALYS_* setting)."""
 
 
 @dataclass
@@ -32,6 +49,53 @@ class QualysAuthConfig:
     # SSL verification
     verify_ssl: bool = True
     
+    # Maximum number of pages fetched in parallel during concurrent crawls
+    max_workers: int = 4
+    
+    # Seconds a cached connector inventory stays valid (0 disables the cache)
+    cache_ttl: float = 300.0
+    
+    # Use decoders compiled from baseline_schema.json instead of the hand-written parsers
+    compiled_parser: bool = True
+    
+    # Retry policy: attempts after the first, and exponential backoff bounds (seconds);
+    # backoff_max also caps server-requested waits (Retry-After, X-RateLimit-ToWait-Sec)
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    
+    # Client-side rate limit shared by all threads (requests/second, 0 = unlimited)
+    rate_limit: float = 0.0
+    rate_burst: int = 0
+    
+    # Connection pooling
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    keep_alive: bool = True
+    
+    # Decode the content array incrementally while the response downloads
+    stream_decode: bool = False
+    
+    # Tune pageSize during sequential crawls, remembering the result per tenant
+    adaptive_paging: bool = False
+    page_size_min: int = 25
+    page_size_max: int = 1000
+    # SQLite file holding the page size chosen per tenant ("" = do not persist)
+    page_size_store: str = "page_sizes.db"
+    
+    # Fingerprint every response and report drift from baseline_schema.json
+    drift_check: bool = True
+    # JSON file remembering drift already warned about across runs ("" = this process only)
+    drift_state: str = ""
+    
+    # SQLite file caching page bodies for conditional requests ("" = disabled)
+    response_cache: str = ""
+    response_cache_max_mb: float = 256.0
+    response_cache_max_age: float = 86400.0
+    
+    # Send query() filters as the filter query parameter (off: not every platform supports it)
+    filter_pushdown: bool = False
+    
     @classmethod
     def from_env(cls) -> "QualysAuthConfig":
         """
@@ -43,19 +107,73 @@ class QualysAuthConfig:
         - QUALYS_PASSWORD: API password (required)
         - QUALYS_TIMEOUT: Request timeout in seconds (optional)
         - QUALYS_VERIFY_SSL: Whether to verify SSL certificates (optional)
+        - QUALYS_MAX_WORKERS: Concurrent page fetch limit (optional)
+        - QUALYS_CACHE_TTL: Connector cache TTL in seconds (optional)
+        - QUALYS_COMPILED_PARSER: Whether to use schema-compiled parsers (optional)
+        - QUALYS_MAX_RETRIES, QUALYS_BACKOFF_BASE, QUALYS_BACKOFF_MAX: Retry policy (optional)
+        - QUALYS_RATE_LIMIT, QUALYS_RATE_BURST: Client-side rate limit (optional)
+        - QUALYS_POOL_CONNECTIONS, QUALYS_POOL_MAXSIZE, QUALYS_KEEP_ALIVE: Connection pooling (optional)
+        - QUALYS_STREAM_DECODE: Whether to stream-decode response bodies (optional)
+        - QUALYS_ADAPTIVE_PAGING: Whether to tune pageSize during crawls (optional)
+        - QUALYS_PAGE_SIZE_MIN, QUALYS_PAGE_SIZE_MAX: Adaptive page size bounds (optional)
+        - QUALYS_PAGE_SIZE_STORE: File remembering the page size per tenant (optional)
+        - QUALYS_DRIFT_CHECK: Whether to check responses for schema drift (optional)
+        - QUALYS_DRIFT_STATE: File remembering drift already reported (optional)
+        - QUALYS_RESPONSE_CACHE: File caching pages for ETag/Last-Modified revalidation (optional)
+        - QUALYS_RESPONSE_CACHE_MAX_MB, QUALYS_RESPONSE_CACHE_MAX_AGE: Cache size and age limits (optional)
+        - QUALYS_FILTER_PUSHDOWN: Whether query() sends filters to the API (optional)
         """
-        return cls(
-            base_url=os.getenv("QUALYS_BASE_URL", "https://qualysguard.qg2.apps.qualys.eu"),
-            username=os.getenv("QUALYS_USERNAME", ""),
-            password=os.getenv("QUALYS_PASSWORD", ""),
-            timeout=int(os.getenv("QUALYS_TIMEOUT", "30")),
-            verify_ssl=os.getenv("QUALYS_VERIFY_SSL", "true").lower() == "true"
-        )
+        load_env()
+        try:
+            return cls(
+                base_url=os.getenv("QUALYS_BASE_URL", "https://qualysguard.qg2.apps.qualys.eu"),
+                username=os.getenv("QUALYS_USERNAME", ""),
+                password=os.getenv("QUALYS_PASSWORD", ""),
+                timeout=int(os.getenv("QUALYS_TIMEOUT", "30")),
+                verify_ssl=os.getenv("QUALYS_VERIFY_SSL", "true").lower() == "true",
+                max_workers=int(os.getenv("QUALYS_MAX_WORKERS", "4")),
+                cache_ttl=float(os.getenv("QUALYS_CACHE_TTL", "300")),
+                compiled_parser=os.getenv("QUALYS_COMPILED_PARSER", "true").lower() == "true",
+                max_retries=int(os.getenv("QUALYS_MAX_RETRIES", "3")),
+                backoff_base=float(os.getenv("QUALYS_BACKOFF_BASE", "0.5")),
+                backoff_max=float(os.getenv("QUALYS_BACKOFF_MAX", "30")),
+                rate_limit=float(os.getenv("QUALYS_RATE_LIMIT", "0")),
+                rate_burst=int(os.getenv("QUALYS_RATE_BURST", "0")),
+                pool_connections=int(os.getenv("QUALYS_POOL_CONNECTIONS", "10")),
+                pool_maxsize=int(os.getenv("QUALYS_POOL_MAXSIZE", "10")),
+                keep_alive=os.getenv("QUALYS_KEEP_ALIVE", "true").lower() == "true",
+                stream_decode=os.getenv("QUALYS_STREAM_DECODE", "false").lower() == "true",
+                adaptive_paging=os.getenv("QUALYS_ADAPTIVE_PAGING", "false").lower() == "true",
+                page_size_min=int(os.getenv("QUALYS_PAGE_SIZE_MIN", "25")),
+                page_size_max=int(os.getenv("QUALYS_PAGE_SIZE_MAX", "1000")),
+                page_size_store=os.getenv("QUALYS_PAGE_SIZE_STORE", "page_sizes.db"),
+                drift_check=os.getenv("QUALYS_DRIFT_CHECK", "true").lower() == "true",
+                drift_state=os.getenv("QUALYS_DRIFT_STATE", ""),
+                response_cache=os.getenv("QUALYS_RESPONSE_CACHE", ""),
+                response_cache_max_mb=float(os.getenv("QUALYS_RESPONSE_CACHE_MAX_MB", "256")),
+                response_cache_max_age=float(os.getenv("QUALYS_RESPONSE_CACHE_MAX_AGE", "86400")),
+                filter_pushdown=os.getenv("QUALYS_FILTER_PUSHDOWN", "false").lower() == "true"
+            )
+        except ValueError as e:
+            raise ConfigError(f"Invalid QUALYS_* setting: {e}") from e
     
     def validate(self) -> bool:
-        """Validate that required credentials are provided."""
+        """
+        Validate that required credentials are provided.
+        
+        Raises:
+            ConfigError: If credentials are missing or a setting is out of range
+        """
         if not self.username or not self.password:
-            raise ValueError("QUALYS_USERNAME and QUALYS_PASSWORD environment variables must be set")
+            raise ConfigError("QUALYS_USERNAME and QUALYS_PASSWORD environment variables must be set")
+        if self.max_workers < 1:
+            raise ConfigError("QUALYS_MAX_WORKERS must be at least 1")
+        if self.max_retries < 0:
+            raise ConfigError("QUALYS_MAX_RETRIES must not be negative")
+        if self.rate_limit < 0:
+            raise ConfigError("QUALYS_RATE_LIMIT must not be negative")
+        if not 1 <= self.page_size_min <= self.page_size_max:
+            raise ConfigError("QUALYS_PAGE_SIZE_MIN must be at least 1 and not above QUALYS_PAGE_SIZE_MAX")
         return True
     
     def get_auth_tuple(self) -> tuple:
@@ -63,5 +181,19 @@ class QualysAuthConfig:
         return (self.username, self.password)
 
 
-# Default configuration instance
-default_config = QualysAuthConfig.from_env()
+_default_config: Optional[QualysAuthConfig] = None
+
+
+def get_default_config() -> QualysAuthConfig:
+    """Return the shared configuration built from the environment on first use."""
+    global _default_config
+    if _default_config is None:
+        _default_config = QualysAuthConfig.from_env()
+    return _default_config
+
+
+def __getattr__(name: str) -> Any:
+    # Default configuration instance, built lazily (auth_config.default_config)
+    if name == "default_config":
+        return get_default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
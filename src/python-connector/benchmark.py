@@ -0,0 +1,244 @@
+"""
+Offline benchmark for the Qualys AWS connector.
+
+Starts a local MockQualysServer and measures fetch_connectors,
+get_all_connectors (sequential and concurrent) and get_connector_by_id:
+pages/s, records/s, p50/p99 request latency, parse time and peak memory.
+
+Usage:
+    python benchmark.py --records 5000 --page-size 100 --latency 0.02
+    python benchmark.py --shape snake --error-rate 0.05 --json
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer, make_record
+
+
+@dataclass
+class BenchResult:
+    """Measurements for one benchmark scenario."""
+    name: str
+    wall: float = 0.0
+    pages: int = 0
+    records: int = 0
+    latencies: List[float] = field(default_factory=list)
+    parse_time: float = 0.0
+    peak_memory: int = 0
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.wall if self.wall else 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.wall if self.wall else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile in seconds (q in 0..100)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["latencies"]
+        data.update(
+            pages_per_sec=self.pages_per_sec,
+            records_per_sec=self.records_per_sec,
+            latency_p50=self.percentile(50),
+            latency_p99=self.percentile(99),
+            requests=len(self.latencies),
+        )
+        return data
+
+
+class _Probe:
+    """Times HTTP requests and record parsing on one connector instance."""
+
+    def __init__(self, connector: QualysAWSConnector):
+        self.latencies: List[float] = []
+        self.parse_times: List[float] = []
+        self.pages = 0
+        self.records = 0
+        transport_get = connector.transport.get
+        parse_connector = connector._parse_connector
+
+        def timed_get(url: str, **kwargs: Any):
+            start = time.perf_counter()
+            response = transport_get(url, **kwargs)
+            self.latencies.append(time.perf_counter() - start)
+            self.pages += 1
+            return response
+
+        def timed_parse(data: Dict[str, Any]):
+            start = time.perf_counter()
+            parsed = parse_connector(data)
+            self.parse_times.append(time.perf_counter() - start)
+            self.records += 1
+            return parsed
+
+        connector.transport.get = timed_get
+        connector._parse_connector = timed_parse
+
+
+def _new_connector(server: MockQualysServer, args: argparse.Namespace) -> QualysAWSConnector:
+    config = QualysAuthConfig(
+        base_url=server.base_url,
+        username="bench",
+        password="bench",
+        max_workers=args.workers,
+        backoff_base=0.01,
+        compiled_parser=not args.hand_parser,
+        stream_decode=args.stream_decode,
+        adaptive_paging=args.adaptive,
+        drift_check=args.drift_check,
+        response_cache=args.response_cache,
+        page_size_store=""  # Every iteration starts from --page-size
+    )
+    return QualysAWSConnector(config)
+
+
+def _scenario_fetch(connector: QualysAWSConnector, args: argparse.Namespace) -> None:
+    total_pages = (args.records + args.page_size - 1) // args.page_size
+    for page in range(total_pages):
+        connector.fetch_connectors(page=page, page_size=args.page_size)
+
+
+def _scenario_get_all(connector: QualysAWSConnector, args: argparse.Namespace) -> None:
+    connector.get_all_connectors(page_size=args.page_size)
+
+
+def _scenario_get_all_concurrent(connector: QualysAWSConnector, args: argparse.Namespace) -> None:
+    connector.get_all_connectors(page_size=args.page_size, concurrent=True)
+
+
+def _lookup_ids(args: argparse.Namespace) -> List[str]:
+    rng = random.Random(args.seed)
+    ids = [make_record(rng.randrange(args.records), args.shape) for _ in range(args.lookups)]
+    return [record.get("connectorId", record.get("connector_id")) for record in ids]
+
+
+def _scenario_get_by_id(connector: QualysAWSConnector, args: argparse.Namespace) -> None:
+    connector.invalidate_cache()
+    for connector_id in _lookup_ids(args):
+        connector.get_connector_by_id(connector_id)
+
+
+SCENARIOS: Dict[str, Callable[[QualysAWSConnector, argparse.Namespace], None]] = {
+    "fetch_connectors": _scenario_fetch,
+    "get_all_connectors": _scenario_get_all,
+    "get_all_connectors[concurrent]": _scenario_get_all_concurrent,
+    "get_connector_by_id": _scenario_get_by_id,
+}
+
+
+def run_scenario(name: str, server: MockQualysServer, args: argparse.Namespace) -> BenchResult:
+    """Run one scenario args.iterations times, then once more under tracemalloc."""
+    scenario = SCENARIOS[name]
+    result = BenchResult(name=name)
+
+    for _ in range(args.iterations):
+        connector = _new_connector(server, args)
+        probe = _Probe(connector)
+        start = time.perf_counter()
+        scenario(connector, args)
+        result.wall += time.perf_counter() - start
+        result.pages += probe.pages
+        result.records += probe.records
+        result.latencies.extend(probe.latencies)
+        result.parse_time += sum(probe.parse_times)
+
+    if name == "get_connector_by_id":
+        # Lookups, not requests, are what callers wait on
+        result.latencies = []
+        connector = _new_connector(server, args)
+        for connector_id in _lookup_ids(args):
+            start = time.perf_counter()
+            connector.get_connector_by_id(connector_id)
+            result.latencies.append(time.perf_counter() - start)
+
+    if args.memory:
+        connector = _new_connector(server, args)
+        tracemalloc.start()
+        try:
+            scenario(connector, args)
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def format_table(results: List[BenchResult]) -> str:
+    """Render results as a fixed-width text table."""
+    header = f"{'scenario':<32}{'wall s':>9}{'pages/s':>10}{'records/s':>12}{'p50 ms':>9}{'p99 ms':>9}{'parse s':>9}{'peak MiB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<32}{r.wall:>9.3f}{r.pages_per_sec:>10.1f}{r.records_per_sec:>12.0f}"
+            f"{r.percentile(50) * 1000:>9.2f}{r.percentile(99) * 1000:>9.2f}"
+            f"{r.parse_time:>9.3f}{r.peak_memory / 2 ** 20:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Qualys AWS connector against a local mock server")
+    parser.add_argument("--records", type=int, default=2000, help="connectors served by the mock")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--shape", choices=("camel", "snake"), default="camel",
+                        help="payload field names: live camelCase or baseline snake_case")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per response")
+    parser.add_argument("--record-latency", type=float, default=0.0, help="seconds added per record served")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--workers", type=int, default=4, help="max_workers for concurrent crawls")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=100, help="IDs looked up in get_connector_by_id")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument("--hand-parser", action="store_true", help="use the hand-written parsers")
+    parser.add_argument("--stream-decode", action="store_true", help="decode content items while downloading")
+    parser.add_argument("--adaptive", action="store_true", help="tune pageSize during sequential crawls")
+    parser.add_argument("--no-drift-check", dest="drift_check", action="store_false",
+                        help="skip schema-drift fingerprinting of responses")
+    parser.add_argument("--response-cache", default="", metavar="PATH",
+                        help="revalidate pages against this response cache (iterations after the first get 304s)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with MockQualysServer(
+        records=args.records, shape=args.shape, latency=args.latency,
+        record_latency=args.record_latency, error_rate=args.error_rate, seed=args.seed
+    ) as server:
+        results = [run_scenario(name, server, args) for name in (args.scenario or SCENARIOS)]
+        server_stats = dict(server.stats)
+
+    if args.json:
+        print(json.dumps({
+            "parameters": vars(args),
+            "server": server_stats,
+            "results": [r.to_dict() for r in results],
+        }, indent=2))
+    else:
+        print(format_table(results))
+        print(f"\nserver: {server_stats['requests']} requests, {server_stats['errors']} injected errors, "
+              f"{server_stats['not_modified']} not modified, "
+              f"{server_stats['bytes'] / 2 ** 20:.2f} MiB served")
+
+
+if __name__ == "__main__":
+    main()
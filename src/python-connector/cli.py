@@ -0,0 +1,310 @@
+"""
+Command-line interface for the Qualys AWS connector.
+
+Usage:
+    python -m cli list [--limit N] [--page N] [--json]
+    python -m cli list --state ERROR --disabled --sort=-total_assets --limit 10
+    python -m cli get <connector-id> [--json]
+    python -m cli count [--json]
+    python -m cli export --format csv --output inventory.csv
+    python -m cli watch [--full-sync-interval 3600] [--json]
+    python -m cli watch --once [--snapshot connector_snapshot.db] [--json]
+
+Only argparse, json and sys are imported at startup. The connector (requests,
+compiled parsers ...) and the configuration from the environment / .env are
+loaded inside the command that needs them, so --help and usage errors return
+without paying for either.
+
+With --json every command writes machine-readable output to stdout: one JSON
+object per line for list and watch, a single JSON object for get and count.
+
+Exit codes: 0 success, 1 API error (request failed or response could not be
+parsed), 2 usage or configuration error, 3 connector not found (get).
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+EXIT_API_ERROR = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_NOT_FOUND = 3
+
+
+class UsageError(Exception):
+    """Arguments argparse accepts but that cannot be used together or are invalid."""
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts and sizes that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+    return number
+
+
+def _page_number(value: str) -> int:
+    """argparse type for a 0-based page number."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer: {value!r}")
+    return number
+
+# Columns of the human-readable listing: (header, AWSConnector attribute)
+TABLE_COLUMNS = (
+    ("CONNECTOR ID", "connector_id"),
+    ("NAME", "name"),
+    ("STATE", "status"),
+    ("ACCOUNT", "aws_account_id"),
+    ("REGION", "region_code"),
+    ("ASSETS", "total_assets"),
+)
+
+
+def _connector() -> Any:
+    """Build a QualysAWSConnector from the environment (heavy imports happen here)."""
+    from connector import QualysAWSConnector
+    return QualysAWSConnector()
+
+
+def _encoder(naming: str) -> Callable[[Any], str]:
+    from exporters import compile_json_encoder
+    return compile_json_encoder(naming)
+
+
+def _print_table(connectors: List[Any]) -> None:
+    rows = [[str(getattr(c, attr)) for _, attr in TABLE_COLUMNS] for c in connectors]
+    widths = [max([len(header)] + [len(row[i]) for row in rows]) for i, (header, _) in enumerate(TABLE_COLUMNS)]
+    print("  ".join(header.ljust(width) for (header, _), width in zip(TABLE_COLUMNS, widths)).rstrip())
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+def _query_filters(args: argparse.Namespace) -> Dict[str, Any]:
+    """connector.query() arguments given on the command line."""
+    filters = {
+        "status": args.state,
+        "is_disabled": args.disabled,
+        "aws_account_id": args.account,
+        "region_code": args.region,
+        "qualys_tags": args.tag,
+        "is_gov_cloud": args.gov_cloud,
+    }
+    filters = {name: value for name, value in filters.items() if value is not None}
+    if args.sort:
+        filters["sort"] = args.sort
+    return filters
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    """List connectors (all pages, one page with --page, or matching a query)."""
+    import itertools
+
+    filters = _query_filters(args)
+    if filters:
+        from query import ConnectorQuery
+
+        if args.page is not None:
+            raise UsageError("--page cannot be combined with filters or --sort")
+        try:
+            ConnectorQuery(**filters, limit=args.limit)
+        except ValueError as e:
+            raise UsageError(str(e)) from e
+    connector = _connector()
+    if filters:
+        connectors = iter(connector.query(**filters, limit=args.limit, page_size=args.page_size))
+    elif args.page is not None:
+        connectors = iter(connector.fetch_connectors(page=args.page, page_size=args.page_size).connectors)
+    else:
+        connectors = connector.iter_connectors(page_size=args.page_size)
+    if args.limit is not None:
+        connectors = itertools.islice(connectors, args.limit)
+
+    if args.json:
+        from exporters import NDJSONExporter
+        with NDJSONExporter(sys.stdout, naming=args.naming) as exporter:
+            exporter.write_all(connectors)
+    else:
+        _print_table(list(connectors))
+    return 0
+
+
+def cmd_get(args: argparse.Namespace) -> int:
+    """Print one connector, stopping the crawl at the page that holds it."""
+    from delta_sync import record_id
+
+    connector = _connector()
+    records = connector.iter_raw_connectors(page_size=args.page_size)
+    try:
+        record = next((r for r in records if record_id(r) == args.connector_id), None)
+    finally:
+        records.close()
+    if record is None:
+        print(f"Connector not found: {args.connector_id}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+
+    parsed = connector._parse_connector(record)
+    if args.json:
+        print(_encoder(args.naming)(parsed))
+    else:
+        for key, value in connector.to_normalized_dict(parsed).items():
+            print(f"{key}: {value}")
+    return 0
+
+
+def cmd_count(args: argparse.Namespace) -> int:
+    """Print the number of connectors (one single-record request)."""
+    pagination = _connector().fetch_connectors(page=0, page_size=1).pagination
+    if args.json:
+        print(json.dumps({"count": pagination.total_elements}))
+    else:
+        print(pagination.total_elements)
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Stream every connector into a file (or stdout) in the chosen format."""
+    from exporters import export_connectors
+
+    connector = _connector()
+    written = export_connectors(
+        connector.iter_connectors(page_size=args.page_size),
+        args.format, args.output, naming=args.naming, batch_size=args.batch_size
+    )
+    # The summary goes to stderr so it never mixes with an export on stdout
+    if args.json:
+        print(json.dumps({"exported": written, "format": args.format, "output": args.output}), file=sys.stderr)
+    else:
+        print(f"Exported {written} connectors to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _emit(args: argparse.Namespace, event: Dict[str, Any], summary: str) -> None:
+    print(json.dumps(event) if args.json else summary, flush=True)
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    """
+    Report connector changes as they happen (due-time daemon), or with
+    --once the changes since the last --snapshot run (for cron).
+    """
+    connector = _connector()
+    if args.once:
+        from delta_sync import DeltaSync, SnapshotStore
+
+        encode = _encoder(args.naming)
+        with SnapshotStore(args.snapshot) as store:
+            result = DeltaSync(connector, store).run(page_size=args.page_size)
+        for kind, connectors in (("added", result.added), ("changed", result.changed)):
+            for c in connectors:
+                _emit(args, {"event": kind, "connector": json.loads(encode(c))},
+                      f"{kind:<8} {c.connector_id}  {c.name}  {c.status}")
+        for connector_id in result.removed:
+            _emit(args, {"event": "removed", "connector_id": connector_id}, f"removed  {connector_id}")
+        return 0
+
+    import asyncio
+    from watch_daemon import WatchDaemon
+
+    def on_event(event: Any) -> None:
+        change = f"{event.old} -> {event.new}" if event.old is not None else ""
+        _emit(args, event.to_dict(), f"{event.kind:<14} {event.connector_id}  {event.name}  {change}".rstrip())
+
+    daemon = WatchDaemon(
+        connector, on_event, page_size=args.page_size, settle=args.settle,
+        full_sync_interval=args.full_sync_interval
+    )
+    asyncio.run(daemon.run())
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for every subcommand."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="machine-readable JSON output")
+    common.add_argument("--page-size", type=_positive_int, default=50, help="connectors requested per page")
+    common.add_argument("--naming", choices=("baseline", "live"), default="baseline",
+                        help="field names in JSON output: snake_case baseline or live camelCase")
+    common.add_argument("-v", "--verbose", action="store_true", help="log requests to stderr")
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Qualys CloudView AWS connectors")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    list_parser = commands.add_parser("list", parents=[common], help="list connectors")
+    list_parser.add_argument("--page", type=_page_number, default=None, help="list only this page (0-based)")
+    list_parser.add_argument("--limit", type=_positive_int, default=None, help="stop after this many connectors")
+    list_parser.add_argument("--state", action="append", help="only this state (repeatable)")
+    list_parser.add_argument("--disabled", action="store_const", const=True, default=None,
+                             help="only disabled connectors")
+    list_parser.add_argument("--enabled", dest="disabled", action="store_const", const=False,
+                             help="only enabled connectors")
+    list_parser.add_argument("--account", action="append", help="only this AWS account ID (repeatable)")
+    list_parser.add_argument("--region", action="append", help="only this region code (repeatable)")
+    list_parser.add_argument("--tag", action="append", help="only connectors carrying this Qualys tag (repeatable)")
+    list_parser.add_argument("--gov-cloud", action="store_const", const=True, default=None,
+                             help="only GovCloud connectors")
+    list_parser.add_argument("--sort", help="sort by an AWSConnector attribute, '-' prefix for descending")
+    list_parser.set_defaults(handler=cmd_list)
+
+    get_parser = commands.add_parser("get", parents=[common], help="show one connector")
+    get_parser.add_argument("connector_id", help="connector UUID")
+    get_parser.set_defaults(handler=cmd_get)
+
+    count_parser = commands.add_parser("count", parents=[common], help="print the number of connectors")
+    count_parser.set_defaults(handler=cmd_count)
+
+    export_parser = commands.add_parser("export", parents=[common], help="export every connector")
+    export_parser.add_argument("--format", choices=("ndjson", "csv", "columnar", "parquet"), default="ndjson")
+    export_parser.add_argument("--output", default="-", help="output file ('-' for stdout)")
+    export_parser.add_argument("--batch-size", type=_positive_int, default=1000, help="connectors serialized per write")
+    export_parser.set_defaults(handler=cmd_export)
+
+    watch_parser = commands.add_parser("watch", parents=[common], help="report inventory changes")
+    watch_parser.add_argument("--full-sync-interval", type=float, default=3600.0,
+                              help="seconds between full crawls (added/removed connectors)")
+    watch_parser.add_argument("--settle", type=float, default=30.0,
+                              help="seconds after nextSyncedOn before a connector is refreshed")
+    watch_parser.add_argument("--once", action="store_true",
+                              help="report changes since the last --snapshot run and exit")
+    watch_parser.add_argument("--snapshot", default="connector_snapshot.db",
+                              help="SQLite file holding the last seen inventory (--once)")
+    watch_parser.set_defaults(handler=cmd_watch)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the selected command; returns the exit code."""
+    args = build_parser().parse_args(argv)
+
+    import logging
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    try:
+        return args.handler(args)
+    except UsageError as e:
+        print(f"Usage error: {e}", file=sys.stderr)
+        return EXIT_CONFIG_ERROR
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        from auth_config import ConfigError
+        if isinstance(e, ConfigError):
+            print(f"Configuration error: {e}", file=sys.stderr)
+            return EXIT_CONFIG_ERROR
+        import requests  # Already loaded by the connector
+        from connector import ResponseFormatError
+        if not isinstance(e, (requests.RequestException, ResponseFormatError)):
+            raise
+        print(f"API error: {e}", file=sys.stderr)
+        return EXIT_API_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,22 +13,40 @@ Intentional Differences:
 3. Missing fields: nextSyncedOn, remediationEnabled, qualysTags, portalConnectorUuid, isPortalConnector
 """
 
-import json
+import heapq
+import itertools
 import logging
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
-from auth_config import QualysAuthConfig, default_config
+from auth_config import QualysAuthConfig, get_default_config
+from connector_cache import ConnectorCache
+from json_stream import ContentStream, loads as json_loads
+from metrics import ConnectorMetrics, RequestMetrics
+from page_sizing import PageSizeStore, PageSizeTuner, is_timeout, served_page_size
+from query import ConnectorQuery, FilterValue
+from response_cache import ResponseCache
+from schema_compiler import CompiledParsers, check_equivalence, compile_parsers
+from schema_drift import DriftReport, SchemaDriftDetector
+from transport import Transport, build_session
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+class ResponseFormatError(ValueError):
+    """The API response could not be decoded or is not a valid paged envelope."""
+
+
+@dataclass(slots=True)
 class PollingFrequency:
     """Polling frequency configuration for a connector."""
     hours: int = 0
@@ -37,13 +55,16 @@ class PollingFrequency:
     seconds: int = 0  # Actual API field: seconds
 
 
-@dataclass
+@dataclass(slots=True)
 class AWSConnector:
     """
     Data class representing an AWS Connector from Qualys.
     
     NOTE: This model is based on the BASELINE SCHEMA which has intentional
     differences from the actual API response for CARE testing purposes.
+    
+    Uses __slots__ (no per-instance __dict__) to keep large inventories small.
+    See connector_table.ConnectorTable for a columnar alternative.
     """
     name: str
     connector_id: str  # Actual API field: connectorId
@@ -97,33 +118,75 @@ class ConnectorResponse:
     request_id: str = ""    # Actual API field: requestId
 
 
-class QualysAWSConnector:
+def _collect_chunks(chunks: Iterable[bytes], sink: List[bytes]) -> Iterator[bytes]:
+    """Pass body chunks through while keeping a copy (for the response cache)."""
+    for chunk in chunks:
+        sink.append(chunk)
+        yield chunk
+
+
+class ConnectorParsing:
     """
-    Connector for Qualys CloudView AWS Connectors API.
+    Response parsing shared by the blocking and asyncio connectors.
     
-    This connector fetches AWS connector information using Basic Authentication.
-    It maps API response fields based on the BASELINE SCHEMA which intentionally
-    differs from the actual API response for CARE testing purposes.
+    Maps raw API records and page envelopes onto the dataclasses above using
+    the BASELINE SCHEMA field names. Subclasses set self.parsers (compiled
+    decoders or None), self.metrics and self.drift.
     """
     
-    ENDPOINT = "/cloudview-api/rest/v1/aws/connectors"
+    SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_schema.json")
     
-    def __init__(self, config: Optional[QualysAuthConfig] = None):
+    _compiled_parsers: Optional[CompiledParsers] = None
+    parsers: Optional[CompiledParsers]
+    metrics: ConnectorMetrics
+    drift: Optional[SchemaDriftDetector]
+    
+    @classmethod
+    def load_parsers(cls) -> CompiledParsers:
+        """Compile (once per process) the decoders generated from baseline_schema.json."""
+        if ConnectorParsing._compiled_parsers is None:
+            ConnectorParsing._compiled_parsers = compile_parsers(
+                cls.SCHEMA_PATH, AWSConnector, PaginationInfo, PollingFrequency
+            )
+        return ConnectorParsing._compiled_parsers
+    
+    def verify_compiled_parser(self, records: Optional[List[Dict[str, Any]]] = None) -> List[str]:
         """
-        Initialize the connector with authentication configuration.
+        Check the compiled decoders against the hand-written parsers.
         
         Args:
-            config: QualysAuthConfig instance. If None, uses default config from env vars.
+            records: Raw connector records to compare on. Defaults to generated
+                baseline-style and live-style samples covering every field,
+                well-typed, null and wrongly typed.
+            
+        Returns:
+            List of mismatch descriptions (empty if both produce the same
+            output once the hand-written one is coerced like the compiled one)
         """
-        self.config = config or default_config
-        self.config.validate()
-        self.session = requests.Session()
-        self.session.auth = self.config.get_auth_tuple()
-        self.session.verify = self.config.verify_ssl
+        parsers = self.load_parsers()
+        records = records if records is not None else parsers.sample_records()
+        saved, self.parsers = self.parsers, None
+        try:
+            mismatches = check_equivalence(
+                self._parse_connector, parsers.connector, records,
+                normalize=lambda parsed: parsers.normalize("connector", parsed)
+            )
+            mismatches += check_equivalence(
+                self._parse_pagination, parsers.pagination, records,
+                normalize=lambda parsed: parsers.normalize("pagination", parsed)
+            )
+        finally:
+            self.parsers = saved
+        return mismatches
+    
+    def schema_drift(self) -> DriftReport:
+        """
+        Report how the responses seen so far differ from baseline_schema.json.
         
-    def _build_url(self, endpoint: str) -> str:
-        """Build full URL from base URL and endpoint."""
-        return f"{self.config.base_url.rstrip('/')}{endpoint}"
+        Returns:
+            DriftReport (empty if drift checking is disabled)
+        """
+        return self.drift.report() if self.drift is not None else DriftReport()
     
     def _parse_polling_frequency(self, data: Dict[str, Any]) -> PollingFrequency:
         """
@@ -146,7 +209,10 @@ class QualysAWSConnector:
         
         IMPORTANT: This method uses BASELINE SCHEMA field mappings which differ
         from the actual API response. CARE should detect and fix these mismatches.
+        Delegates to the schema-compiled decoder when one is loaded.
         """
+        if self.parsers is not None:
+            return self.parsers.connector(data)
         return AWSConnector(
             name=data.get("name", ""),
             # Using 'connector_id' but API returns 'connectorId'
@@ -190,7 +256,10 @@ class QualysAWSConnector:
         Parse pagination information from API response.
         
         Uses baseline schema field names which differ from actual API response.
+        Delegates to the schema-compiled decoder when one is loaded.
         """
+        if self.parsers is not None:
+            return self.parsers.pagination(data)
         pageable = data.get("pageable", {})
         sort_data = pageable.get("sort", data.get("sort", {}))
         return PaginationInfo(
@@ -208,6 +277,132 @@ class QualysAWSConnector:
             sort_by=sort_data.get("sortBy", "")
         )
     
+    def _parse_stream(self, items: Iterator[Dict[str, Any]], crawl_id: int = 0) -> Iterator[AWSConnector]:
+        """Parse raw items lazily, reporting total parse time (to crawl_id) once they are exhausted."""
+        elapsed = 0.0
+        count = 0
+        for item in items:
+            start = time.perf_counter()
+            connector = self._parse_connector(item)
+            elapsed += time.perf_counter() - start
+            count += 1
+            yield connector
+        self.metrics.record_parse(elapsed, count, crawl_id)
+    
+    def _parse_response(self, data: Dict[str, Any], crawl_id: int = 0) -> ConnectorResponse:
+        """Parse full API response into ConnectorResponse object (parse time goes to crawl_id)."""
+        start = time.perf_counter()
+        content = data.get("content", [])
+        connectors = [self._parse_connector(c) for c in content]
+        self.metrics.record_parse(time.perf_counter() - start, len(connectors), crawl_id)
+        return self._build_response(connectors, data)
+    
+    def _build_response(self, connectors: List[AWSConnector], data: Dict[str, Any]) -> ConnectorResponse:
+        """Combine parsed connectors with the envelope fields of a page."""
+        return ConnectorResponse(
+            connectors=connectors,
+            pagination=self._parse_pagination(data),
+            is_first=data.get("first", True),
+            is_last=data.get("last", True),
+            is_empty=data.get("empty", False),
+            # NOT in baseline_schema.json — new response-level metadata fields
+            api_version=data.get("apiVersion", ""),
+            request_id=data.get("requestId", "")
+        )
+    
+    def to_normalized_dict(self, connector: AWSConnector) -> Dict[str, Any]:
+        """
+        Convert connector to normalized dictionary format.
+        
+        This uses the BASELINE SCHEMA field names (snake_case) which differ
+        from the actual API response (camelCase). CARE should detect this mismatch.
+        Fields prefixed with # NOT-IN-BASELINE are beyond the baseline schema.
+        """
+        return {
+            "name": connector.name,
+            "connector_id": connector.connector_id,  # Should be 'connectorId'
+            "description": connector.description,
+            "provider": connector.provider,
+            "status": connector.status,  # Should be 'state'
+            "total_assets": connector.total_assets,  # Should be 'totalAssets'
+            "last_synced_on": connector.last_synced_on,  # Should be 'lastSyncedOn'
+            "is_gov_cloud": connector.is_gov_cloud,  # Should be 'isGovCloud'
+            "is_china_region": connector.is_china_region,  # Should be 'isChinaRegion'
+            "aws_account_id": connector.aws_account_id,  # Should be 'awsAccountId'
+            "is_disabled": connector.is_disabled,  # Should be 'isDisabled'
+            "polling_frequency": {  # Should be 'pollingFrequency'
+                "hours": connector.polling_frequency.hours,
+                "minutes": connector.polling_frequency.minutes,
+                "seconds": connector.polling_frequency.seconds  # NOT-IN-BASELINE
+            },
+            "error": connector.error,
+            "base_account_id": connector.base_account_id,  # Should be 'baseAccountId'
+            "external_id": connector.external_id,  # Should be 'externalId'
+            "arn": connector.arn,
+            # --- Fields NOT in baseline_schema.json ---
+            "next_synced_on": connector.next_synced_on,          # NOT-IN-BASELINE (nextSyncedOn)
+            "remediation_enabled": connector.remediation_enabled, # NOT-IN-BASELINE (remediationEnabled)
+            "qualys_tags": connector.qualys_tags,                 # NOT-IN-BASELINE (qualysTags)
+            "portal_connector_uuid": connector.portal_connector_uuid,  # NOT-IN-BASELINE (portalConnectorUuid)
+            "is_portal_connector": connector.is_portal_connector, # NOT-IN-BASELINE (isPortalConnector)
+            "account_alias": connector.account_alias,             # NOT-IN-BASELINE (accountAlias)
+            "region_code": connector.region_code                  # NOT-IN-BASELINE (regionCode)
+        }
+
+
+class QualysAWSConnector(ConnectorParsing):
+    """
+    Connector for Qualys CloudView AWS Connectors API.
+    
+    This connector fetches AWS connector information using Basic Authentication.
+    It maps API response fields based on the BASELINE SCHEMA which intentionally
+    differs from the actual API response for CARE testing purposes.
+    """
+    
+    ENDPOINT = "/cloudview-api/rest/v1/aws/connectors"
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, config: Optional[QualysAuthConfig] = None):
+        """
+        Initialize the connector with authentication configuration.
+        
+        Args:
+            config: QualysAuthConfig instance. If None, uses default config from env vars.
+        """
+        self.config = config or get_default_config()
+        self.config.validate()
+        # Schema-compiled decoders replace the hand-written parsers below unless disabled
+        self.parsers = self.load_parsers() if self.config.compiled_parser else None
+        self.session = build_session(self.config)
+        # Retries, backoff and rate limiting shared by all threads of this connector
+        self.transport = Transport(self.session, self.config)
+        # Per-request timings, per-crawl aggregates and callbacks
+        self.metrics = ConnectorMetrics()
+        # Structural fingerprints of responses, diffed against the baseline when new
+        self.drift = (
+            SchemaDriftDetector(self.SCHEMA_PATH, self.config.drift_state) if self.config.drift_check else None
+        )
+        # Page bodies + ETag/Last-Modified for conditional requests (optional)
+        self.response_cache = (
+            ResponseCache(
+                self.config.response_cache,
+                max_bytes=int(self.config.response_cache_max_mb * 2 ** 20),
+                max_age=self.config.response_cache_max_age
+            )
+            if self.config.response_cache else None
+        )
+        self.cache = ConnectorCache(ttl=self.config.cache_ttl)
+        self._cache_refresh_lock = threading.Lock()
+        # Page size chosen by the last adaptive crawl, per tenant
+        self.page_size_store = (
+            PageSizeStore(self.config.page_size_store)
+            if self.config.adaptive_paging and self.config.page_size_store else None
+        )
+        
+    def _build_url(self, endpoint: str) -> str:
+        """Build full URL from base URL and endpoint."""
+        return f"{self.config.base_url.rstrip('/')}{endpoint}"
+    
     def fetch_connectors(self, page: int = 0, page_size: int = 50) -> ConnectorResponse:
         """
         Fetch AWS connectors from Qualys CloudView API.
@@ -223,130 +418,635 @@ class QualysAWSConnector:
             requests.RequestException: If API call fails
             ValueError: If response cannot be parsed
         """
+        return self._fetch_page(page, page_size)
+    
+    def _fetch_page(self, page: int, page_size: int, crawl_id: int = 0) -> ConnectorResponse:
+        """fetch_connectors(), counted towards the given crawl."""
+        request_metrics = RequestMetrics(page=page, page_size=page_size, crawl=crawl_id)
+        if self.config.stream_decode:
+            attempt = 0
+            while True:
+                envelope: Dict[str, Any] = {}
+                items = self._stream_page(page, page_size, envelope, request_metrics)
+                try:
+                    connectors = list(self._parse_stream(items, crawl_id))
+                except requests.RequestException as e:
+                    # The body broke off part-way: request the whole page again
+                    if not self.transport.retry_read(e, attempt):
+                        raise
+                    attempt += 1
+                    request_metrics = RequestMetrics(page=page, page_size=page_size, crawl=crawl_id, retries=attempt)
+                    continue
+                return self._build_response(connectors, envelope)
+        
+        data = self._fetch_page_data(page, page_size, request_metrics)
+        
+        try:
+            return self._parse_response(data, crawl_id)
+        except (KeyError, ValueError) as e:
+            logger.error(f"Failed to parse response: {e}")
+            raise ResponseFormatError(f"Invalid API response format: {e}") from e
+    
+    def _fetch_page_data(
+        self,
+        page: int,
+        page_size: int,
+        request_metrics: Optional[RequestMetrics] = None,
+        query_params: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page and return the decoded JSON body without parsing connectors.
+        
+        Args:
+            page: Page number (0-indexed)
+            page_size: Number of items per page
+            request_metrics: RequestMetrics to fill in (created if not given)
+            query_params: Extra query parameters (e.g. a pushed-down filter)
+            
+        Raises:
+            requests.RequestException: If API call fails
+            ValueError: If the body is not valid JSON
+        """
         url = self._build_url(self.ENDPOINT)
         params = {
             "pageNo": page,
-            "pageSize": page_size
+            "pageSize": page_size,
+            **(query_params or {})
         }
         
         logger.info(f"Fetching AWS connectors from {url}")
+        request_metrics = request_metrics or RequestMetrics(page=page, page_size=page_size)
+        request_metrics.url = url
+        cache_key = self._response_cache_key(url, params)
         
         try:
-            response = self.session.get(
-                url,
-                params=params,
-                timeout=self.config.timeout
+            response, data = self._conditional_get(url, params, cache_key, request_metrics)
+            if data is None:
+                response.raise_for_status()
+                
+                start = time.perf_counter()
+                data = json_loads(response.content)
+                request_metrics.json_decode = time.perf_counter() - start
+                if self.drift is not None:
+                    self.drift.check_page(data, raw=response.content)
+                if cache_key is not None:
+                    self.response_cache.store(cache_key, response.headers, response.content, data)
+            request_metrics.records = len(data.get("content", []))
+            logger.info(
+                f"Successfully fetched {request_metrics.records} connectors"
+                f"{' (not modified)' if request_metrics.not_modified else ''}"
             )
-            response.raise_for_status()
+            return data
             
-            data = response.json()
-            logger.info(f"Successfully fetched {len(data.get('content', []))} connectors")
+        except requests.RequestException as e:
+            request_metrics.error = type(e).__name__
+            logger.error(f"Failed to fetch connectors: {e}")
+            raise
+        except (KeyError, ValueError) as e:
+            request_metrics.error = type(e).__name__
+            logger.error(f"Failed to parse response: {e}")
+            raise ResponseFormatError(f"Invalid API response format: {e}") from e
+        finally:
+            self.metrics.record_request(request_metrics)
+    
+    def _stream_page(
+        self,
+        page: int,
+        page_size: int,
+        envelope: Dict[str, Any],
+        request_metrics: Optional[RequestMetrics] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch one page with stream=True and yield raw content items as they decode.
+        
+        Items are decoded incrementally from the response bytes, so parsing
+        overlaps the download and the page's full dict tree is never built.
+        Once exhausted, envelope holds the remaining top-level fields
+        (pageable, totalPages, last, ...) with an empty content list.
+        
+        Raises:
+            requests.RequestException: If API call fails
+            ValueError: If the body is not a valid paged envelope
+        """
+        url = self._build_url(self.ENDPOINT)
+        params = {
+            "pageNo": page,
+            "pageSize": page_size
+        }
+        
+        logger.info(f"Streaming AWS connectors from {url}")
+        request_metrics = request_metrics or RequestMetrics(page=page, page_size=page_size)
+        request_metrics.url = url
+        cache_key = self._response_cache_key(url, params)
+        start = time.perf_counter()
+        response = None
+        
+        try:
+            response, data = self._conditional_get(url, params, cache_key, request_metrics, stream=True)
+            if data is not None:
+                # 304 Not Modified: replay the cached page
+                request_metrics.records = len(data.get("content", []))
+                yield from data.get("content", [])
+                envelope.update(data)
+                envelope["content"] = []
+                request_metrics.total = time.perf_counter() - start
+                logger.info(f"Successfully streamed {request_metrics.records} connectors (not modified)")
+                return
+            response.raise_for_status()
             
-            return self._parse_response(data)
+            chunks = response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+            body: List[bytes] = []
+            if cache_key is not None:
+                chunks = _collect_chunks(chunks, body)
+            stream = ContentStream(chunks)
+            try:
+                yield from self.drift.tap(stream) if self.drift is not None else stream
+            finally:
+                request_metrics.records = stream.items_decoded
+                request_metrics.response_bytes = stream.bytes_read
+                request_metrics.wire_bytes = response.raw.tell()
+                request_metrics.json_decode = stream.decode_seconds
+            envelope.update(stream.envelope)
+            if self.drift is not None:
+                self.drift.check_envelope(envelope)
+            if cache_key is not None:
+                self.response_cache.store(cache_key, response.headers, b"".join(body))
+            request_metrics.total = time.perf_counter() - start
+            logger.info(f"Successfully streamed {stream.items_decoded} connectors")
             
         except requests.RequestException as e:
+            request_metrics.error = type(e).__name__
             logger.error(f"Failed to fetch connectors: {e}")
             raise
-        except (KeyError, ValueError) as e:
+        except ValueError as e:
+            request_metrics.error = type(e).__name__
             logger.error(f"Failed to parse response: {e}")
-            raise ValueError(f"Invalid API response format: {e}")
+            raise ResponseFormatError(f"Invalid API response format: {e}") from e
+        finally:
+            if response is not None:
+                response.close()
+            self.metrics.record_request(request_metrics)
     
-    def _parse_response(self, data: Dict[str, Any]) -> ConnectorResponse:
-        """Parse full API response into ConnectorResponse object."""
-        content = data.get("content", [])
-        connectors = [self._parse_connector(c) for c in content]
-        pagination = self._parse_pagination(data)
+    def _response_cache_key(self, url: str, params: Dict[str, Any]) -> Optional[str]:
+        """Key of a page in the response cache (None when the cache is disabled)."""
+        if self.response_cache is None:
+            return None
+        return f"{self._tenant_key()} {url}?{urlencode(sorted(params.items()))}"
+    
+    def _conditional_get(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        cache_key: Optional[str],
+        request_metrics: RequestMetrics,
+        stream: bool = False
+    ) -> Tuple[requests.Response, Optional[Dict[str, Any]]]:
+        """
+        GET a page, revalidating the cached copy when there is one.
         
-        return ConnectorResponse(
-            connectors=connectors,
-            pagination=pagination,
-            is_first=data.get("first", True),
-            is_last=data.get("last", True),
-            is_empty=data.get("empty", False),
-            # NOT in baseline_schema.json — new response-level metadata fields
-            api_version=data.get("apiVersion", ""),
-            request_id=data.get("requestId", "")
+        Returns:
+            (response, data) where data is the cached decoded page if the
+            server answered 304 Not Modified, else None (read the response)
+        """
+        cached = self.response_cache.lookup(cache_key) if cache_key is not None else None
+        response = self.transport.get(
+            url,
+            metrics=request_metrics,
+            params=params,
+            timeout=self.config.timeout,
+            stream=stream,
+            headers=cached.conditional_headers() if cached else None
         )
+        if response.status_code == 304:
+            data = self.response_cache.load(cached) if cached is not None else None
+            if data is not None:
+                request_metrics.not_modified = True
+                return response, data
+            # Nothing to reuse (evicted since the lookup, or a 304 we did not ask for):
+            # a miss, so request the full page without validators
+            logger.info(f"HTTP 304 from {url} without a cached page; requesting it again")
+            response.close()
+            response = self.transport.get(
+                url,
+                metrics=request_metrics,
+                params=params,
+                timeout=self.config.timeout,
+                stream=stream
+            )
+        return response, None
     
-    def get_all_connectors(self) -> List[AWSConnector]:
+    def get_all_connectors(
+        self,
+        page_size: int = 50,
+        concurrent: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[AWSConnector]:
         """
         Fetch all AWS connectors, handling pagination automatically.
         
+        Args:
+            page_size: Number of items per page
+            concurrent: If True, fetch page 0 first and then the remaining
+                pages in parallel (see _fetch_remaining_pages)
+            max_workers: Concurrency limit for parallel fetches. Defaults to
+                config.max_workers.
+            
         Returns:
-            List of all AWSConnector objects
+            List of all AWSConnector objects, in page order
+        """
+        if concurrent:
+            all_connectors = self._get_all_connectors_concurrent(
+                page_size, max_workers or self.config.max_workers
+            )
+        else:
+            all_connectors = list(self.iter_connectors(page_size=page_size, prefetch=False))
+        
+        logger.info(f"Fetched total of {len(all_connectors)} connectors")
+        return all_connectors
+    
+    def _iter_page_data(
+        self,
+        page_size: int = 50,
+        prefetch: bool = True,
+        query_params: Optional[Dict[str, str]] = None,
+        crawl_id: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield raw page bodies in order until the API reports the last page.
+        
+        With prefetch enabled, the next page is requested on a background
+        thread while the caller is still consuming the current one. With
+        config.adaptive_paging, pageSize is tuned from page to page (see
+        page_sizing.py). Requests are counted towards crawl_id (see
+        ConnectorMetrics.track_crawl).
+        """
+        tuner = self._page_tuner(page_size)
+        try:
+            if prefetch:
+                yield from self._iter_page_data_prefetch(tuner, query_params, crawl_id)
+            else:
+                while True:
+                    data = self._fetch_tuned_page(tuner, query_params, crawl_id)
+                    yield data
+                    if data.get("last", True) or not data.get("content"):
+                        return
+        finally:
+            self._save_page_size(tuner)
+    
+    def _iter_page_data_prefetch(
+        self,
+        tuner: PageSizeTuner,
+        query_params: Optional[Dict[str, str]] = None,
+        crawl_id: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield raw page bodies, fetching page N+1 while page N is consumed."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qualys-prefetch")
+        future = None
+        try:
+            future = executor.submit(self._fetch_tuned_page, tuner, query_params, crawl_id)
+            while future is not None:
+                data = future.result()
+                if data.get("last", True) or not data.get("content"):
+                    future = None
+                else:
+                    future = executor.submit(self._fetch_tuned_page, tuner, query_params, crawl_id)
+                yield data
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _page_tuner(self, page_size: int) -> PageSizeTuner:
+        """Return the page size planner for one crawl (fixed unless adaptive paging is on)."""
+        if not self.config.adaptive_paging:
+            return PageSizeTuner(page_size, page_size, page_size, self.config.timeout, adaptive=False)
+        stored = self.page_size_store.get(self._tenant_key()) if self.page_size_store else None
+        return PageSizeTuner(
+            initial=stored or page_size,
+            min_size=self.config.page_size_min,
+            max_size=self.config.page_size_max,
+            max_seconds=self.config.timeout / 2
+        )
+    
+    def _tenant_key(self) -> str:
+        """Identify the tenant (API user on a platform) for per-tenant state."""
+        return f"{self.config.username}@{self.config.base_url.rstrip('/')}"
+    
+    def _save_page_size(self, tuner: PageSizeTuner) -> None:
+        """Remember the size an adaptive crawl settled on for the next run."""
+        if self.page_size_store is not None and tuner.observed:
+            self.page_size_store.set(self._tenant_key(), tuner.page_size)
+            logger.info(f"Adaptive paging: stored pageSize={tuner.page_size} for {self._tenant_key()}")
+    
+    def _fetch_tuned_page(
+        self,
+        tuner: PageSizeTuner,
+        query_params: Optional[Dict[str, str]] = None,
+        crawl_id: int = 0
+    ) -> Dict[str, Any]:
         """
-        all_connectors = []
-        page = 0
+        Fetch the next page chosen by the tuner and report its cost back.
         
+        A timed-out page is retried at a smaller size while the tuner can
+        still shrink. If the server capped pageSize, the records already
+        delivered are dropped from the page, or it is re-requested at the
+        capped size when it starts past them.
+        """
         while True:
-            response = self.fetch_connectors(page=page)
-            all_connectors.extend(response.connectors)
+            page, page_size, _ = tuner.next_request()
+            request_metrics = RequestMetrics(page=page, page_size=page_size, crawl=crawl_id)
+            try:
+                data = self._fetch_page_data(page, page_size, request_metrics, query_params)
+            except requests.RequestException as e:
+                if is_timeout(e) and tuner.shrink():
+                    continue
+                raise
+            served = served_page_size(data, page_size)
+            skip = tuner.served(page, page_size, served)
+            content = data.get("content", [])
+            if skip is None or (skip and skip >= len(content) and not data.get("last", True)):
+                continue
+            request_metrics.page_size = served  # What the tuner measured
+            if skip:
+                # Copy: the page may be shared with the response cache
+                data = dict(data, content=content[skip:])
+            tuner.advance(len(data.get("content", [])))
+            tuner.observe(request_metrics, data.get("totalElements"))
+            return data
+    
+    def iter_raw_connectors(self, page_size: int = 50, prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream raw connector records (decoded JSON, unparsed) across all pages.
+        
+        Useful for callers that want to inspect or filter records before
+        paying for _parse_connector.
+        """
+        with self.metrics.track_crawl() as crawl_id:
+            for data in self._iter_page_data(page_size, prefetch, crawl_id=crawl_id):
+                yield from data.get("content", [])
+    
+    def iter_pages(self, page_size: int = 50, prefetch: bool = True) -> Iterator[ConnectorResponse]:
+        """
+        Stream parsed pages as they arrive.
+        
+        Args:
+            page_size: Number of items per page
+            prefetch: Fetch the next page while the caller processes the current one
             
-            if response.is_last:
-                break
-            page += 1
+        Yields:
+            ConnectorResponse for each page, in page order
+        """
+        with self.metrics.track_crawl() as crawl_id:
+            for data in self._iter_page_data(page_size, prefetch, crawl_id=crawl_id):
+                try:
+                    response = self._parse_response(data, crawl_id)
+                except (KeyError, ValueError) as e:
+                    logger.error(f"Failed to parse response: {e}")
+                    raise ResponseFormatError(f"Invalid API response format: {e}") from e
+                yield response
+    
+    def iter_connectors(self, page_size: int = 50, prefetch: bool = True) -> Iterator[AWSConnector]:
+        """
+        Stream connectors one at a time across all pages.
         
-        logger.info(f"Fetched total of {len(all_connectors)} connectors")
-        return all_connectors
+        Each record is parsed only when the caller asks for it, and only one
+        page (plus the prefetched one) is held in memory at a time. With
+        config.stream_decode, records are decoded from the response bytes
+        as they arrive instead (prefetch does not apply).
+        
+        Args:
+            page_size: Number of items per page
+            prefetch: Fetch the next page while the caller processes the current one
+            
+        Yields:
+            AWSConnector objects, in page order
+        """
+        if self.config.stream_decode:
+            yield from self._iter_connectors_streaming(page_size)
+            return
+        
+        with self.metrics.track_crawl() as crawl_id:
+            for data in self._iter_page_data(page_size, prefetch, crawl_id=crawl_id):
+                yield from self._parse_stream(iter(data.get("content", [])), crawl_id)
     
-    def get_connector_by_id(self, connector_id: str) -> Optional[AWSConnector]:
+    def _iter_connectors_streaming(self, page_size: int) -> Iterator[AWSConnector]:
         """
-        Find a specific connector by its ID.
+        Stream-decode every page in turn, tracked as one crawl.
+        
+        If a page times out part-way with adaptive paging on, the crawl
+        resumes at a smaller size from the first record not yet yielded;
+        other pages that break off are re-requested from that record at
+        the same size, under the transport's retry policy.
+        A page at a size the server has not yet served as requested is held
+        back until its envelope says which records it holds (a capped
+        pageSize shifts where the page starts).
+        """
+        tuner = self._page_tuner(page_size)
+        crawl_id = self.metrics.start_crawl()
+        attempt = 0  # Retries of the current page after a body broke off
+        try:
+            while True:
+                page, size, skip = tuner.next_request()
+                hold = tuner.offset > 0 and size > tuner.confirmed
+                request_metrics = RequestMetrics(page=page, page_size=size, crawl=crawl_id, retries=attempt)
+                envelope: Dict[str, Any] = {}
+                items = self._stream_page(page, size, envelope, request_metrics)
+                if not hold:
+                    items = itertools.islice(items, skip, None)
+                held: List[AWSConnector] = []
+                delivered = 0
+                try:
+                    for connector in self._parse_stream(items, crawl_id):
+                        if hold:
+                            held.append(connector)
+                            continue
+                        delivered += 1
+                        yield connector
+                except requests.RequestException as e:
+                    tuner.advance(delivered)
+                    if is_timeout(e) and tuner.shrink():
+                        continue
+                    if self.transport.retry_read(e, attempt):
+                        attempt += 1
+                        continue
+                    raise
+                served = served_page_size(envelope, size)
+                skip = tuner.served(page, size, served)
+                if hold:
+                    if skip is None or (skip and skip >= len(held) and not envelope.get("last", True)):
+                        continue
+                    for connector in held[skip:]:
+                        delivered += 1
+                        yield connector
+                request_metrics.page_size = served
+                attempt = 0
+                tuner.advance(delivered)
+                tuner.observe(request_metrics, envelope.get("totalElements"))
+                if envelope.get("last", True) or not request_metrics.records:
+                    return
+        finally:
+            self.metrics.end_crawl(crawl_id)
+            self._save_page_size(tuner)
+    
+    def _get_all_connectors_concurrent(self, page_size: int, max_workers: int) -> List[AWSConnector]:
+        """
+        Fetch page 0, then fan out over the remaining pages reported by totalPages.
+        """
+        if self.config.adaptive_paging:
+            # Pages are fetched in parallel, so use the tenant's learned size as-is
+            page_size = self._page_tuner(page_size).page_size
+        with self.metrics.track_crawl() as crawl_id:
+            first = self._fetch_page(0, page_size, crawl_id)
+            all_connectors = list(first.connectors)
+            total_pages = first.pagination.total_pages
+            
+            if first.is_last or total_pages <= 1:
+                return all_connectors
+            
+            for response in self._fetch_remaining_pages(range(1, total_pages), page_size, max_workers, crawl_id):
+                all_connectors.extend(response.connectors)
+            return all_connectors
+    
+    def _fetch_remaining_pages(
+        self,
+        pages: range,
+        page_size: int,
+        max_workers: int,
+        crawl_id: int = 0
+    ) -> List[ConnectorResponse]:
+        """
+        Fetch the given pages on a bounded thread pool sharing self.session.
+        
+        Responses are returned in page order. If any page fails, pages that
+        have not started yet are cancelled and the first error is re-raised.
+        """
+        workers = max(1, min(max_workers, len(pages)))
+        logger.info(f"Fetching {len(pages)} remaining pages with {workers} workers")
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qualys-page")
+        try:
+            futures = [
+                executor.submit(self._fetch_page, page, page_size, crawl_id)
+                for page in pages
+            ]
+            return [future.result() for future in futures]
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+    
+    def query(
+        self,
+        status: FilterValue = None,
+        is_disabled: Optional[bool] = None,
+        aws_account_id: FilterValue = None,
+        region_code: FilterValue = None,
+        qualys_tags: FilterValue = None,
+        is_gov_cloud: Optional[bool] = None,
+        sort: str = "",
+        limit: Optional[int] = None,
+        page_size: int = 50
+    ) -> List[AWSConnector]:
+        """
+        Return the connectors matching every given filter (see query.py).
+        
+        Filters the API supports are sent as the filter query parameter when
+        config.filter_pushdown is on. All filters are also checked on the raw
+        records before parsing, so only matching records are parsed. Without
+        sort, the crawl stops as soon as `limit` matches were found.
         
         Args:
-            connector_id: The connector UUID to search for
+            status: Accepted state(s) (API field: state)
+            is_disabled: Match enabled (False) or disabled (True) connectors
+            aws_account_id: Accepted AWS account ID(s)
+            region_code: Accepted region code(s)
+            qualys_tags: Match connectors carrying any of these tags
+            is_gov_cloud: Match GovCloud (True) or commercial (False) connectors
+            sort: AWSConnector attribute to sort by, "-" prefix for descending
+            limit: Maximum number of connectors returned
+            page_size: Number of items per page
             
         Returns:
-            AWSConnector if found, None otherwise
+            Matching AWSConnector objects (page order unless sorted)
         """
-        connectors = self.get_all_connectors()
-        for connector in connectors:
-            if connector.connector_id == connector_id:
-                return connector
-        return None
+        spec = ConnectorQuery(
+            status=status, is_disabled=is_disabled, aws_account_id=aws_account_id,
+            region_code=region_code, qualys_tags=qualys_tags, is_gov_cloud=is_gov_cloud,
+            sort=sort, limit=limit
+        )
+        if spec.limit == 0:
+            return []
+        matches = spec.predicate()
+        query_params = spec.api_params() if self.config.filter_pushdown else {}
+        with self.metrics.track_crawl() as crawl_id:
+            pages = self._iter_page_data(page_size, query_params=query_params, crawl_id=crawl_id)
+            try:
+                records = (record for data in pages for record in data.get("content", []) if matches(record))
+                if not spec.sort and spec.limit is not None:
+                    records = itertools.islice(records, spec.limit)
+                connectors = self._parse_stream(records, crawl_id)
+                if not spec.sort:
+                    return list(connectors)
+                attr, descending = spec.sort_key
+                key = attrgetter(attr)
+                if spec.limit is not None:
+                    # Keep only the best `limit` matches while scanning
+                    select = heapq.nlargest if descending else heapq.nsmallest
+                    return select(spec.limit, connectors, key=key)
+                return sorted(connectors, key=key, reverse=descending)
+            finally:
+                pages.close()  # Stops the crawl (and any prefetch) on an early return
     
-    def to_normalized_dict(self, connector: AWSConnector) -> Dict[str, Any]:
+    def _get_cache(self, refresh: bool = False) -> ConnectorCache:
         """
-        Convert connector to normalized dictionary format.
+        Return the connector cache, crawling the API first if it is stale.
         
-        This uses the BASELINE SCHEMA field names (snake_case) which differ
-        from the actual API response (camelCase). CARE should detect this mismatch.
-        Fields prefixed with # NOT-IN-BASELINE are beyond the baseline schema.
+        Only one thread crawls at a time; others wait and reuse its result.
         """
-        return {
-            "name": connector.name,
-            "connector_id": connector.connector_id,  # Should be 'connectorId'
-            "description": connector.description,
-            "provider": connector.provider,
-            "status": connector.status,  # Should be 'state'
-            "total_assets": connector.total_assets,  # Should be 'totalAssets'
-            "last_synced_on": connector.last_synced_on,  # Should be 'lastSyncedOn'
-            "is_gov_cloud": connector.is_gov_cloud,  # Should be 'isGovCloud'
-            "is_china_region": connector.is_china_region,  # Should be 'isChinaRegion'
-            "aws_account_id": connector.aws_account_id,  # Should be 'awsAccountId'
-            "is_disabled": connector.is_disabled,  # Should be 'isDisabled'
-            "polling_frequency": {  # Should be 'pollingFrequency'
-                "hours": connector.polling_frequency.hours,
-                "minutes": connector.polling_frequency.minutes,
-                "seconds": connector.polling_frequency.seconds  # NOT-IN-BASELINE
-            },
-            "error": connector.error,
-            "base_account_id": connector.base_account_id,  # Should be 'baseAccountId'
-            "external_id": connector.external_id,  # Should be 'externalId'
-            "arn": connector.arn,
-            # --- Fields NOT in baseline_schema.json ---
-            "next_synced_on": connector.next_synced_on,          # NOT-IN-BASELINE (nextSyncedOn)
-            "remediation_enabled": connector.remediation_enabled, # NOT-IN-BASELINE (remediationEnabled)
-            "qualys_tags": connector.qualys_tags,                 # NOT-IN-BASELINE (qualysTags)
-            "portal_connector_uuid": connector.portal_connector_uuid,  # NOT-IN-BASELINE (portalConnectorUuid)
-            "is_portal_connector": connector.is_portal_connector, # NOT-IN-BASELINE (isPortalConnector)
-            "account_alias": connector.account_alias,             # NOT-IN-BASELINE (accountAlias)
-            "region_code": connector.region_code                  # NOT-IN-BASELINE (regionCode)
-        }
+        if refresh or not self.cache.is_fresh():
+            with self._cache_refresh_lock:
+                if refresh or not self.cache.is_fresh():
+                    self.cache.load(self.get_all_connectors(concurrent=True))
+        return self.cache
+    
+    def invalidate_cache(self) -> None:
+        """Drop the cached inventory so the next lookup re-crawls the API."""
+        self.cache.invalidate()
+    
+    def get_connector_by_id(self, connector_id: str, refresh: bool = False) -> Optional[AWSConnector]:
+        """
+        Find a specific connector by its ID.
+        
+        Args:
+            connector_id: The connector UUID to search for
+            refresh: Force a re-crawl even if the cache is still fresh
+            
+        Returns:
+            AWSConnector if found, None otherwise
+        """
+        return self._get_cache(refresh).get(connector_id)
+    
+    def get_connectors_by_account_id(self, aws_account_id: str, refresh: bool = False) -> List[AWSConnector]:
+        """Find all connectors for an AWS account ID."""
+        return self._get_cache(refresh).find("aws_account_id", aws_account_id)
+    
+    def get_connectors_by_status(self, status: str, refresh: bool = False) -> List[AWSConnector]:
+        """Find all connectors in the given status (API field: state)."""
+        return self._get_cache(refresh).find("status", status)
+    
+    def get_connectors_by_region(self, region_code: str, refresh: bool = False) -> List[AWSConnector]:
+        """Find all connectors with the given region code."""
+        return self._get_cache(refresh).find("region_code", region_code)
+    
+    def get_connectors_by_tag(self, tag: str, refresh: bool = False) -> List[AWSConnector]:
+        """Find all connectors carrying the given Qualys tag."""
+        return self._get_cache(refresh).find("qualys_tags", tag)
 
 
 def main():
     """Main function to demonstrate connector usage."""
+    logging.basicConfig(level=logging.INFO)
     try:
         # Initialize connector (will use environment variables for auth)
         connector = QualysAWSConnector()
@@ -391,9 +1091,10 @@ def main():
         print(f"\n{'='*60}")
         print("NORMALIZED OUTPUT (Baseline Schema Format)")
         print(f"{'='*60}")
-        for conn in response.connectors:
-            normalized = connector.to_normalized_dict(conn)
-            print(json.dumps(normalized, indent=2))
+        # One compact JSON object per line, batched (see exporters.py)
+        from exporters import NDJSONExporter
+        with NDJSONExporter(sys.stdout, naming="baseline") as exporter:
+            exporter.write_all(response.connectors)
             
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
@@ -0,0 +1,98 @@
+"""
+In-process cache of AWS connectors with lookup indexes.
+
+The cache holds one full inventory snapshot with a primary index on
+connector_id and secondary indexes on the fields enrichment jobs look up by.
+Entries expire as a whole after the configured TTL.
+"""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from connector import AWSConnector
+
+
+class ConnectorCache:
+    """
+    Indexed, TTL-bound snapshot of the connector inventory.
+    
+    A TTL of 0 (or less) disables caching: the cache is never fresh, so every
+    lookup through QualysAWSConnector triggers a new crawl.
+    """
+    
+    # Secondary indexes: attribute name on AWSConnector
+    INDEXED_FIELDS = ("aws_account_id", "status", "region_code", "qualys_tags")
+    
+    def __init__(self, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl: Seconds a loaded snapshot stays valid
+            clock: Monotonic time source (overridable for testing)
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._connectors: List["AWSConnector"] = []
+        self._by_id: Dict[str, "AWSConnector"] = {}
+        self._indexes: Dict[str, Dict[str, List["AWSConnector"]]] = {
+            name: {} for name in self.INDEXED_FIELDS
+        }
+    
+    def is_fresh(self) -> bool:
+        """Return True if a snapshot is loaded and has not expired."""
+        loaded_at = self._loaded_at
+        return loaded_at is not None and self._clock() - loaded_at < self.ttl
+    
+    def load(self, connectors: Iterable["AWSConnector"]) -> None:
+        """Replace the snapshot with the given connectors and rebuild all indexes."""
+        connectors = list(connectors)
+        by_id: Dict[str, "AWSConnector"] = {}
+        indexes: Dict[str, Dict[str, List["AWSConnector"]]] = {
+            name: {} for name in self.INDEXED_FIELDS
+        }
+        
+        for connector in connectors:
+            by_id[connector.connector_id] = connector
+            for name, index in indexes.items():
+                value = getattr(connector, name)
+                # List-valued fields (qualys_tags) are indexed per element
+                keys = value if isinstance(value, list) else (value,)
+                for key in keys:
+                    index.setdefault(key, []).append(connector)
+        
+        with self._lock:
+            self._connectors = connectors
+            self._by_id = by_id
+            self._indexes = indexes
+            self._loaded_at = self._clock()
+    
+    def invalidate(self) -> None:
+        """Drop the current snapshot so the next lookup reloads it."""
+        with self._lock:
+            self._loaded_at = None
+            self._connectors = []
+            self._by_id = {}
+            self._indexes = {name: {} for name in self.INDEXED_FIELDS}
+    
+    def all(self) -> List["AWSConnector"]:
+        """Return every cached connector."""
+        return list(self._connectors)
+    
+    def get(self, connector_id: str) -> Optional["AWSConnector"]:
+        """Look up a connector by its ID."""
+        return self._by_id.get(connector_id)
+    
+    def find(self, field_name: str, value: str) -> List["AWSConnector"]:
+        """
+        Look up connectors through a secondary index.
+        
+        Raises:
+            KeyError: If field_name is not one of INDEXED_FIELDS
+        """
+        return list(self._indexes[field_name].get(value, []))
+    
+    def __len__(self) -> int:
+        return len(self._connectors)
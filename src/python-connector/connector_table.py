@@ -0,0 +1,326 @@
+"""
+Columnar storage for large AWS connector inventories.
+
+ConnectorTable keeps one column per AWSConnector field instead of one object
+per connector:
+- low-cardinality strings (provider, status, region_code, ...) are
+  dictionary-encoded: each distinct value is stored once and rows hold an
+  array of small integer codes
+- integer and boolean fields live in typed array.array columns
+- qualys_tags are stored flattened (tag codes plus per-row offsets)
+- high-cardinality strings (name, connector_id, arn, ...) are plain lists
+
+Null string values (None) are kept, as their own dictionary entry in
+categorical columns. append() is all-or-nothing: a connector whose integer
+fields cannot be stored raises TypeError without changing the table. Rows are materialized back into AWSConnector objects
+only on demand; take() and filter() copy column slices without doing so.
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from connector import AWSConnector, PollingFrequency
+
+# Dictionary-encoded string columns (repeated values)
+CATEGORICAL_FIELDS = (
+    "provider", "status", "region_code", "aws_account_id",
+    "base_account_id", "error", "description", "account_alias",
+)
+
+# Plain string columns (mostly unique per connector)
+STRING_FIELDS = (
+    "name", "connector_id", "last_synced_on", "next_synced_on",
+    "external_id", "arn", "portal_connector_uuid",
+)
+
+# array.array typecode per numeric column
+INT_FIELDS = {
+    "total_assets": "q",
+    "polling_hours": "l",
+    "polling_minutes": "l",
+    "polling_seconds": "l",
+}
+
+BOOL_FIELDS = (
+    "is_gov_cloud", "is_china_region", "is_disabled",
+    "remediation_enabled", "is_portal_connector",
+)
+
+
+class _Categorical:
+    """Dictionary-encoded string column."""
+
+    __slots__ = ("values", "codes", "_index")
+
+    def __init__(self) -> None:
+        self.values: List[Optional[str]] = []
+        self.codes = array("I")
+        self._index: Dict[Optional[str], int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            if value.__class__ is str:
+                value = sys.intern(value)
+            self.values.append(value)
+            self._index[value] = code
+        return code
+
+    def append(self, value: Optional[str]) -> None:
+        self.codes.append(self.encode(value))
+
+    def code_of(self, value: Optional[str]) -> int:
+        """Return the code for value, or -1 if it never occurs."""
+        return self._index.get(value, -1)
+
+    def take_codes(self, codes: Iterable[int]) -> "_Categorical":
+        """Return a column holding the given codes, re-encoded to the values they use."""
+        taken = _Categorical()
+        remap: Dict[int, int] = {}
+        values = self.values
+        for code in codes:
+            new = remap.get(code)
+            if new is None:
+                new = remap[code] = len(taken.values)
+                taken.values.append(values[code])
+                taken._index[values[code]] = new
+            taken.codes.append(new)
+        return taken
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+
+class ConnectorTable:
+    """
+    Compact columnar container of AWS connectors.
+
+    Example:
+        table = ConnectorTable.from_connectors(connector.iter_connectors())
+        disabled = table.filter(is_disabled=True)
+        assets_per_account = table.sum_by("aws_account_id")
+    """
+
+    def __init__(self) -> None:
+        self._categorical = {name: _Categorical() for name in CATEGORICAL_FIELDS}
+        self._strings: Dict[str, List[str]] = {name: [] for name in STRING_FIELDS}
+        self._ints = {name: array(code) for name, code in INT_FIELDS.items()}
+        self._bools = {name: array("b") for name in BOOL_FIELDS}
+        self._tags = _Categorical()  # codes hold every row's tags back to back
+        self._tag_offsets = array("I", [0])
+        self._size = 0
+
+    @classmethod
+    def from_connectors(cls, connectors: Iterable[AWSConnector]) -> "ConnectorTable":
+        """Build a table from any iterable of connectors (e.g. iter_connectors())."""
+        table = cls()
+        table.extend(connectors)
+        return table
+
+    def append(self, connector: AWSConnector) -> None:
+        """
+        Add one connector as a new row.
+
+        Integer fields are checked before any column is written (None is
+        stored as 0, like the compiled parser reads a null), and a failure
+        while writing truncates every column back, so a connector that
+        cannot be stored leaves the table unchanged.
+
+        Raises:
+            TypeError: If total_assets or a polling frequency field is not an integer
+        """
+        frequency = connector.polling_frequency
+        ints = {
+            "total_assets": connector.total_assets,
+            "polling_hours": getattr(frequency, "hours", None),
+            "polling_minutes": getattr(frequency, "minutes", None),
+            "polling_seconds": getattr(frequency, "seconds", None),
+        }
+        for name, value in ints.items():
+            if value is None:
+                ints[name] = 0
+            elif value.__class__ is not int:
+                raise TypeError(f"Cannot store {name}={value!r} of connector {connector.connector_id!r}")
+        tags = connector.qualys_tags
+        if tags is None:
+            tags = ()
+        elif isinstance(tags, str):
+            tags = (tags,)
+        try:
+            for name, column in self._categorical.items():
+                column.append(getattr(connector, name))
+            for name, column in self._strings.items():
+                column.append(getattr(connector, name))
+            for name, value in ints.items():
+                self._ints[name].append(value)
+            for name, column in self._bools.items():
+                column.append(1 if getattr(connector, name) else 0)
+            for tag in tags:
+                self._tags.append(tag)
+            self._tag_offsets.append(len(self._tags.codes))
+        except BaseException:
+            self._truncate()
+            raise
+        self._size += 1
+
+    def _truncate(self) -> None:
+        """Cut every column back to self._size rows (after a failed append)."""
+        size = self._size
+        for column in self._categorical.values():
+            del column.codes[size:]
+        for values in self._strings.values():
+            del values[size:]
+        for column in self._ints.values():
+            del column[size:]
+        for column in self._bools.values():
+            del column[size:]
+        del self._tags.codes[self._tag_offsets[size]:]
+        del self._tag_offsets[size + 1:]
+
+    def extend(self, connectors: Iterable[AWSConnector]) -> None:
+        """Add connectors as new rows."""
+        for connector in connectors:
+            self.append(connector)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[AWSConnector]:
+        for row in range(self._size):
+            yield self.row(row)
+
+    def tags(self, row: int) -> List[str]:
+        """Return the Qualys tags of one row."""
+        values = self._tags.values
+        codes = self._tags.codes[self._tag_offsets[row]:self._tag_offsets[row + 1]]
+        return [values[code] for code in codes]
+
+    def row(self, row: int) -> AWSConnector:
+        """Materialize one row as an AWSConnector."""
+        if not 0 <= row < self._size:
+            raise IndexError(f"row {row} out of range")
+        values: Dict[str, Any] = {name: column[row] for name, column in self._categorical.items()}
+        values.update((name, column[row]) for name, column in self._strings.items())
+        values.update((name, bool(column[row])) for name, column in self._bools.items())
+        values["total_assets"] = self._ints["total_assets"][row]
+        values["polling_frequency"] = PollingFrequency(
+            hours=self._ints["polling_hours"][row],
+            minutes=self._ints["polling_minutes"][row],
+            seconds=self._ints["polling_seconds"][row]
+        )
+        values["qualys_tags"] = self.tags(row)
+        return AWSConnector(**values)
+
+    def column(self, name: str) -> Sequence[Any]:
+        """
+        Return one column as a sequence of values.
+
+        Numeric columns are returned as the underlying array (no copy);
+        boolean and string columns are decoded into a list.
+        """
+        if name in self._ints:
+            return self._ints[name]
+        if name in self._bools:
+            return [bool(value) for value in self._bools[name]]
+        if name in self._strings:
+            return self._strings[name]
+        if name in self._categorical:
+            column = self._categorical[name]
+            values = column.values
+            return [values[code] for code in column.codes]
+        if name == "qualys_tags":
+            return [self.tags(row) for row in range(self._size)]
+        raise KeyError(f"Unknown column: {name}")
+
+    def select(self, **criteria: Any) -> List[int]:
+        """
+        Return the row indexes matching every field=value criterion.
+
+        Categorical columns compare integer codes, so the value is looked up
+        once per call rather than compared as a string per row. For
+        qualys_tags the criterion matches rows carrying that tag.
+        """
+        rows: Iterable[int] = range(self._size)
+        for name, value in criteria.items():
+            rows = self._match(name, value, rows)
+        return list(rows)
+
+    def _match(self, name: str, value: Any, rows: Iterable[int]) -> List[int]:
+        if name in self._categorical:
+            code = self._categorical[name].code_of(value)
+            codes = self._categorical[name].codes
+            return [row for row in rows if codes[row] == code]
+        if name in self._bools:
+            flag = 1 if value else 0
+            column = self._bools[name]
+            return [row for row in rows if column[row] == flag]
+        if name in self._ints:
+            column = self._ints[name]
+            return [row for row in rows if column[row] == value]
+        if name in self._strings:
+            column = self._strings[name]
+            return [row for row in rows if column[row] == value]
+        if name == "qualys_tags":
+            code = self._tags.code_of(value)
+            codes, offsets = self._tags.codes, self._tag_offsets
+            return [row for row in rows if code in codes[offsets[row]:offsets[row + 1]]]
+        raise KeyError(f"Unknown column: {name}")
+
+    def take(self, rows: Iterable[int]) -> "ConnectorTable":
+        """
+        Return a new table containing the given rows, in order.
+
+        Columns are sliced directly: categorical codes are copied and
+        re-encoded against the values the selected rows use, without
+        materializing any AWSConnector.
+        """
+        rows = list(rows)
+        for row in rows:
+            if not 0 <= row < self._size:
+                raise IndexError(f"row {row} out of range")
+        table = ConnectorTable()
+        for name, column in self._categorical.items():
+            codes = column.codes
+            table._categorical[name] = column.take_codes([codes[row] for row in rows])
+        for name, values in self._strings.items():
+            table._strings[name] = [values[row] for row in rows]
+        for name, numbers in self._ints.items():
+            table._ints[name] = array(numbers.typecode, [numbers[row] for row in rows])
+        for name, flags in self._bools.items():
+            table._bools[name] = array("b", [flags[row] for row in rows])
+        tag_codes, offsets = self._tags.codes, self._tag_offsets
+        table._tags = self._tags.take_codes(
+            code for row in rows for code in tag_codes[offsets[row]:offsets[row + 1]]
+        )
+        position = 0
+        for row in rows:
+            position += offsets[row + 1] - offsets[row]
+            table._tag_offsets.append(position)
+        table._size = len(rows)
+        return table
+
+    def filter(self, **criteria: Any) -> "ConnectorTable":
+        """Return a new table with the rows matching every field=value criterion."""
+        return self.take(self.select(**criteria))
+
+    def count_by(self, key: str) -> Dict[str, int]:
+        """Count rows per distinct value of a categorical column."""
+        column = self._categorical[key]
+        counts = [0] * len(column.values)
+        for code in column.codes:
+            counts[code] += 1
+        return {value: count for value, count in zip(column.values, counts) if count}
+
+    def sum_by(self, key: str, value: str = "total_assets") -> Dict[str, int]:
+        """Sum a numeric column per distinct value of a categorical column."""
+        column = self._categorical[key]
+        totals = [0] * len(column.values)
+        for code, amount in zip(column.codes, self._ints[value]):
+            totals[code] += amount
+        return {name: total for name, total in zip(column.values, totals)}
+
+    def sum(self, value: str = "total_assets") -> int:
+        """Sum a numeric column over all rows."""
+        return sum(self._ints[value])
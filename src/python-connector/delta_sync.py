@@ -0,0 +1,156 @@
+"""
+Incremental delta sync for Qualys AWS connectors.
+
+Each run crawls the raw inventory, hashes every record and compares the
+hashes with the previous run stored in a local SQLite file keyed by
+connectorId. Only added and changed records are parsed into AWSConnector
+objects; unchanged records are skipped before _parse_connector runs.
+
+Sync timestamps (VOLATILE_FIELDS) move on every connector sync and are left
+out of the hash, so a record only counts as changed when its content does.
+Records without a connectorId cannot be tracked and are skipped.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from connector import AWSConnector, QualysAWSConnector
+
+logger = logging.getLogger(__name__)
+
+# Fields left out of content_hash (live and baseline names)
+VOLATILE_FIELDS = frozenset({
+    "lastSyncedOn", "nextSyncedOn",
+    "last_synced_on", "next_synced_on",
+})
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Return a stable hash of a raw connector record (key order and VOLATILE_FIELDS independent)."""
+    stable = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    payload = json.dumps(stable, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def record_id(record: Dict[str, Any]) -> str:
+    """Return the connector ID of a raw record (baseline or live field name)."""
+    return record.get("connector_id", record.get("connectorId", ""))
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one delta sync run."""
+    added: List[AWSConnector] = field(default_factory=list)
+    changed: List[AWSConnector] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)  # connector IDs
+    unchanged: int = 0
+    
+    @property
+    def has_changes(self) -> bool:
+        """True if anything was added, changed or removed."""
+        return bool(self.added or self.changed or self.removed)
+
+
+class SnapshotStore:
+    """
+    File-backed store of the last seen inventory: connectorId -> content hash.
+    """
+    
+    def __init__(self, path: str = "connector_snapshot.db"):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS connectors ("
+            "connector_id TEXT PRIMARY KEY, "
+            "content_hash TEXT NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def load_hashes(self) -> Dict[str, str]:
+        """Return the stored connectorId -> hash mapping."""
+        return dict(self._conn.execute("SELECT connector_id, content_hash FROM connectors"))
+    
+    def apply(self, upserts: Iterable[Tuple[str, str]], removed: Iterable[str]) -> None:
+        """Write new/changed hashes and delete removed IDs in one transaction."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO connectors (connector_id, content_hash) VALUES (?, ?) "
+                "ON CONFLICT(connector_id) DO UPDATE SET content_hash = excluded.content_hash",
+                upserts
+            )
+            self._conn.executemany(
+                "DELETE FROM connectors WHERE connector_id = ?",
+                ((connector_id,) for connector_id in removed)
+            )
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+    
+    def __enter__(self) -> "SnapshotStore":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DeltaSync:
+    """
+    Sync mode on top of QualysAWSConnector that reports only inventory changes.
+    """
+    
+    def __init__(self, connector: QualysAWSConnector, store: SnapshotStore):
+        self.connector = connector
+        self.store = store
+    
+    def run(self, page_size: int = 50) -> SyncResult:
+        """
+        Crawl the inventory and diff it against the stored snapshot.
+        
+        The snapshot is only updated after the whole crawl succeeds, so a
+        failed run leaves the previous state intact.
+        
+        Returns:
+            SyncResult with parsed added/changed connectors and removed IDs
+        """
+        previous = self.store.load_hashes()
+        result = SyncResult()
+        upserts: List[Tuple[str, str]] = []
+        seen = set()
+        
+        for record in self.connector.iter_raw_connectors(page_size=page_size):
+            connector_id = record_id(record)
+            if not connector_id:
+                logger.warning(f"Delta sync: skipping record without a connectorId ({record.get('name', '?')})")
+                continue
+            digest = content_hash(record)
+            seen.add(connector_id)
+            
+            old_digest = previous.get(connector_id)
+            if old_digest == digest:
+                result.unchanged += 1
+                continue
+            
+            parsed = self.connector._parse_connector(record)
+            if old_digest is None:
+                result.added.append(parsed)
+            else:
+                result.changed.append(parsed)
+            upserts.append((connector_id, digest))
+        
+        result.removed = [connector_id for connector_id in previous if connector_id not in seen]
+        self.store.apply(upserts, result.removed)
+        
+        logger.info(
+            f"Delta sync: {len(result.added)} added, {len(result.changed)} changed, "
+            f"{len(result.removed)} removed, {result.unchanged} unchanged"
+        )
+        return result
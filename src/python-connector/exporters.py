@@ -0,0 +1,365 @@
+"""
+Bulk streaming exporters for AWS connector inventories.
+
+Exporters consume any iterable of AWSConnector (typically
+QualysAWSConnector.iter_connectors()) and write in batches without building
+a normalized dict per record:
+
+- ndjson:   one JSON object per line, encoded by a generated per-naming
+            function (string escaping via the C json encoder)
+- csv:      flat rows via csv.writer.writerows, polling frequency flattened
+            into dotted columns and qualys_tags joined with ';'
+- columnar: one JSON line per batch holding a list per column (row groups)
+- parquet:  Apache Parquet row groups (requires the optional pyarrow package)
+
+Field names are either the baseline snake_case names (as in
+to_normalized_dict) or the live camelCase API names.
+"""
+
+import csv
+import dataclasses
+import json
+import sys
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+from connector import AWSConnector, PollingFrequency
+from schema_compiler import live_name
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # Parquet export unavailable; other formats still work
+
+NAMINGS = ("baseline", "live")
+TAG_SEPARATOR = ";"
+
+
+def _kind(annotation: Any) -> str:
+    if annotation is PollingFrequency:
+        return "polling_frequency"
+    if annotation in (str, int, bool):
+        return annotation.__name__
+    return "tags"  # List[str]
+
+
+# (attribute, kind) for every AWSConnector field, in to_normalized_dict order
+FIELDS: List[Tuple[str, str]] = [(f.name, _kind(f.type)) for f in dataclasses.fields(AWSConnector)]
+FREQUENCY_FIELDS = [f.name for f in dataclasses.fields(PollingFrequency)]
+
+
+def field_name(attr: str, naming: str) -> str:
+    """Return the exported name of an AWSConnector attribute."""
+    if naming not in NAMINGS:
+        raise ValueError(f"Unknown naming: {naming} (expected one of {NAMINGS})")
+    return attr if naming == "baseline" else live_name(attr)
+
+
+def flat_columns(naming: str) -> List[Tuple[str, str, str]]:
+    """
+    Return (column name, attribute, kind) for flat formats.
+
+    The polling frequency is flattened into one integer column per sub-field
+    (e.g. polling_frequency.hours).
+    """
+    columns = []
+    for attr, kind in FIELDS:
+        name = field_name(attr, naming)
+        if kind == "polling_frequency":
+            columns.extend((f"{name}.{sub}", f"{attr}.{sub}", "int") for sub in FREQUENCY_FIELDS)
+        else:
+            columns.append((name, attr, kind))
+    return columns
+
+
+# Compact JSON for values outside the fast paths (None, wrongly typed values)
+_json = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _encode_list(value: Any) -> str:
+    """JSON for qualys_tags: joined directly when it is a list of strings."""
+    if value.__class__ is list:
+        try:
+            return "[" + ",".join(map(encode_basestring_ascii, value)) + "]"
+        except TypeError:
+            pass
+    return _json(value)
+
+
+def _join_tags(value: Any) -> Any:
+    """CSV cell for qualys_tags: a list or tuple is joined, anything else is written unchanged."""
+    if value.__class__ is list or value.__class__ is tuple:
+        try:
+            return TAG_SEPARATOR.join(value)
+        except TypeError:
+            return TAG_SEPARATOR.join(map(str, value))
+    return value
+
+
+def _tag_list(value: Any) -> list:
+    """Column value for qualys_tags: a copied list, [] for None, a lone scalar as one tag."""
+    if value.__class__ is list or value.__class__ is tuple:
+        return list(value)
+    return [] if value is None else [value]
+
+
+def _json_value(kind: str, expr: str) -> str:
+    """Generated expression encoding one value, falling back to json for None or other types."""
+    if kind == "str":
+        return f"(_s({expr}) if {expr}.__class__ is str else _j({expr}))"
+    if kind == "int":
+        return f"(_d % {expr} if {expr}.__class__ is int else _j({expr}))"
+    if kind == "bool":
+        return f"('true' if {expr} is True else 'false' if {expr} is False else _j({expr}))"
+    return f"_l({expr})"
+
+
+def _compile(source: str, name: str) -> Callable[[AWSConnector], Any]:
+    namespace: Dict[str, Any] = {
+        "_s": encode_basestring_ascii, "_d": "%d",
+        "_j": _json, "_l": _encode_list, "_join": _join_tags, "_tags": _tag_list,
+    }
+    exec(compile(source, f"<exporters:{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def compile_json_encoder(naming: str) -> Callable[[AWSConnector], str]:
+    """
+    Generate a function returning one connector as a compact JSON object string.
+
+    The output decodes to exactly to_normalized_dict(connector) for the
+    baseline naming. Values of the declared type take a fast path; None
+    (null in the API response) and wrongly typed values kept by the parser
+    are encoded with json.
+    """
+    pieces = []
+    separator = "{"
+    for attr, kind in FIELDS:
+        pieces.append(repr(f"{separator}{json.dumps(field_name(attr, naming))}:"))
+        separator = ","
+        if kind == "polling_frequency":
+            for index, sub in enumerate(FREQUENCY_FIELDS):
+                pieces.append(repr(("{" if index == 0 else ",") + f'"{sub}":'))
+                pieces.append(_json_value("int", f"pf.{sub}"))
+            pieces.append("'}'")
+        else:
+            pieces.append(_json_value(kind, f"c.{attr}"))
+    pieces.append("'}'")
+    source = (
+        "def encode(c):\n"
+        "    pf = c.polling_frequency\n"
+        f"    return ''.join(({', '.join(pieces)}))\n"
+    )
+    return _compile(source, "encode")
+
+
+def compile_row_encoder(naming: str, join_tags: bool = True) -> Callable[[AWSConnector], tuple]:
+    """
+    Generate a function returning one connector as a flat tuple (flat_columns order).
+
+    Args:
+        naming: "baseline" or "live"
+        join_tags: Join a qualys_tags list into one TAG_SEPARATOR-separated
+            string (for CSV; other values are written unchanged) instead of
+            keeping the tags as a list
+    """
+    values = []
+    for _, attr, kind in flat_columns(naming):
+        if kind == "tags":
+            values.append(f"_join(c.{attr})" if join_tags else f"_tags(c.{attr})")
+        elif attr.startswith("polling_frequency."):
+            values.append(f"pf.{attr.split('.', 1)[1]}")
+        else:
+            values.append(f"c.{attr}")
+    source = (
+        "def row(c):\n"
+        "    pf = c.polling_frequency\n"
+        f"    return ({', '.join(values)},)\n"
+    )
+    return _compile(source, "row")
+
+
+class Exporter:
+    """
+    Base class: buffers connectors and flushes them in batches.
+
+    Subclasses implement _write_batch(). Use as a context manager, or call
+    close() when done.
+    """
+
+    binary = False
+
+    def __init__(
+        self,
+        destination: Union[str, TextIO] = "-",
+        naming: str = "baseline",
+        batch_size: int = 1000
+    ):
+        """
+        Args:
+            destination: File path, "-" for stdout, or an open stream
+            naming: "baseline" (snake_case) or "live" (camelCase API names)
+            batch_size: Connectors serialized per write
+        """
+        if naming not in NAMINGS:
+            raise ValueError(f"Unknown naming: {naming} (expected one of {NAMINGS})")
+        self.naming = naming
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: List[AWSConnector] = []
+        self._owns_stream = isinstance(destination, str) and destination != "-"
+        if destination == "-":
+            self.stream = sys.stdout.buffer if self.binary else sys.stdout
+        elif isinstance(destination, str):
+            self.stream = open(destination, "wb") if self.binary else open(destination, "w", encoding="utf-8", newline="")
+        else:
+            self.stream = destination
+
+    def write(self, connector: AWSConnector) -> None:
+        """Queue one connector; a full batch is serialized and written."""
+        self._batch.append(connector)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, connectors: Iterable[AWSConnector]) -> int:
+        """Write every connector from an iterable and return how many were written."""
+        for connector in connectors:
+            self.write(connector)
+        self.flush()
+        return self.count
+
+    def flush(self) -> None:
+        """Serialize and write any buffered connectors."""
+        if self._batch:
+            self._write_batch(self._batch)
+            self.count += len(self._batch)
+            self._batch.clear()
+        self.stream.flush()
+
+    def _write_batch(self, batch: List[AWSConnector]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush remaining connectors and close the destination if we opened it."""
+        self.flush()
+        if self._owns_stream:
+            self.stream.close()
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class NDJSONExporter(Exporter):
+    """Newline-delimited JSON, one object per connector."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._encode = compile_json_encoder(self.naming)
+
+    def _write_batch(self, batch: List[AWSConnector]) -> None:
+        encode = self._encode
+        self.stream.write("\n".join([encode(c) for c in batch]))
+        self.stream.write("\n")
+
+
+class CSVExporter(Exporter):
+    """CSV with a header row; nested and list fields are flattened."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._row = compile_row_encoder(self.naming)
+        self._writer = csv.writer(self.stream, lineterminator="\n")
+        self._writer.writerow([name for name, _, _ in flat_columns(self.naming)])
+
+    def _write_batch(self, batch: List[AWSConnector]) -> None:
+        row = self._row
+        self._writer.writerows([row(c) for c in batch])
+
+
+class ColumnarJSONExporter(Exporter):
+    """
+    Columnar JSON row groups: one line per batch mapping column name to values.
+
+    Example line: {"name": ["a", "b"], "total_assets": [3, 5], ...}
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._row = compile_row_encoder(self.naming, join_tags=False)
+        self._names = [name for name, _, _ in flat_columns(self.naming)]
+
+    def _columns(self, batch: List[AWSConnector]) -> Dict[str, list]:
+        row = self._row
+        columns = zip(*[row(c) for c in batch])
+        return {name: list(column) for name, column in zip(self._names, columns)}
+
+    def _write_batch(self, batch: List[AWSConnector]) -> None:
+        self.stream.write(json.dumps(self._columns(batch), separators=(",", ":")))
+        self.stream.write("\n")
+
+
+class ParquetExporter(ColumnarJSONExporter):
+    """Apache Parquet, one row group per batch. Requires pyarrow."""
+
+    binary = True
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        super().__init__(*args, **kwargs)
+        types = {
+            "str": pyarrow.string(),
+            "int": pyarrow.int64(),
+            "bool": pyarrow.bool_(),
+            "tags": pyarrow.list_(pyarrow.string()),
+        }
+        self._schema = pyarrow.schema(
+            [(name, types[kind]) for name, _, kind in flat_columns(self.naming)]
+        )
+        self._parquet: Optional[Any] = pyarrow.parquet.ParquetWriter(self.stream, self._schema)
+
+    def _write_batch(self, batch: List[AWSConnector]) -> None:
+        table = pyarrow.Table.from_pydict(self._columns(batch), schema=self._schema)
+        self._parquet.write_table(table)
+
+    def close(self) -> None:
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._owns_stream:
+            self.stream.close()
+
+
+FORMATS: Dict[str, type] = {
+    "ndjson": NDJSONExporter,
+    "csv": CSVExporter,
+    "columnar": ColumnarJSONExporter,
+    "parquet": ParquetExporter,
+}
+
+
+def export_connectors(
+    connectors: Iterable[AWSConnector],
+    fmt: str = "ndjson",
+    destination: Union[str, TextIO] = "-",
+    naming: str = "baseline",
+    batch_size: int = 1000
+) -> int:
+    """
+    Stream connectors into the given format.
+
+    Example:
+        export_connectors(connector.iter_connectors(page_size=500), "csv", "inventory.csv")
+
+    Returns:
+        Number of connectors written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {sorted(FORMATS)})")
+    with FORMATS[fmt](destination, naming=naming, batch_size=batch_size) as exporter:
+        return exporter.write_all(connectors)
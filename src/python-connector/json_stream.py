@@ -0,0 +1,139 @@
+"""
+JSON decoding helpers for Qualys API responses.
+
+- loads(): whole-body decode using orjson when it is installed, falling back
+  to the standard library.
+- ContentStream: incremental decode of a paged envelope. Items of the
+  top-level "content" array are yielded one at a time as bytes arrive, so
+  parsing overlaps the download and the full dict tree of a large page is
+  never built. The remaining envelope fields (pageable, totalPages, last ...)
+  are available in ContentStream.envelope once the stream is exhausted.
+"""
+
+import codecs
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+try:
+    import orjson
+    loads: Callable[[Any], Any] = orjson.loads
+    BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    BACKEND = "json"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _NeedMoreData(Exception):
+    """Raised internally when the buffer ends in the middle of a token."""
+
+
+class ContentStream:
+    """
+    Incrementally decode {"content": [...], ...} from an iterable of byte chunks.
+
+    Example:
+        stream = ContentStream(response.iter_content(chunk_size=65536))
+        for item in stream:
+            handle(item)
+        total_pages = stream.envelope.get("totalPages")
+    """
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str = "content"):
+        """
+        Args:
+            chunks: Response body as byte chunks (e.g. Response.iter_content())
+            array_key: Top-level key whose array items are streamed
+        """
+        self.array_key = array_key
+        self.envelope: Dict[str, Any] = {}
+        self.items_decoded = 0
+        self.bytes_read = 0
+        self.decode_seconds = 0.0
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> None:
+        """Append the next chunk to the buffer, dropping already-consumed text."""
+        if self._eof:
+            raise ValueError("Unexpected end of JSON document")
+        if self._pos > 65536:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buf += self._utf8.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            self._buf += self._utf8.decode(chunk)
+
+    def _skip_ws(self) -> str:
+        """Skip whitespace and return the next character (reading more if needed)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            self._fill()
+
+    def _expect(self, chars: str) -> str:
+        char = self._skip_ws()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value at the current position."""
+        self._skip_ws()
+        while True:
+            start = time.perf_counter()
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                # A value touching the end of the buffer (e.g. a number) may be truncated
+                if end == len(self._buf) and not self._eof:
+                    raise _NeedMoreData
+            except (ValueError, _NeedMoreData):
+                self.decode_seconds += time.perf_counter() - start
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+            self.decode_seconds += time.perf_counter() - start
+            self._pos = end
+            return value
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._skip_ws() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self.array_key and self._skip_ws() == "[":
+                self._pos += 1
+                self.envelope[key] = []
+                yield from self._items()
+            else:
+                self.envelope[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _items(self) -> Iterator[Any]:
+        if self._skip_ws() == "]":
+            self._pos += 1
+            return
+        while True:
+            item = self._value()
+            self.items_decoded += 1
+            yield item
+            if self._expect(",]") == "]":
+                return
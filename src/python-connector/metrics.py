@@ -0,0 +1,272 @@
+"""
+Per-request instrumentation for the Qualys AWS connector.
+
+Every page request produces a RequestMetrics record (DNS, connect, TTFB and
+total time, bytes on the wire and decoded, JSON decode time, records,
+retries). Parse time is reported separately because connectors may be
+parsed lazily after the request completes. ConnectorMetrics aggregates both
+into lifetime and per-crawl CrawlStats, fans them out to registered
+callbacks, and exports a Prometheus text-format snapshot.
+
+Each crawl gets an ID from start_crawl(); requests and parse times carry
+that ID, so crawls running at the same time on one connector are counted
+separately.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the request duration histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_context = threading.local()
+
+
+def current_request() -> Optional["RequestMetrics"]:
+    """Return the RequestMetrics being filled in on this thread, if any."""
+    return getattr(_context, "request", None)
+
+
+def set_current_request(metrics: Optional["RequestMetrics"]) -> None:
+    """Mark which RequestMetrics low-level timings on this thread belong to."""
+    _context.request = metrics
+
+
+@dataclass
+class RequestMetrics:
+    """Timings and sizes for one page request (including its retries)."""
+    page: int
+    page_size: int
+    url: str = ""
+    status: int = 0
+    dns: float = 0.0  # 0 when a pooled connection was reused
+    connect: float = 0.0  # TCP + TLS setup, 0 when reused
+    ttfb: float = 0.0  # Request sent until response headers received
+    total: float = 0.0  # Request sent until body fully read
+    response_bytes: int = 0  # Decoded (decompressed) body size
+    wire_bytes: int = 0  # Body bytes received on the wire (compressed size if gzipped)
+    json_decode: float = 0.0
+    records: int = 0
+    retries: int = 0
+    throttled: int = 0  # Attempts answered with 429 or a rate-limit wait
+    not_modified: bool = False  # 304: the cached page was reused
+    error: str = ""
+    crawl: int = 0  # ID from ConnectorMetrics.start_crawl (0 = not part of a crawl)
+
+
+@dataclass
+class CrawlStats:
+    """Aggregated counters for a set of requests (one crawl or process lifetime)."""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttled: int = 0
+    not_modified: int = 0
+    records: int = 0
+    response_bytes: int = 0  # Decoded body bytes
+    wire_bytes: int = 0  # Body bytes on the wire
+    dns_seconds: float = 0.0
+    connect_seconds: float = 0.0
+    ttfb_seconds: float = 0.0
+    request_seconds: float = 0.0
+    json_decode_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    parsed_records: int = 0
+    started_at: float = 0.0  # time.time() when the crawl started
+    wall_seconds: float = 0.0  # Set when the crawl ends
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def add_request(self, metrics: RequestMetrics) -> None:
+        self.requests += 1
+        self.errors += 1 if metrics.error else 0
+        self.retries += metrics.retries
+        self.throttled += metrics.throttled
+        self.not_modified += 1 if metrics.not_modified else 0
+        self.records += metrics.records
+        self.response_bytes += metrics.response_bytes
+        self.wire_bytes += metrics.wire_bytes
+        self.dns_seconds += metrics.dns
+        self.connect_seconds += metrics.connect
+        self.ttfb_seconds += metrics.ttfb
+        self.request_seconds += metrics.total
+        self.json_decode_seconds += metrics.json_decode
+        if metrics.status:
+            self.status_codes[metrics.status] = self.status_codes.get(metrics.status, 0) + 1
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if metrics.total <= bound:
+                self.latency_buckets[index] += 1
+                break
+
+    def add_parse(self, seconds: float, records: int) -> None:
+        self.parse_seconds += seconds
+        self.parsed_records += records
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class MetricsSnapshot:
+    """Point-in-time copy of the collected statistics."""
+    totals: CrawlStats
+    last_crawl: Optional[CrawlStats]  # Most recently started crawl (may still be running)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "totals": self.totals.to_dict(),
+            "last_crawl": self.last_crawl.to_dict() if self.last_crawl else None,
+        }
+
+
+class ConnectorMetrics:
+    """
+    Thread-safe metrics hub attached to a QualysAWSConnector.
+
+    Example:
+        connector.metrics.on_request(lambda m: print(m.page, m.ttfb))
+        connector.get_all_connectors()
+        print(connector.metrics.prometheus_text())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = CrawlStats(started_at=time.time())
+        self._crawls: Dict[int, Tuple[CrawlStats, float]] = {}  # Running crawls: ID -> (stats, perf start)
+        self._crawl_ids = itertools.count(1)
+        self._last_crawl: Optional[CrawlStats] = None
+        self._request_callbacks: List[Callable[[RequestMetrics], None]] = []
+        self._parse_callbacks: List[Callable[[float, int], None]] = []
+        self._crawl_callbacks: List[Callable[[CrawlStats], None]] = []
+
+    def on_request(self, callback: Callable[[RequestMetrics], None]) -> None:
+        """Call callback with every completed RequestMetrics."""
+        self._request_callbacks.append(callback)
+
+    def on_parse(self, callback: Callable[[float, int], None]) -> None:
+        """Call callback(seconds, records) each time a page has been parsed."""
+        self._parse_callbacks.append(callback)
+
+    def on_crawl(self, callback: Callable[[CrawlStats], None]) -> None:
+        """Call callback with the crawl's CrawlStats when a crawl finishes."""
+        self._crawl_callbacks.append(callback)
+
+    def start_crawl(self) -> int:
+        """
+        Begin a new per-crawl aggregate.
+
+        Returns:
+            The crawl ID to set on its RequestMetrics (crawl) and pass to
+            record_parse and end_crawl
+        """
+        with self._lock:
+            crawl_id = next(self._crawl_ids)
+            stats = CrawlStats(started_at=time.time())
+            self._crawls[crawl_id] = (stats, time.perf_counter())
+            self._last_crawl = stats
+        return crawl_id
+
+    def end_crawl(self, crawl_id: int) -> Optional[CrawlStats]:
+        """
+        Close a crawl aggregate and notify crawl callbacks.
+
+        Returns:
+            The crawl's CrawlStats, or None if it was not running
+        """
+        with self._lock:
+            running = self._crawls.pop(crawl_id, None)
+            if running is None:
+                return None
+            stats, start = running
+            stats.wall_seconds = time.perf_counter() - start
+        for callback in self._crawl_callbacks:
+            callback(stats)
+        return stats
+
+    @contextmanager
+    def track_crawl(self) -> Iterator[int]:
+        """Run a block as one crawl: start_crawl() on entry, end_crawl() on exit."""
+        crawl_id = self.start_crawl()
+        try:
+            yield crawl_id
+        finally:
+            self.end_crawl(crawl_id)
+
+    def crawl_stats(self, crawl_id: int) -> Optional[CrawlStats]:
+        """Return a copy of a running crawl's statistics, or None if it is not running."""
+        with self._lock:
+            running = self._crawls.get(crawl_id)
+            return CrawlStats(**running[0].to_dict()) if running else None
+
+    def record_request(self, metrics: RequestMetrics) -> None:
+        """Aggregate one request (into its crawl too) and notify request callbacks."""
+        with self._lock:
+            self.totals.add_request(metrics)
+            running = self._crawls.get(metrics.crawl)
+            if running is not None:
+                running[0].add_request(metrics)
+        for callback in self._request_callbacks:
+            callback(metrics)
+
+    def record_parse(self, seconds: float, records: int, crawl_id: int = 0) -> None:
+        """Aggregate parse time for one page (into its crawl too) and notify parse callbacks."""
+        with self._lock:
+            self.totals.add_parse(seconds, records)
+            running = self._crawls.get(crawl_id)
+            if running is not None:
+                running[0].add_parse(seconds, records)
+        for callback in self._parse_callbacks:
+            callback(seconds, records)
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Return a consistent copy of lifetime and last-crawl statistics."""
+        with self._lock:
+            totals = CrawlStats(**self.totals.to_dict())
+            crawl = CrawlStats(**self._last_crawl.to_dict()) if self._last_crawl else None
+        return MetricsSnapshot(totals=totals, last_crawl=crawl)
+
+    def prometheus_text(self, prefix: str = "qualys_connector") -> str:
+        """Render lifetime totals in the Prometheus text exposition format."""
+        stats = self.snapshot().totals
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[str]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{name}{sample}" for sample in samples)
+
+        metric("requests_total", "counter", "Page requests by final HTTP status.",
+               [f'{{status="{code}"}} {count}' for code, count in sorted(stats.status_codes.items())]
+               or [" 0"])
+        metric("request_errors_total", "counter", "Page requests that raised.", [f" {stats.errors}"])
+        metric("retries_total", "counter", "Retried request attempts.", [f" {stats.retries}"])
+        metric("throttled_total", "counter", "Attempts answered with HTTP 429 or a rate-limit wait.",
+               [f" {stats.throttled}"])
+        metric("not_modified_total", "counter", "Pages answered 304 and served from the response cache.",
+               [f" {stats.not_modified}"])
+        metric("records_total", "counter", "Connector records received.", [f" {stats.records}"])
+        metric("response_bytes_total", "counter", "Decoded (decompressed) response body bytes.",
+               [f" {stats.response_bytes}"])
+        metric("wire_bytes_total", "counter", "Response body bytes received on the wire.", [f" {stats.wire_bytes}"])
+        metric("phase_seconds_total", "counter", "Time spent per request phase.", [
+            f'{{phase="dns"}} {stats.dns_seconds:.6f}',
+            f'{{phase="connect"}} {stats.connect_seconds:.6f}',
+            f'{{phase="ttfb"}} {stats.ttfb_seconds:.6f}',
+            f'{{phase="json_decode"}} {stats.json_decode_seconds:.6f}',
+            f'{{phase="parse"}} {stats.parse_seconds:.6f}',
+        ])
+
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(LATENCY_BUCKETS, stats.latency_buckets):
+            cumulative += count
+            buckets.append(f'_bucket{{le="{bound}"}} {cumulative}')
+        buckets.append(f'_bucket{{le="+Inf"}} {stats.requests}')
+        buckets.append(f"_sum {stats.request_seconds:.6f}")
+        buckets.append(f"_count {stats.requests}")
+        metric("request_duration_seconds", "histogram", "Page request duration including body download.", buckets)
+        return "\n".join(lines) + "\n"
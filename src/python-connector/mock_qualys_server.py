@@ -0,0 +1,399 @@
+"""
+Local mock of the Qualys CloudView AWS Connectors API.
+
+Serves /cloudview-api/rest/v1/aws/connectors with the Spring-style paged
+envelope (content / pageable / totalPages / last ...) so the connector can be
+exercised and benchmarked without live credentials.
+
+Usage:
+    python mock_qualys_server.py --records 5000 --port 8080
+    QUALYS_BASE_URL=http://127.0.0.1:8080 QUALYS_USERNAME=x QUALYS_PASSWORD=x python connector.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from schema_compiler import live_name
+
+ENDPOINT = "/cloudview-api/rest/v1/aws/connectors"
+
+STATES = ("SUCCESS", "SUCCESS", "SUCCESS", "ERROR", "QUEUED", "PROCESSING")
+REGIONS = ("us-east-1", "us-west-2", "eu-west-1", "eu-central-1", "ap-south-1")
+
+
+def make_record(index: int, shape: str = "camel") -> Dict[str, Any]:
+    """
+    Build one deterministic connector record.
+
+    Args:
+        index: Record number (drives every generated value)
+        shape: "camel" for the live API field names, "snake" for the
+            baseline_schema.json names
+    """
+    state = STATES[index % len(STATES)]
+    account = f"{100000000000 + index % 97:012d}"
+    if shape == "snake":
+        return {
+            "name": f"aws-connector-{index}",
+            "connector_id": f"00000000-0000-4000-8000-{index:012d}",
+            "description": f"Mock connector {index}",
+            "provider": "AWS",
+            "status": state,
+            "total_assets": (index * 37) % 5000,
+            "last_synced_on": "2024-01-01T00:00:00.000+0000",
+            "is_gov_cloud": False,
+            "is_china_region": False,
+            "aws_account_id": account,
+            "is_disabled": index % 11 == 0,
+            "polling_frequency": {"hours": 4, "minutes": 0},
+            "error": "AccessDenied" if state == "ERROR" else "",
+            "base_account_id": "123456789012",
+            "external_id": f"ext-{index}",
+            "arn": f"arn:aws:iam::{account}:role/QualysRole",
+        }
+    return {
+        "name": f"aws-connector-{index}",
+        "connectorId": f"00000000-0000-4000-8000-{index:012d}",
+        "description": f"Mock connector {index}",
+        "provider": "AWS",
+        "state": state,
+        "totalAssets": (index * 37) % 5000,
+        "lastSyncedOn": "2024-01-01T00:00:00.000+0000",
+        "nextSyncedOn": "2024-01-01T04:00:00.000+0000",
+        "isGovCloud": False,
+        "isChinaRegion": False,
+        "awsAccountId": account,
+        "isDisabled": index % 11 == 0,
+        "pollingFrequency": {"hours": 4, "minutes": 0, "seconds": 0},
+        "error": "AccessDenied" if state == "ERROR" else "",
+        "baseAccountId": "123456789012",
+        "externalId": f"ext-{index}",
+        "arn": f"arn:aws:iam::{account}:role/QualysRole",
+        "remediationEnabled": index % 3 == 0,
+        "qualysTags": [f"env:{('prod', 'dev', 'test')[index % 3]}"],
+        "portalConnectorUuid": "",
+        "isPortalConnector": False,
+        "accountAlias": f"account-{index % 97}",
+        "regionCode": REGIONS[index % len(REGIONS)],
+    }
+
+
+# Live API field name -> name in snake-shaped records (for filter queries)
+BASELINE_NAMES = {live_name(name): name for name in make_record(0, "snake")}
+
+
+def make_page(records: List[Dict[str, Any]], total: int, page: int, page_size: int, shape: str = "camel") -> Dict[str, Any]:
+    """Wrap one page of records in the paged response envelope."""
+    total_pages = (total + page_size - 1) // page_size if page_size else 0
+    sort = {"sorted": False, "empty": True, "unsorted": True}
+    if shape == "snake":
+        return {
+            "content": records,
+            "pageable": {"page_number": page, "page_size": page_size, "sort": sort,
+                         "offset": page * page_size, "paged": True, "unpaged": False},
+            "total_pages": total_pages,
+            "total_elements": total,
+            "last": page >= total_pages - 1,
+            "number": page,
+            "size": page_size,
+            "number_of_elements": len(records),
+            "sort": sort,
+            "first": page == 0,
+            "empty": not records,
+        }
+    return {
+        "content": records,
+        "pageable": {"pageNumber": page, "pageSize": page_size, "sort": dict(sort, sortBy="name"),
+                     "offset": page * page_size, "paged": True, "unpaged": False},
+        "totalPages": total_pages,
+        "totalElements": total,
+        "last": page >= total_pages - 1,
+        "number": page,
+        "size": page_size,
+        "numberOfElements": len(records),
+        "sort": sort,
+        "first": page == 0,
+        "empty": not records,
+        "apiVersion": "v1",
+        "requestId": f"mock-{page}",
+    }
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Ignores clients that hang up mid-response (e.g. a closed stream)."""
+
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class MockQualysServer:
+    """
+    Threaded HTTP server mimicking the AWS connectors endpoint.
+
+    Example:
+        with MockQualysServer(records=2000, latency=0.02) as server:
+            config = QualysAuthConfig(base_url=server.base_url, username="x", password="x")
+    """
+
+    def __init__(
+        self,
+        records: int = 1000,
+        shape: str = "camel",
+        latency: float = 0.0,
+        record_latency: float = 0.0,
+        error_rate: float = 0.0,
+        truncate_rate: float = 0.0,
+        max_page_size: Optional[int] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Args:
+            records: Total number of connectors in the inventory
+            shape: "camel" (live API names) or "snake" (baseline schema names)
+            latency: Seconds added to every response
+            record_latency: Seconds added per record in the page (server-side
+                cost that grows with pageSize)
+            error_rate: Fraction of requests answered with HTTP 503 + Retry-After: 0
+            truncate_rate: Fraction of pages whose connection is closed half-way
+                through the body
+            max_page_size: Cap applied to the requested pageSize
+            seed: Seed for error injection
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        if shape not in ("camel", "snake"):
+            raise ValueError(f"Unknown payload shape: {shape}")
+        self.records = records
+        self.shape = shape
+        self.latency = latency
+        self.record_latency = record_latency
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.max_page_size = max_page_size
+        self.stats = {"requests": 0, "errors": 0, "truncated": 0, "bytes": 0, "not_modified": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages: Dict[Tuple[int, int, str], bytes] = {}
+        self._gzipped: Dict[Tuple[int, int, str], bytes] = {}
+        self._matches: Dict[str, List[int]] = {}  # filter parameter -> matching record indexes
+        self.overrides: Dict[int, Dict[str, Any]] = {}  # record index -> replaced fields
+        self._started = formatdate(usegmt=True)  # Last-Modified of every page
+        self._httpd = _QuietHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to put in QualysAuthConfig.base_url."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Return one record, with update_record() changes applied."""
+        return dict(make_record(index, self.shape), **self.overrides.get(index, {}))
+
+    def matching(self, filter_query: str) -> List[int]:
+        """
+        Return the indexes of records matching a filter query parameter.
+
+        Supports the subset the connector sends: field:value terms joined
+        with " and " (booleans as true/false). Field names are the live API
+        names; with shape="snake" they are looked up under the baseline names.
+        """
+        indexes = self._matches.get(filter_query)
+        if indexes is None:
+            terms = [term.split(":", 1) for term in filter_query.split(" and ") if term]
+            if self.shape == "snake":
+                terms = [[BASELINE_NAMES.get(key, key), value] for key, value in terms]
+            indexes = []
+            for index in range(self.records):
+                record = self.record(index)
+                if all(str(record.get(key, "")).lower() == value.lower() for key, value in terms):
+                    indexes.append(index)
+            self._matches[filter_query] = indexes
+        return indexes
+
+    def page_body(self, page: int, page_size: int, filter_query: str = "") -> bytes:
+        """Return (and memoize) the encoded body for one page."""
+        key = (page, page_size, filter_query)
+        body = self._pages.get(key)
+        if body is None:
+            start = page * page_size
+            if filter_query:
+                indexes = self.matching(filter_query)
+                total = len(indexes)
+                records = [self.record(i) for i in indexes[start:start + page_size]]
+            else:
+                total = self.records
+                records = [self.record(i) for i in range(start, min(self.records, start + page_size))]
+            body = json.dumps(make_page(records, total, page, page_size, self.shape)).encode("utf-8")
+            self._pages[key] = body
+        return body
+
+    def update_record(self, index: int, **fields: Any) -> None:
+        """Change fields of one record (payload names, e.g. state="ERROR"); pages are rebuilt."""
+        with self._lock:
+            self.overrides.setdefault(index, {}).update(fields)
+            self._pages.clear()
+            self._gzipped.clear()
+            self._matches.clear()
+
+    def gzip_body(self, page: int, page_size: int, filter_query: str = "") -> bytes:
+        """Return (and memoize) the gzip-compressed body for one page."""
+        key = (page, page_size, filter_query)
+        body = self._gzipped.get(key)
+        if body is None:
+            body = self._gzipped[key] = gzip.compress(self.page_body(page, page_size, filter_query), compresslevel=1)
+        return body
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return True
+        return False
+
+    def _should_truncate(self) -> bool:
+        with self._lock:
+            if self.truncate_rate and self._random.random() < self.truncate_rate:
+                self.stats["truncated"] += 1
+                return True
+        return False
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                if parsed.path != ENDPOINT:
+                    self._send(404, b'{"error": "not found"}')
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    self._send(503, b'{"error": "injected"}', {"Retry-After": "0"})
+                    return
+
+                query = parse_qs(parsed.query)
+                page = int(query.get("pageNo", ["0"])[0])
+                page_size = int(query.get("pageSize", ["50"])[0])
+                if server.max_page_size:
+                    page_size = min(page_size, server.max_page_size)
+                filter_query = query.get("filter", [""])[0]
+                body = server.page_body(page, max(1, page_size), filter_query)
+                validators = {
+                    "ETag": f'"{hashlib.sha1(body).hexdigest()}"',
+                    "Last-Modified": server._started,
+                }
+                if self.headers.get("If-None-Match") == validators["ETag"]:
+                    with server._lock:
+                        server.stats["not_modified"] += 1
+                    self._send(304, b"", validators)
+                    return
+                if server.record_latency:
+                    served = max(0, min(page_size, server.records - page * page_size))
+                    time.sleep(server.record_latency * served)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = server.gzip_body(page, max(1, page_size), filter_query)
+                    validators["Content-Encoding"] = "gzip"
+                with server._lock:
+                    server.stats["bytes"] += len(body)
+                self._send(200, body, validators, truncate=server._should_truncate())
+
+            def _send(
+                self,
+                status: int,
+                body: bytes,
+                headers: Optional[Dict[str, str]] = None,
+                truncate: bool = False
+            ) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if status != 304:
+                    self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if truncate:
+                    # Promise the full Content-Length, then drop the connection
+                    body = body[:len(body) // 2]
+                    self.close_connection = True
+                if body:
+                    self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "MockQualysServer":
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-qualys", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockQualysServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description="Mock Qualys CloudView AWS connectors API")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--shape", choices=("camel", "snake"), default="camel")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per response")
+    parser.add_argument("--record-latency", type=float, default=0.0, help="seconds added per record served")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="fraction of bodies cut off half-way")
+    parser.add_argument("--max-page-size", type=int, default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = MockQualysServer(
+        records=args.records, shape=args.shape, latency=args.latency,
+        record_latency=args.record_latency, error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate, max_page_size=args.max_page_size,
+        host=args.host, port=args.port
+    )
+    print(f"Serving {args.records} mock connectors at {server.base_url}{ENDPOINT}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Multi-tenant crawl scheduler for Qualys AWS connectors.
+
+Runs crawls for many Qualys subscriptions (possibly on different platform
+URLs) from one process. Every tenant gets its own QualysAWSConnector, and
+with it its own session pool, retry policy and rate limit.
+
+In thread mode, work is scheduled page by page on one shared pool: tenants
+are served round-robin, each limited to its own max_workers pages in flight
+(one at a time for adaptive paging), and optionally capped per platform
+URL, so one huge tenant cannot starve the small ones. Process mode runs
+each tenant's whole crawl in a worker process instead. Async mode runs every
+tenant's crawl as a task on one event loop with AsyncQualysAWSConnector,
+sharing one aiohttp connection pool capped overall and per platform host
+(requires aiohttp).
+
+Tenants file (JSON):
+    {
+      "defaults": {"timeout": 60, "rate_limit": 2},
+      "tenants": [
+        {"name": "eu-prod", "base_url": "https://qualysguard.qg2.apps.qualys.eu",
+         "username": "api_eu", "password_env": "QUALYS_EU_PROD_PASSWORD"},
+        {"name": "us-dev", "base_url": "https://qualysapi.qualys.com",
+         "username": "api_us", "password": "...", "max_workers": 2}
+      ]
+    }
+"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from async_connector import AsyncQualysAWSConnector, build_client_session
+from auth_config import ConfigError, QualysAuthConfig, load_env
+from connector import AWSConnector, ConnectorResponse, QualysAWSConnector
+from metrics import CrawlStats
+from page_sizing import PageSizeTuner
+
+logger = logging.getLogger(__name__)
+
+_CONFIG_FIELDS = {f.name for f in dataclasses.fields(QualysAuthConfig)}
+
+
+def load_tenant_configs(path: str) -> Dict[str, QualysAuthConfig]:
+    """
+    Load tenant configurations from a JSON tenants file.
+
+    Each tenant entry may set any QualysAuthConfig field on top of
+    "defaults", plus "name" (required, unique) and "password_env" (name of
+    an environment variable holding the password).
+
+    Returns:
+        Validated configs keyed by tenant name, in file order
+
+    Raises:
+        ConfigError: If the file is malformed or a tenant config is invalid
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            document = json.load(f)
+        except ValueError as e:
+            raise ConfigError(f"{path}: {e}") from e
+    load_env()  # password_env may name a variable from .env
+
+    defaults = document.get("defaults", {})
+    configs: Dict[str, QualysAuthConfig] = {}
+    for entry in document.get("tenants", []):
+        entry = dict(defaults, **entry)
+        name = entry.pop("name", None)
+        if not name:
+            raise ConfigError(f"{path}: every tenant needs a name")
+        if name in configs:
+            raise ConfigError(f"{path}: duplicate tenant name {name!r}")
+        password_env = entry.pop("password_env", None)
+        if password_env:
+            entry["password"] = os.getenv(password_env, "")
+        unknown = set(entry) - _CONFIG_FIELDS
+        if unknown:
+            raise ConfigError(f"{path}: tenant {name!r} has unknown settings {sorted(unknown)}")
+        config = QualysAuthConfig(**entry)
+        try:
+            config.validate()
+        except ValueError as e:
+            raise ConfigError(f"{path}: tenant {name!r}: {e}")
+        configs[name] = config
+    if not configs:
+        raise ConfigError(f"{path}: no tenants defined")
+    return configs
+
+
+@dataclass
+class TenantResult:
+    """Outcome of one tenant's crawl."""
+    name: str
+    connectors: List[AWSConnector] = field(default_factory=list)
+    error: str = ""  # Empty on success; connectors is empty on failure
+    pages: int = 0
+    wall_seconds: float = 0.0
+    stats: Optional[CrawlStats] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class _TenantCrawl:
+    """Scheduling state of one tenant in thread mode."""
+
+    def __init__(self, name: str, connector: QualysAWSConnector, page_size: int):
+        self.name = name
+        self.connector = connector
+        self.platform = connector.config.base_url.rstrip("/")
+        self.tuner: Optional[PageSizeTuner] = (
+            connector._page_tuner(page_size) if connector.config.adaptive_paging else None
+        )
+        self.page_size = page_size
+        self.pending: Deque[int] = deque([0])
+        self.in_flight = 0
+        self.limit = 1  # Until page 0 reports totalPages
+        self.pages: Dict[int, List[AWSConnector]] = {}
+        self.error = ""
+        self.started = 0.0
+        self.wall_seconds = 0.0
+        self.crawl_id = 0  # ConnectorMetrics crawl, set when the first page is dispatched
+        self.stats: Optional[CrawlStats] = None
+
+    @property
+    def finished(self) -> bool:
+        return not self.in_flight and (bool(self.error) or not self.pending)
+
+    def fetch(self, page: int) -> ConnectorResponse:
+        """Fetch and parse one page (runs on a worker thread)."""
+        if self.tuner is not None:
+            data = self.connector._fetch_tuned_page(self.tuner, crawl_id=self.crawl_id)
+            return self.connector._parse_response(data, self.crawl_id)
+        return self.connector._fetch_page(page, self.page_size, self.crawl_id)
+
+    def completed(self, page: int, response: ConnectorResponse) -> None:
+        """Record a fetched page and queue whatever it makes fetchable."""
+        self.pages[page] = response.connectors
+        if response.is_last or not response.connectors:
+            return
+        if self.tuner is not None:
+            self.pending.append(page + 1)  # Sizes change between pages: strictly sequential
+        elif page == 0:
+            self.pending.extend(range(1, response.pagination.total_pages))
+            self.limit = self.connector.config.max_workers
+
+    def result(self) -> TenantResult:
+        stats = self.stats
+        if self.error:
+            return TenantResult(self.name, error=self.error, pages=len(self.pages),
+                                wall_seconds=self.wall_seconds, stats=stats)
+        connectors = [c for page in sorted(self.pages) for c in self.pages[page]]
+        return TenantResult(self.name, connectors, pages=len(self.pages),
+                            wall_seconds=self.wall_seconds, stats=stats)
+
+
+def _crawl_tenant(name: str, config: QualysAuthConfig, page_size: int) -> TenantResult:
+    """Crawl one tenant end to end (process mode worker)."""
+    start = time.perf_counter()
+    connector = QualysAWSConnector(config)
+    try:
+        # Adaptive tenants crawl sequentially so their page size keeps being tuned
+        connectors = connector.get_all_connectors(
+            page_size=page_size, concurrent=not config.adaptive_paging
+        )
+        stats = connector.metrics.snapshot().last_crawl
+        return TenantResult(name, connectors, pages=stats.requests if stats else 0,
+                            wall_seconds=time.perf_counter() - start, stats=stats)
+    except Exception as e:
+        logger.error(f"Tenant {name}: crawl failed: {e}")
+        return TenantResult(name, error=f"{type(e).__name__}: {e}",
+                            wall_seconds=time.perf_counter() - start,
+                            stats=connector.metrics.snapshot().last_crawl)
+    finally:
+        connector.transport.close()
+
+
+async def _crawl_tenant_async(
+    name: str,
+    config: QualysAuthConfig,
+    session: Any,
+    page_size: int
+) -> TenantResult:
+    """Crawl one tenant end to end on the shared aiohttp session (async mode)."""
+    start = time.perf_counter()
+    connector = AsyncQualysAWSConnector(config, session=session)
+    try:
+        connectors = await connector.get_all_connectors(page_size=page_size, concurrent=True)
+        stats = connector.metrics.snapshot().last_crawl
+        return TenantResult(name, connectors, pages=stats.requests if stats else 0,
+                            wall_seconds=time.perf_counter() - start, stats=stats)
+    except Exception as e:
+        logger.error(f"Tenant {name}: crawl failed: {e}")
+        return TenantResult(name, error=f"{type(e).__name__}: {e}",
+                            wall_seconds=time.perf_counter() - start,
+                            stats=connector.metrics.snapshot().last_crawl)
+
+
+class MultiTenantRunner:
+    """
+    Crawl many tenants in parallel and return results per tenant.
+
+    Example:
+        runner = MultiTenantRunner(load_tenant_configs("tenants.json"), max_workers=16,
+                                   platform_concurrency=8)
+        for name, result in runner.run(page_size=200).items():
+            print(name, len(result.connectors), result.error)
+    """
+
+    def __init__(
+        self,
+        configs: Dict[str, QualysAuthConfig],
+        max_workers: int = 8,
+        platform_concurrency: int = 0,
+        mode: str = "thread"
+    ):
+        """
+        Args:
+            configs: Tenant configs keyed by tenant name
+            max_workers: Pages (thread and async mode) or tenants (process
+                mode) in flight overall
+            platform_concurrency: Max pages in flight per platform base URL
+                across all tenants (0 = no cap; thread and async mode)
+            mode: "thread" for page-level fair scheduling, "process" for one
+                whole-tenant crawl per worker process, "async" for one task
+                per tenant on a single event loop
+        """
+        if mode not in ("thread", "process", "async"):
+            raise ValueError(f"Unknown mode: {mode} (expected 'thread', 'process' or 'async')")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if platform_concurrency and mode == "process":
+            raise ValueError("platform_concurrency is not enforced in process mode")
+        self.configs = dict(configs)
+        self.max_workers = max_workers
+        self.platform_concurrency = platform_concurrency
+        self.mode = mode
+
+    def run(self, page_size: int = 50) -> Dict[str, TenantResult]:
+        """
+        Crawl every tenant once.
+
+        A failing tenant does not affect the others; its TenantResult carries
+        the error instead of connectors.
+
+        Returns:
+            TenantResult per tenant name, in config order
+        """
+        start = time.perf_counter()
+        if self.mode == "process":
+            results = self._run_processes(page_size)
+        elif self.mode == "async":
+            results = asyncio.run(self._run_async(page_size))
+        else:
+            results = self._run_threads(page_size)
+        failed = sum(1 for r in results.values() if not r.ok)
+        logger.info(
+            f"Crawled {len(results)} tenants ({failed} failed, "
+            f"{sum(len(r.connectors) for r in results.values())} connectors) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return results
+
+    def _run_processes(self, page_size: int) -> Dict[str, TenantResult]:
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(self.configs))) as executor:
+            futures = {
+                name: executor.submit(_crawl_tenant, name, config, page_size)
+                for name, config in self.configs.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+
+    async def _run_async(self, page_size: int) -> Dict[str, TenantResult]:
+        # The pool limits are the global and per-platform caps on pages in flight
+        session = build_client_session(limit=self.max_workers, limit_per_host=self.platform_concurrency)
+        try:
+            results = await asyncio.gather(*[
+                _crawl_tenant_async(name, config, session, page_size)
+                for name, config in self.configs.items()
+            ])
+        finally:
+            await session.close()
+        return dict(zip(self.configs, results))
+
+    def _run_threads(self, page_size: int) -> Dict[str, TenantResult]:
+        crawls = [_TenantCrawl(name, QualysAWSConnector(config), page_size)
+                  for name, config in self.configs.items()]
+        order: Deque[_TenantCrawl] = deque(crawls)
+        platform_in_flight: Dict[str, int] = {}
+        running: Dict[Future, Any] = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qualys-tenant")
+        try:
+            while True:
+                while len(running) < self.max_workers:
+                    crawl = self._next_dispatchable(order, platform_in_flight)
+                    if crawl is None:
+                        break
+                    page = crawl.pending.popleft()
+                    if not crawl.started:
+                        crawl.started = time.perf_counter()
+                        crawl.crawl_id = crawl.connector.metrics.start_crawl()
+                    crawl.in_flight += 1
+                    platform_in_flight[crawl.platform] = platform_in_flight.get(crawl.platform, 0) + 1
+                    running[executor.submit(crawl.fetch, page)] = (crawl, page)
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    crawl, page = running.pop(future)
+                    crawl.in_flight -= 1
+                    platform_in_flight[crawl.platform] -= 1
+                    try:
+                        crawl.completed(page, future.result())
+                    except Exception as e:
+                        logger.error(f"Tenant {crawl.name}: page {page} failed: {e}")
+                        crawl.error = crawl.error or f"{type(e).__name__}: {e}"
+                        crawl.pending.clear()
+                    if crawl.finished:
+                        self._finish(crawl)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for crawl in crawls:
+                crawl.connector.transport.close()
+        return {crawl.name: crawl.result() for crawl in crawls}
+
+    def _next_dispatchable(
+        self,
+        order: Deque[_TenantCrawl],
+        platform_in_flight: Dict[str, int]
+    ) -> Optional[_TenantCrawl]:
+        """Pick the next tenant round-robin that has a page it may start now."""
+        for _ in range(len(order)):
+            crawl = order[0]
+            order.rotate(-1)
+            if not crawl.pending or crawl.error or crawl.in_flight >= crawl.limit:
+                continue
+            if (self.platform_concurrency
+                    and platform_in_flight.get(crawl.platform, 0) >= self.platform_concurrency):
+                continue
+            return crawl
+        return None
+
+    def _finish(self, crawl: _TenantCrawl) -> None:
+        crawl.wall_seconds = time.perf_counter() - crawl.started
+        crawl.stats = crawl.connector.metrics.end_crawl(crawl.crawl_id)
+        if crawl.tuner is not None and not crawl.error:
+            crawl.connector._save_page_size(crawl.tuner)
+        logger.info(
+            f"Tenant {crawl.name}: {'failed' if crawl.error else 'done'} after "
+            f"{len(crawl.pages)} pages in {crawl.wall_seconds:.2f}s"
+        )
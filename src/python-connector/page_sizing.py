@@ -0,0 +1,279 @@
+"""
+Adaptive page sizing for Qualys AWS connector crawls.
+
+PageSizeTuner picks pageNo/pageSize for each request of a crawl. Page sizes
+come from a ladder (page_size_min doubled up to page_size_max) so a crawl can
+switch sizes without re-reading records: offset = pageNo * pageSize stays
+aligned. After every full page the tuner:
+
+- shrinks when a page took more than half the request timeout, needed
+  retries for server errors, or timed out outright (the page is re-requested
+  at the smaller size)
+- grows while records/second keeps improving by at least MIN_GAIN, while
+  the next size is still useful (totalElements) and under MAX_PAGE_BYTES
+- keeps growing through throttling (HTTP 429 / rate-limit waits), since
+  fewer, larger requests spend less of the API quota
+
+Servers may silently cap pageSize. The tuner is told the size each response
+was actually served at (pageable.pageSize); a smaller one becomes the top of
+the ladder and pageNo/offset arithmetic is rebased on it.
+
+PageSizeStore keeps the size each tenant settled on in a small SQLite file,
+so the next crawl starts there instead of at the default page size.
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from metrics import RequestMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def is_timeout(error: BaseException) -> bool:
+    """True for connect/read timeouts, including read timeouts raised mid-stream."""
+    if isinstance(error, requests.Timeout):
+        return True
+    # Response.iter_content wraps a read timeout in requests.ConnectionError
+    return any(isinstance(arg, ReadTimeoutError) for arg in getattr(error, "args", ()))
+
+
+def served_page_size(envelope: Dict[str, Any], requested: int) -> int:
+    """
+    Return the pageSize a paged response was served at.
+
+    Read from pageable.pageSize (else size, else numberOfElements of a page
+    that is not the last); `requested` if the response does not say.
+    """
+    pageable = envelope.get("pageable")
+    size = pageable.get("pageSize") if isinstance(pageable, dict) else None
+    if size is None:
+        size = envelope.get("size")
+    if size is None and envelope.get("last") is False:
+        size = envelope.get("numberOfElements")
+    if isinstance(size, int) and not isinstance(size, bool) and size > 0:
+        return size
+    return requested
+
+
+def page_size_ladder(min_size: int, max_size: int) -> List[int]:
+    """Return min_size, 2*min_size, 4*min_size ... up to max_size."""
+    sizes = [min_size]
+    while sizes[-1] * 2 <= max_size:
+        sizes.append(sizes[-1] * 2)
+    return sizes
+
+
+class PageSizeTuner:
+    """
+    Chooses the page for each request of one crawl from what earlier pages cost.
+
+    Example:
+        tuner = PageSizeTuner(initial=50, min_size=25, max_size=1000, max_seconds=15)
+        page, size, skip = tuner.next_request()
+        ...  # fetch
+        skip = tuner.served(page, size, served_size)  # None: re-request
+        ...  # drop the first `skip` records
+        tuner.advance(len(records))
+        tuner.observe(request_metrics, total_elements)
+    """
+
+    # Minimum records/second improvement that justifies the next larger size
+    MIN_GAIN = 0.1
+    # Never grow into pages estimated to be larger than this
+    MAX_PAGE_BYTES = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        initial: int,
+        min_size: int,
+        max_size: int,
+        max_seconds: float,
+        adaptive: bool = True
+    ):
+        """
+        Args:
+            initial: Starting page size (snapped down onto the ladder)
+            min_size: Smallest page size the tuner may choose
+            max_size: Largest page size the tuner may choose
+            max_seconds: Pages slower than this make the tuner shrink
+            adaptive: If False, every request uses `initial` unchanged
+        """
+        self.adaptive = adaptive
+        self.sizes = page_size_ladder(min_size, max_size) if adaptive else [initial]
+        self.level = max([0] + [i for i, size in enumerate(self.sizes) if size <= initial])
+        self.ceiling = len(self.sizes) - 1
+        self.max_seconds = max_seconds
+        self.offset = 0  # Records delivered so far
+        self.total_elements: Optional[int] = None
+        self.observed = 0  # Full pages measured
+        self.confirmed = 0  # Largest size the server has served as requested
+        self._rates: Dict[int, float] = {}  # level -> records/second
+
+    @property
+    def page_size(self) -> int:
+        """Size the tuner currently wants."""
+        return self.sizes[self.level]
+
+    def next_request(self) -> Tuple[int, int, int]:
+        """
+        Return (pageNo, pageSize, skip) for the next request.
+
+        Uses the largest size up to the wanted one that is aligned with the
+        current offset. If none is (only after a mid-page timeout), the
+        wanted size is used and the first `skip` records of the page must be
+        dropped because they were already delivered.
+        """
+        for level in range(self.level, -1, -1):
+            size = self.sizes[level]
+            if self.offset % size == 0:
+                return self.offset // size, size, 0
+        size = self.page_size
+        return self.offset // size, size, self.offset % size
+
+    def served(self, page: int, requested: int, served: int) -> Optional[int]:
+        """
+        Account for the page size a response was actually served at.
+
+        A server that caps pageSize returns page `page` of `served`-sized
+        pages, which starts at a different offset than the one requested.
+        Sizes above the cap are dropped from the ladder (the cap becomes the
+        largest size) so later requests line up with what the server returns.
+
+        Args:
+            page: pageNo that was requested
+            requested: pageSize that was requested
+            served: pageSize the response reports
+
+        Returns:
+            How many leading records of the response were already delivered,
+            or None if it starts past the current offset and the page must be
+            re-requested
+        """
+        if not 1 <= served < requested:
+            served = requested
+        elif self.sizes[-1] > served:
+            logger.warning(f"Server capped pageSize at {served} (requested {requested}); using it as the maximum")
+            self.sizes = [size for size in self.sizes if size < served] + [served]
+            top = len(self.sizes) - 1
+            self.level = min(self.level, top)
+            self.ceiling = min(self.ceiling, top)
+            self._rates = {level: rate for level, rate in self._rates.items() if level < top}
+        self.confirmed = max(self.confirmed, served)
+        skip = self.offset - page * served
+        return skip if skip >= 0 else None
+
+    def advance(self, records: int) -> None:
+        """Record that `records` more connectors were delivered to the caller."""
+        self.offset += records
+
+    def shrink(self) -> bool:
+        """
+        Step down after a timeout and stop growing past the new size.
+
+        Returns:
+            False if already at the smallest size (the error should be raised)
+        """
+        if not self.adaptive or self.level == 0:
+            return False
+        self.level -= 1
+        self.ceiling = min(self.ceiling, self.level)
+        logger.warning(f"Page request timed out; retrying with pageSize={self.page_size}")
+        return True
+
+    def observe(self, metrics: RequestMetrics, total_elements: Optional[int] = None) -> None:
+        """
+        Adjust the wanted size after a completed page request.
+
+        Args:
+            metrics: The page's RequestMetrics (records, total, response_bytes,
+                retries, throttled and not_modified are used)
+            total_elements: totalElements from the response envelope, if any
+        """
+        if total_elements:
+            self.total_elements = total_elements
+        if not self.adaptive or metrics.records < metrics.page_size or metrics.total <= 0:
+            return  # Short last page or unmeasured: says nothing about throughput
+        if metrics.not_modified:
+            return  # Served from the response cache: no body was transferred
+        if metrics.page_size not in self.sizes:
+            return
+        level = self.sizes.index(metrics.page_size)
+        rate = metrics.records / metrics.total
+        previous_rate = self._rates.get(level)
+        self._rates[level] = rate if previous_rate is None else (previous_rate + rate) / 2
+        self.observed += 1
+        wanted = self.level
+
+        if metrics.total > self.max_seconds or metrics.retries > metrics.throttled:
+            # Slow page or server errors: back off and do not come back up
+            wanted = max(0, level - 1)
+            self.ceiling = min(self.ceiling, wanted)
+        else:
+            lower_rate = self._rates.get(level - 1)
+            if lower_rate is not None and not metrics.throttled and rate < lower_rate * (1 + self.MIN_GAIN):
+                # Growing stopped paying off; settle here, or lower if this size is worse
+                self.ceiling = min(self.ceiling, level)
+                wanted = level - 1 if rate < lower_rate else level
+            elif level == self.level and self._can_grow(level, metrics):
+                wanted = level + 1
+
+        if wanted != self.level:
+            logger.info(
+                f"Adaptive paging: pageSize {self.page_size} -> {self.sizes[wanted]} "
+                f"({rate:.0f} records/s, {metrics.total:.2f}s, {metrics.response_bytes} bytes)"
+            )
+            self.level = wanted
+
+    def _can_grow(self, level: int, metrics: RequestMetrics) -> bool:
+        if level >= self.ceiling:
+            return False
+        next_size = self.sizes[level + 1]
+        if self.total_elements is not None and self.total_elements - self.offset <= self.sizes[level]:
+            return False  # The rest of the inventory already fits in one page
+        if metrics.response_bytes / metrics.records * next_size > self.MAX_PAGE_BYTES:
+            return False
+        # Latency grows roughly linearly with page size
+        return metrics.total * next_size / self.sizes[level] <= self.max_seconds
+
+
+class PageSizeStore:
+    """
+    File-backed map of tenant -> page size chosen by the last adaptive crawl.
+    """
+
+    def __init__(self, path: str = "page_sizes.db"):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        with closing(sqlite3.connect(path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_sizes ("
+                "tenant TEXT PRIMARY KEY, "
+                "page_size INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    def get(self, tenant: str) -> Optional[int]:
+        """Return the stored page size for a tenant, if any."""
+        with closing(sqlite3.connect(self.path)) as conn:
+            row = conn.execute("SELECT page_size FROM page_sizes WHERE tenant = ?", (tenant,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, tenant: str, page_size: int) -> None:
+        """Store the page size for a tenant."""
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "INSERT INTO page_sizes (tenant, page_size, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(tenant) DO UPDATE SET page_size = excluded.page_size, "
+                "updated_at = excluded.updated_at",
+                (tenant, page_size, time.time())
+            )
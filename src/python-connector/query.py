@@ -0,0 +1,147 @@
+"""
+Connector queries with filter pushdown and predicate-aware parsing.
+
+A ConnectorQuery is split in two:
+
+- filters the connectors endpoint accepts are sent as the `filter` query
+  parameter (Qualys search syntax, e.g. state:ERROR and isDisabled:true), so
+  the API returns fewer records
+- every filter is also compiled into one generated predicate over the raw
+  record dicts (live camelCase or baseline snake_case keys), evaluated
+  before _parse_connector, so non-matching records are never turned into
+  AWSConnector objects. This also keeps results correct on platforms that
+  ignore the filter parameter.
+
+Each filter takes one value or a collection of accepted values (any of).
+For qualys_tags, a connector matches if it carries any of the given tags.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, Optional, Tuple, Union
+
+from schema_compiler import _coerce_array, _coerce_boolean, _coerce_string, live_name
+
+# Filterable AWSConnector attribute -> value type
+FILTER_FIELDS: Dict[str, str] = {
+    "status": "string",
+    "is_disabled": "boolean",
+    "aws_account_id": "string",
+    "region_code": "string",
+    "qualys_tags": "array",
+    "is_gov_cloud": "boolean",
+}
+
+# Attributes the API can filter on server-side (single-value equality only)
+PUSHDOWN_FIELDS = ("status", "is_disabled", "aws_account_id", "is_gov_cloud")
+
+# AWSConnector attributes a query can be sorted by
+SORT_FIELDS = (
+    "name", "connector_id", "status", "total_assets", "last_synced_on", "next_synced_on",
+    "aws_account_id", "region_code", "account_alias", "is_disabled", "is_gov_cloud",
+)
+
+_COERCE = {"string": "_str", "boolean": "_bool", "array": "_array"}
+
+FilterValue = Union[str, bool, Collection[Any], None]
+
+
+def _lenient(coerce: Callable[[Any], Any], default: Any) -> Callable[[Any], Any]:
+    """Wrap a coercer so a malformed value (None once parsed) matches nothing."""
+    def coerce_or_default(value: Any) -> Any:
+        try:
+            return coerce(value)
+        except (TypeError, ValueError):
+            return default
+    return coerce_or_default
+
+
+def _accepted(value: FilterValue) -> Tuple[Any, ...]:
+    if isinstance(value, (str, bool)):
+        return (value,)
+    return tuple(value)
+
+
+def compile_predicate(filters: Dict[str, FilterValue]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Generate a function testing a raw connector record against the filters.
+
+    Args:
+        filters: AWSConnector attribute -> accepted value(s); see FILTER_FIELDS
+
+    Returns:
+        A function record -> bool (always True when there are no filters)
+    """
+    namespace: Dict[str, Any] = {
+        "_str": _coerce_string, "_bool": _lenient(_coerce_boolean, None), "_array": _lenient(_coerce_array, ())
+    }
+    terms = []
+    for index, (attr, value) in enumerate(filters.items()):
+        kind = FILTER_FIELDS[attr]
+        live = live_name(attr)
+        # Same precedence as the parsers: baseline name first, live name second
+        # (regionCode and qualysTags only exist under their live names)
+        if attr in ("region_code", "qualys_tags"):
+            raw = f"r.get({live!r})"
+        else:
+            raw = f"r.get({attr!r}, r.get({live!r}))"
+        accepted = frozenset(_accepted(value))
+        namespace[f"_v{index}"] = accepted
+        if kind == "array":
+            terms.append(f"not _v{index}.isdisjoint(_array({raw}))")
+        else:
+            terms.append(f"{_COERCE[kind]}({raw}) in _v{index}")
+    source = (
+        "def matches(r):\n"
+        f"    return {' and '.join(terms) if terms else 'True'}\n"
+    )
+    exec(compile(source, "<query:matches>", "exec"), namespace)
+    return namespace["matches"]
+
+
+@dataclass
+class ConnectorQuery:
+    """
+    Filters, sort order and limit of a connector query.
+
+    Example:
+        ConnectorQuery(status="ERROR", is_disabled=False, sort="-total_assets", limit=10)
+    """
+    status: FilterValue = None  # API field: state
+    is_disabled: Optional[bool] = None
+    aws_account_id: FilterValue = None
+    region_code: FilterValue = None
+    qualys_tags: FilterValue = None
+    is_gov_cloud: Optional[bool] = None
+    sort: str = ""  # AWSConnector attribute, "-" prefix for descending
+    limit: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.sort and self.sort.lstrip("-") not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {self.sort} (expected one of {SORT_FIELDS})")
+        if self.limit is not None and self.limit < 0:
+            raise ValueError("limit must not be negative")
+
+    def filters(self) -> Dict[str, FilterValue]:
+        """Return the filters that are set, keyed by AWSConnector attribute."""
+        return {attr: getattr(self, attr) for attr in FILTER_FIELDS if getattr(self, attr) is not None}
+
+    def api_params(self) -> Dict[str, str]:
+        """Return the query parameters for the filters the API can evaluate."""
+        terms = []
+        for attr, value in self.filters().items():
+            accepted = _accepted(value)
+            if attr not in PUSHDOWN_FIELDS or len(accepted) != 1:
+                continue
+            value = accepted[0]
+            terms.append(f"{live_name(attr)}:{str(value).lower() if isinstance(value, bool) else value}")
+        return {"filter": " and ".join(terms)} if terms else {}
+
+    def predicate(self) -> Callable[[Dict[str, Any]], bool]:
+        """Return the compiled raw-record predicate for every filter."""
+        return compile_predicate(self.filters())
+
+    @property
+    def sort_key(self) -> Tuple[str, bool]:
+        """(attribute, descending) of the sort order."""
+        return self.sort.lstrip("-"), self.sort.startswith("-")
+
@@ -0,0 +1,235 @@
+"""
+Persistent HTTP response cache for Qualys API pages.
+
+Page bodies are stored in a SQLite file together with their ETag and
+Last-Modified validators. Before a page is requested again, the validators
+are sent as If-None-Match / If-Modified-Since; on 304 Not Modified the
+cached page is reused instead of being downloaded, and the most recently
+used pages are also kept decoded in memory so a 304 skips JSON decoding.
+
+Entries older than max_age are dropped, and the least recently used entries
+are evicted once the stored bodies exceed max_bytes. Eviction runs every
+EVICT_EVERY stores, or sooner once the bodies stored since the last pass
+may have pushed the total over max_bytes. Responses without
+validators are not cached, since they could never be revalidated.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from json_stream import loads as json_loads
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    """Validators of a stored page."""
+    key: str
+    etag: str
+    last_modified: str
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that revalidate this page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Thread-safe, size- and age-bounded store of page bodies and validators.
+
+    Example:
+        cache = ResponseCache("responses.db", max_bytes=256 * 2 ** 20, max_age=86400)
+        entry = cache.lookup(key)
+        headers = entry.conditional_headers() if entry else {}
+        ...
+        if response.status_code == 304:
+            data = cache.load(entry)
+        else:
+            cache.store(key, response.headers, response.content, data)
+    """
+
+    # Decoded pages kept in memory for 304 responses
+    MEMORY_PAGES = 64
+
+    # Stores between eviction passes while the cache stays under max_bytes
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: str = "responses.db",
+        max_bytes: int = 256 * 2 ** 20,
+        max_age: float = 86400.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: Total size of stored bodies before LRU eviction
+            max_age: Seconds after which a stored page is dropped
+            clock: Time source (seconds since the epoch)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (etag, last_modified, data)
+        self._stores = 0  # Stores since the last eviction pass
+        self._size = 0  # Stored bytes as of the last pass, plus bodies stored since (an upper bound)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "etag TEXT NOT NULL, "
+                "last_modified TEXT NOT NULL, "
+                "body BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+        self.evict()
+
+    def lookup(self, key: str) -> Optional[CachedPage]:
+        """Return the validators stored for key, or None (expired entries are ignored)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ? AND stored_at >= ?",
+                (key, self._clock() - self.max_age)
+            ).fetchone()
+        return CachedPage(key, *row) if row else None
+
+    def load(self, entry: CachedPage) -> Optional[Dict[str, Any]]:
+        """
+        Return the decoded page for a revalidated entry (after a 304).
+
+        Returns:
+            The decoded body, or None if the entry was evicted meanwhile
+        """
+        validators = (entry.etag, entry.last_modified)
+        with self._lock:
+            now = self._clock()
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, entry.key))
+            self._conn.commit()
+            memory = self._memory.get(entry.key)
+            if memory is not None and memory[:2] == validators:
+                self._memory.move_to_end(entry.key)
+                return memory[2]
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ? AND etag = ? AND last_modified = ?",
+                (entry.key, *validators)
+            ).fetchone()
+        if row is None:
+            return None
+        data = json_loads(row[0])
+        self._remember(entry.key, validators, data)
+        return data
+
+    def store(self, key: str, headers: Any, body: bytes, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store a 200 response if it carries validators.
+
+        Args:
+            key: Cache key of the page
+            headers: Response headers (case-insensitive mapping)
+            body: Decoded (uncompressed) response body
+            data: The body already decoded as JSON, kept in memory for the
+                next 304 (None to decode from disk when needed)
+
+        Returns:
+            True if the page was stored
+        """
+        etag = headers.get("ETag", "")
+        last_modified = headers.get("Last-Modified", "")
+        if not etag and not last_modified:
+            return False
+        if len(body) > self.max_bytes:
+            return False
+        now = self._clock()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, etag, last_modified, body, size, stored_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, etag, last_modified, body, len(body), now, now)
+                )
+            self._stores += 1
+            self._size += len(body)
+            due = self._stores >= self.EVICT_EVERY or self._size > self.max_bytes
+        if data is not None:
+            self._remember(key, (etag, last_modified), data)
+        else:
+            with self._lock:
+                self._memory.pop(key, None)
+        if due:
+            self.evict()
+        return True
+
+    def _remember(self, key: str, validators: tuple, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = validators + (data,)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.MEMORY_PAGES:
+                self._memory.popitem(last=False)
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones until under max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute(
+                    "DELETE FROM responses WHERE stored_at < ?", (self._clock() - self.max_age,)
+                ).rowcount
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    victims = []
+                    for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY used_at"):
+                        if total <= self.max_bytes:
+                            break
+                        victims.append((key,))
+                        total -= size
+                    self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                    removed += len(victims)
+                    for (key,) in victims:
+                        self._memory.pop(key, None)
+            self._stores = 0
+            self._size = total
+        if removed:
+            logger.info(f"Response cache: evicted {removed} pages")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of stored pages and their total size in bytes."""
+        with self._lock:
+            pages, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"pages": pages, "bytes": size}
+
+    def clear(self) -> None:
+        """Remove every stored page."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self._memory.clear()
+            self._stores = 0
+            self._size = 0
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
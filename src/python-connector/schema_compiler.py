@@ -0,0 +1,442 @@
+"""
+Schema-compiled record parsers for the Qualys AWS Connectors API.
+
+Reads baseline_schema.json plus the alias map below and generates one
+specialized decode function per target type (connector, polling frequency,
+pagination) at load time. Each generated function resolves every field with
+the same precedence as the hand-written parsers in connector.py (baseline
+snake_case name first, live API name second), so the output is identical for
+well-typed payloads, and coerces values that arrive with the wrong JSON type.
+Null values become the field default. A value that cannot be coerced (e.g.
+totalAssets: "n/a") is read as None, so no field ever holds a value of
+another type, and logged once per field instead of failing the crawl.
+
+Schema drift is handled by editing baseline_schema.json or the alias map,
+not the decoder code.
+"""
+
+import dataclasses
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Baseline field name -> live API name, where the live name is not plain camelCase
+RENAMED_FIELDS: Dict[str, str] = {
+    "status": "state",
+}
+
+# Fields the live API returns that baseline_schema.json does not describe.
+# type name -> [(attribute, live API key, schema type, candidate container paths)]
+# Container paths are tried in order; the first one present in the record wins.
+EXTRA_FIELDS: Dict[str, List[Tuple[str, str, str, Tuple[Tuple[str, ...], ...]]]] = {
+    "connector": [
+        ("next_synced_on", "nextSyncedOn", "string", ((),)),
+        ("remediation_enabled", "remediationEnabled", "boolean", ((),)),
+        ("qualys_tags", "qualysTags", "array", ((),)),
+        ("portal_connector_uuid", "portalConnectorUuid", "string", ((),)),
+        ("is_portal_connector", "isPortalConnector", "boolean", ((),)),
+        ("account_alias", "accountAlias", "string", ((),)),
+        ("region_code", "regionCode", "string", ((),)),
+    ],
+    "polling_frequency": [
+        ("seconds", "seconds", "integer", ((),)),
+    ],
+    "pagination": [
+        ("sort_by", "sortBy", "string", (("pageable", "sort"), ("sort",))),
+    ],
+}
+
+_MISSING = object()
+
+_DEFAULTS = {
+    "string": '""',
+    "integer": "0",
+    "boolean": "False",
+    "array": "[]",
+    "object": "{}",
+}
+
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+_PYTHON_TYPES = {name: cls.__name__ for name, cls in _TYPES.items()}
+
+
+def camelize(name: str) -> str:
+    """Convert a snake_case baseline name to the live API's camelCase."""
+    head, *rest = name.split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+def live_name(name: str) -> str:
+    """Return the live API name of a baseline field (RENAMED_FIELDS, else camelCase)."""
+    return RENAMED_FIELDS.get(name, camelize(name))
+
+
+def _coerce_string(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _coerce_integer(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError(f"Expected integer, got {value!r}")
+
+
+def _coerce_boolean(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no", ""):
+            return False
+    raise ValueError(f"Expected boolean, got {value!r}")
+
+
+def _coerce_array(value: Any) -> list:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, tuple):
+        return list(value)
+    raise ValueError(f"Expected array, got {value!r}")
+
+
+def _coerce_object(value: Any) -> dict:
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return value
+    raise ValueError(f"Expected object, got {value!r}")
+
+
+_COERCE = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "boolean": _coerce_boolean,
+    "array": _coerce_array,
+    "object": _coerce_object,
+}
+
+# Fields whose uncoercible values have been logged already
+_reported: Set[str] = set()
+# Set while check_equivalence feeds deliberately malformed samples
+_quiet = threading.local()
+
+
+def _coerce_lenient(type_name: str, value: Any, where: str) -> Any:
+    """
+    Coerce a value to a schema type, reading it as null if that fails.
+
+    A wrongly typed value thus never reaches a dataclass field of another
+    type (None, as for a null in the response). Objects that cannot be
+    coerced become {} instead, since nested decoders need a mapping. The
+    first failure per field is logged.
+    """
+    coerce = _COERCE[type_name]
+    try:
+        return coerce(value)
+    except (TypeError, ValueError):
+        fallback = coerce(None) if type_name == "object" else None
+        if where not in _reported and not getattr(_quiet, "active", False):
+            _reported.add(where)
+            logger.warning(
+                f"Compiled parser: cannot read {where}={value!r} as {type_name}; "
+                f"using {'the default' if type_name == 'object' else 'null'}"
+            )
+        return fallback
+
+
+def _resolve_container(data: Dict[str, Any], candidates: Tuple[Tuple[str, ...], ...]) -> Dict[str, Any]:
+    """Return the first candidate sub-object present in data, or an empty dict."""
+    for path in candidates:
+        node: Any = data
+        for key in path:
+            node = node.get(key, _MISSING)
+            if node is _MISSING:
+                break
+        else:
+            return node
+    return {}
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """How one dataclass attribute is read from a raw record."""
+    attr: str
+    keys: Tuple[str, ...]  # Candidate source keys, highest precedence first
+    type: str  # Schema type: string, integer, boolean, array or object
+    containers: Tuple[Tuple[str, ...], ...] = ((),)  # () is the record itself
+    nested: Optional[str] = None  # Decoder name for object fields
+
+
+@dataclass
+class CompiledParsers:
+    """Generated decode functions, one per target type."""
+    connector: Callable[[Dict[str, Any]], Any]
+    pagination: Callable[[Dict[str, Any]], Any]
+    polling_frequency: Callable[[Dict[str, Any]], Any]
+    specs: Dict[str, List[FieldSpec]] = field(default_factory=dict)
+    sources: Dict[str, str] = field(default_factory=dict)
+
+    def sample_records(self) -> List[Dict[str, Any]]:
+        """
+        Build baseline-style (snake_case) and live-style (camelCase) connector
+        records: well-typed with non-default values for every field, every
+        field null, and every field holding a value of the wrong type.
+        """
+        return [
+            self._sample("connector", baseline, kind)
+            for kind in ("typed", "null", "malformed")
+            for baseline in (True, False)
+        ]
+
+    def _sample(self, name: str, baseline: bool, kind: str = "typed") -> Dict[str, Any]:
+        values = {
+            "typed": {"string": "value", "integer": 7, "boolean": True, "array": ["tag"]},
+            "null": {"string": None, "integer": None, "boolean": None, "array": None},
+            "malformed": {"string": 42, "integer": "n/a", "boolean": "maybe", "array": "tag"},
+        }[kind]
+        record: Dict[str, Any] = {}
+        for spec in self.specs[name]:
+            key = spec.keys[0] if baseline else spec.keys[-1]
+            if spec.nested:
+                record[key] = self._sample(spec.nested, baseline, kind)
+            elif spec.type == "string" and kind == "typed":
+                record[key] = f"{spec.attr}-{values['string']}"
+            else:
+                record[key] = values[spec.type]
+        return record
+
+    def normalize(self, name: str, parsed: Any) -> Any:
+        """
+        Apply the compiled decoders' coercion to another parser's output.
+
+        The hand-written parsers pass values through untouched, so their
+        output for null or wrongly typed fields is normalized with this
+        before it is compared to the compiled decoders' output.
+        """
+        values = []
+        for spec in self.specs[name]:
+            value = getattr(parsed, spec.attr)
+            if spec.nested:
+                value = self.normalize(spec.nested, value)
+            elif value.__class__ is not _TYPES[spec.type]:
+                value = _coerce_lenient(spec.type, value, f"{name}.{spec.attr}")
+            values.append(value)
+        return type(parsed)(*values)
+
+
+def _find_field(node: Dict[str, Any], attr: str, path: Tuple[str, ...] = ()) -> Optional[Tuple[Tuple[str, ...], Any]]:
+    """Locate a baseline field by name in a schema object, searching nested objects."""
+    if attr in node:
+        return path, node[attr]
+    for key, value in node.items():
+        if isinstance(value, dict):
+            found = _find_field(value, attr, path + (key,))
+            if found is not None:
+                return found
+    return None
+
+
+def _build_specs(name: str, cls: type, node: Dict[str, Any]) -> List[FieldSpec]:
+    """Map every attribute of cls to its source in the schema node or EXTRA_FIELDS."""
+    extras = {attr: (key, type_, containers) for attr, key, type_, containers in EXTRA_FIELDS.get(name, [])}
+    specs = []
+
+    for attr_field in dataclasses.fields(cls):
+        attr = attr_field.name
+        if attr in extras:
+            key, type_, containers = extras[attr]
+            specs.append(FieldSpec(attr, (key,), type_, containers))
+            continue
+
+        found = _find_field(node, attr)
+        if found is None:
+            raise ValueError(f"No schema source for {cls.__name__}.{attr}")
+        path, schema_type = found
+
+        keys = (attr, live_name(attr))
+        keys = tuple(dict.fromkeys(keys))  # Drop duplicates such as ('name', 'name')
+        if path:
+            # Containers are looked up under their baseline name first, then camelCase
+            containers = tuple(dict.fromkeys((path, tuple(camelize(part) for part in path))))
+        else:
+            containers = ((),)
+
+        if isinstance(schema_type, dict):
+            specs.append(FieldSpec(attr, keys, "object", containers, nested=attr))
+        else:
+            specs.append(FieldSpec(attr, keys, schema_type, containers))
+    return specs
+
+
+def _generate(name: str, cls: type, specs: List[FieldSpec]) -> str:
+    """
+    Generate the source of a decode function for one target type.
+    
+    Lookups go through bound .get methods and sentinel/type objects passed as
+    default arguments so they resolve as fast locals, and the target class is
+    called positionally in dataclass field order.
+    """
+    types = sorted({_PYTHON_TYPES[spec.type] for spec in specs})
+    defaults = ", ".join(f"{t}={t}" for t in types)
+    lines = [
+        f"def decode_{name}(data, _MISSING=_MISSING, {defaults}):",
+        "    get = data.get",
+    ]
+    getters: Dict[Tuple[Tuple[str, ...], ...], str] = {((),): "get"}
+
+    for spec in specs:
+        if spec.containers not in getters:
+            var = f"c{len(getters) - 1}"
+            getters[spec.containers] = f"{var}_get"
+            lines.append(f"    {var}_get = _resolve_container(data, {spec.containers!r}).get")
+
+    args = []
+    for index, spec in enumerate(specs):
+        getter = getters[spec.containers]
+        var = f"v{index}"
+        default = _DEFAULTS[spec.type]
+        *primary, last = spec.keys
+
+        if primary:
+            lines.append(f"    {var} = {getter}({primary[0]!r}, _MISSING)")
+            for key in primary[1:]:
+                lines.append(f"    if {var} is _MISSING:")
+                lines.append(f"        {var} = {getter}({key!r}, _MISSING)")
+            lines.append(f"    if {var} is _MISSING:")
+            lines.append(f"        {var} = {getter}({last!r}, {default})")
+        else:
+            lines.append(f"    {var} = {getter}({last!r}, {default})")
+
+        lines.append(f"    if {var}.__class__ is not {_PYTHON_TYPES[spec.type]}:")
+        lines.append(f"        {var} = _coerce_lenient({spec.type!r}, {var}, {name + '.' + spec.attr!r})")
+        if spec.nested:
+            lines.append(f"    {var} = decode_{spec.nested}({var})")
+        args.append(var)
+
+    lines.append(f"    return {cls.__name__}({', '.join(args)})")
+    return "\n".join(lines) + "\n"
+
+
+def compile_parsers(
+    schema_path: str,
+    connector_cls: type,
+    pagination_cls: type,
+    polling_frequency_cls: type
+) -> CompiledParsers:
+    """
+    Compile decode functions for the given dataclasses from a baseline schema.
+
+    Args:
+        schema_path: Path to baseline_schema.json
+        connector_cls: Target class for connector records (AWSConnector)
+        pagination_cls: Target class for the pagination envelope (PaginationInfo)
+        polling_frequency_cls: Target class for pollingFrequency (PollingFrequency)
+
+    Returns:
+        CompiledParsers with one decode function per type
+
+    Raises:
+        ValueError: If a dataclass attribute has no source in the schema or alias map
+    """
+    with open(schema_path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+
+    response_schema = schema["response_schema"]
+    connector_node = response_schema["content"][0]
+    targets = [
+        # Nested types first so their decoders exist when referenced
+        ("polling_frequency", polling_frequency_cls, connector_node["polling_frequency"]),
+        ("connector", connector_cls, connector_node),
+        ("pagination", pagination_cls, response_schema),
+    ]
+
+    namespace: Dict[str, Any] = {
+        "_MISSING": _MISSING,
+        "_resolve_container": _resolve_container,
+        "_coerce_lenient": _coerce_lenient,
+    }
+    specs: Dict[str, List[FieldSpec]] = {}
+    sources: Dict[str, str] = {}
+
+    for name, cls, node in targets:
+        specs[name] = _build_specs(name, cls, node)
+        sources[name] = _generate(name, cls, specs[name])
+        namespace[cls.__name__] = cls
+        exec(compile(sources[name], f"<schema_compiler:{name}>", "exec"), namespace)
+
+    return CompiledParsers(
+        connector=namespace["decode_connector"],
+        pagination=namespace["decode_pagination"],
+        polling_frequency=namespace["decode_polling_frequency"],
+        specs=specs,
+        sources=sources
+    )
+
+
+def check_equivalence(
+    reference: Callable[[Dict[str, Any]], Any],
+    compiled: Callable[[Dict[str, Any]], Any],
+    records: List[Dict[str, Any]],
+    normalize: Optional[Callable[[Any], Any]] = None
+) -> List[str]:
+    """
+    Compare a compiled decoder against a reference parser.
+
+    Args:
+        reference: Reference parser (e.g. a hand-written one)
+        compiled: Compiled decoder
+        records: Raw records to parse with both
+        normalize: Applied to the reference output before comparing (see
+            CompiledParsers.normalize), so null and wrongly typed values
+            compare equal to their coerced form
+
+    Returns:
+        One description per record whose outputs differ, or where either
+        parser raises (empty if equivalent)
+    """
+    mismatches = []
+    _quiet.active = True
+    try:
+        for index, record in enumerate(records):
+            try:
+                expected = reference(record)
+                if normalize is not None:
+                    expected = normalize(expected)
+                actual = compiled(record)
+            except Exception as e:
+                mismatches.append(f"record {index}: {type(e).__name__}: {e}")
+                continue
+            if expected != actual:
+                mismatches.append(f"record {index}: expected {expected!r}, got {actual!r}")
+    finally:
+        _quiet.active = False
+    return mismatches
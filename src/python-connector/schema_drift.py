@@ -0,0 +1,376 @@
+"""
+Schema-drift detection for live Qualys API responses.
+
+Every record (and every page envelope) is reduced to a structural
+fingerprint: its key tuple plus the Python type of each value, recursing into
+nested objects and the first item of arrays. Fingerprints already seen are a
+single dict lookup, and a page whose raw body was seen before (CRC-32 and
+length) reuses that page's fingerprints without visiting its records, so
+unchanged payloads cost almost nothing. Only a new shape is diffed in full against baseline_schema.json, compiled once into a
+lookup tree that knows the live aliases of every baseline field (camelCase,
+plus the renames in schema_compiler.RENAMED_FIELDS).
+
+The first shape showing a given set of differences is logged as a warning;
+shapes with differences already reported (by any detector in this process,
+or in an earlier run when a state file is given) are logged at INFO.
+
+Findings are reported per issue:
+- renamed:      baseline field present under its live alias (connector_id -> connectorId, status -> state)
+- missing:      baseline field absent under every known name
+- added:        field not described by the baseline (accountAlias, apiVersion, pageable.sort.sortBy ...)
+- type_changed: value type differs from the baseline type
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from schema_compiler import live_name
+
+logger = logging.getLogger(__name__)
+
+_JSON_TYPES = {
+    str: "string",
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    list: "array",
+    dict: "object",
+    type(None): "null",
+}
+
+# A compiled schema node: baseline key -> (accepted keys, expected type name or nested node)
+_Node = Dict[str, Tuple[Tuple[str, ...], Any]]
+
+
+_CONTAINERS = frozenset((dict, list))
+
+# Drift signatures already warned about (shared by every detector in the process)
+_known_signatures: Set[str] = set()
+_known_lock = threading.Lock()
+
+
+def fingerprint(node: Dict[str, Any]) -> tuple:
+    """
+    Return the structural fingerprint of a JSON object.
+
+    The fingerprint is (keys, value types) followed by the fingerprints of
+    nested objects and of the first item of arrays, in key order.
+    """
+    types = tuple(map(type, node.values()))
+    if _CONTAINERS.isdisjoint(types):
+        return tuple(node), types
+    return (tuple(node), types) + tuple([
+        _nested_fingerprint(node[key]) for key, cls in zip(node, types) if cls in _CONTAINERS
+    ])
+
+
+def _nested_fingerprint(value: Any) -> Any:
+    if value.__class__ is dict:
+        return fingerprint(value)
+    first = value[0] if value else None
+    return fingerprint(first) if first.__class__ is dict else first.__class__
+
+
+def compile_baseline(node: Dict[str, Any]) -> _Node:
+    """Compile a baseline_schema.json object into a node with live-name aliases."""
+    compiled: _Node = {}
+    for key, expected in node.items():
+        keys = tuple(dict.fromkeys((key, live_name(key))))
+        if isinstance(expected, dict):
+            expected = compile_baseline(expected)
+        elif isinstance(expected, list):
+            expected = "array"
+        compiled[key] = (keys, expected)
+    return compiled
+
+
+@dataclass
+class DriftIssue:
+    """One difference between the baseline schema and a live payload."""
+    kind: str  # renamed, missing, added or type_changed
+    scope: str  # record or envelope
+    path: str  # Dotted path as seen in the payload (baseline path for missing fields)
+    baseline_path: str = ""  # Dotted baseline path ("" for added fields)
+    expected: str = ""  # Baseline type
+    actual: str = ""  # Observed JSON type
+    occurrences: int = 0  # Records (or envelopes) showing this issue
+
+
+def drift_signature(issues: Iterable[DriftIssue]) -> str:
+    """Return a stable digest of a shape's differences from the baseline."""
+    identities = sorted({
+        (i.kind, i.scope, i.path, i.baseline_path, i.expected, i.actual) for i in issues
+    })
+    return hashlib.sha1(json.dumps(identities).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class DriftReport:
+    """Aggregated drift found so far."""
+    records_checked: int = 0
+    envelopes_checked: int = 0
+    shapes: int = 0  # Distinct fingerprints seen
+    issues: List[DriftIssue] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.issues)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Shape:
+    scope: str
+    issues: List[DriftIssue]
+    count: int = 0
+
+
+def _diff(
+    schema: _Node,
+    value: Dict[str, Any],
+    scope: str,
+    path: Tuple[str, ...] = (),
+    baseline_path: Tuple[str, ...] = ()
+) -> List[DriftIssue]:
+    """Diff one JSON object against a compiled baseline node."""
+    issues: List[DriftIssue] = []
+    seen = set()
+    for baseline_key, (keys, expected) in schema.items():
+        key = next((k for k in keys if k in value), None)
+        b_path = baseline_path + (baseline_key,)
+        if key is None:
+            issues.append(DriftIssue(
+                "missing", scope, ".".join(path + (keys[-1],)), ".".join(b_path),
+                expected="object" if isinstance(expected, dict) else expected
+            ))
+            continue
+        seen.add(key)
+        live_path = path + (key,)
+        if key != baseline_key:
+            issues.append(DriftIssue("renamed", scope, ".".join(live_path), ".".join(b_path)))
+        actual = _JSON_TYPES.get(value[key].__class__, value[key].__class__.__name__)
+        if isinstance(expected, dict):
+            if actual == "object":
+                issues.extend(_diff(expected, value[key], scope, live_path, b_path))
+            else:
+                issues.append(DriftIssue("type_changed", scope, ".".join(live_path), ".".join(b_path),
+                                         expected="object", actual=actual))
+        elif actual != expected:
+            issues.append(DriftIssue("type_changed", scope, ".".join(live_path), ".".join(b_path),
+                                     expected=expected, actual=actual))
+    for key, item in value.items():
+        if key not in seen:
+            issues.append(DriftIssue("added", scope, ".".join(path + (key,)),
+                                     actual=_JSON_TYPES.get(item.__class__, item.__class__.__name__)))
+    return issues
+
+
+class SchemaDriftDetector:
+    """
+    Thread-safe drift detector fed with raw pages or records.
+
+    Example:
+        detector = SchemaDriftDetector("baseline_schema.json")
+        detector.check_page(data, raw=response.content)
+        for issue in detector.report().issues:
+            print(issue.kind, issue.path, issue.baseline_path)
+    """
+
+    def __init__(self, schema_path: str, state_path: str = ""):
+        """
+        Args:
+            schema_path: Path to baseline_schema.json
+            state_path: JSON file remembering the drift already reported, so
+                later runs log it at INFO ("" = remember for this process only)
+        """
+        with open(schema_path, "r", encoding="utf-8") as f:
+            response_schema = json.load(f)["response_schema"]
+        self.state_path = state_path
+        if state_path:
+            self._load_state()
+        self.record_schema = compile_baseline(response_schema["content"][0])
+        self.envelope_schema = compile_baseline(response_schema)
+        self._shapes: Dict[Tuple[str, tuple], _Shape] = {}
+        self._nested_keys: Dict[tuple, Tuple[str, ...]] = {}
+        # (crc32, length) of raw page bodies -> (record fingerprint counts, envelope fingerprint)
+        self._pages: Dict[Tuple[int, int], Tuple[Counter, tuple]] = {}
+        self._lock = threading.Lock()
+        self.records_checked = 0
+        self.envelopes_checked = 0
+
+    # Raw page digests remembered before the page cache is cleared
+    MAX_PAGES = 4096
+
+    def check_page(self, data: Dict[str, Any], raw: Optional[bytes] = None) -> None:
+        """
+        Check a decoded page: its envelope and every content record.
+
+        Args:
+            data: Decoded page body
+            raw: The undecoded body, if available; repeated pages are then
+                recognized without fingerprinting their records again
+        """
+        digest = (zlib.crc32(raw), len(raw)) if raw is not None else None
+        seen = self._pages.get(digest) if digest is not None else None
+        if seen is not None:
+            counts, envelope_key = seen
+            with self._lock:
+                for key, count in counts.items():
+                    self._shape("record", key, (), count)
+                self._shape("envelope", envelope_key, (), 1)
+            return
+
+        records = data.get("content", [])
+        counts = Counter(map(self._record_fingerprint, records))
+        envelope = self._envelope_view(data)
+        envelope_key = fingerprint(envelope)
+        with self._lock:
+            for key, count in counts.items():
+                self._shape("record", key, records, count)
+            self._shape("envelope", envelope_key, [envelope], 1)
+            if digest is not None:
+                if len(self._pages) >= self.MAX_PAGES:
+                    self._pages.clear()
+                self._pages[digest] = (counts, envelope_key)
+
+    def check_records(self, records: List[Dict[str, Any]]) -> None:
+        """Check a list of raw connector records."""
+        counts = Counter(map(self._record_fingerprint, records))
+        with self._lock:
+            for key, count in counts.items():
+                self._shape("record", key, records, count)
+
+    def _record_fingerprint(self, record: Dict[str, Any]) -> tuple:
+        """
+        fingerprint() for the hot path.
+
+        Which keys hold nested objects/arrays is remembered per top-level
+        (keys, types) pair, so only those values are visited again.
+        """
+        key = (tuple(record), tuple(map(type, record.values())))
+        nested = self._nested_keys.get(key)
+        if nested is None:
+            nested = self._nested_keys[key] = tuple(
+                k for k, cls in zip(key[0], key[1]) if cls in _CONTAINERS
+            )
+        if nested:
+            return key + tuple([_nested_fingerprint(record[k]) for k in nested])
+        return key
+
+    def tap(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass records through unchanged, checking them on the way (for streamed pages)."""
+        counts: Counter = Counter()
+        examples: Dict[tuple, Dict[str, Any]] = {}
+        try:
+            for record in records:
+                key = self._record_fingerprint(record)
+                if key not in counts:
+                    examples[key] = record
+                counts[key] += 1
+                yield record
+        finally:
+            with self._lock:
+                for key, count in counts.items():
+                    self._shape("record", key, [examples[key]], count)
+
+    def check_envelope(self, data: Dict[str, Any]) -> None:
+        """Check the envelope of a page (the content array is checked as a type only)."""
+        envelope = self._envelope_view(data)
+        key = fingerprint(envelope)
+        with self._lock:
+            self._shape("envelope", key, [envelope], 1)
+
+    @staticmethod
+    def _envelope_view(data: Dict[str, Any]) -> Dict[str, Any]:
+        """The page with an empty content array, so only envelope fields shape it."""
+        return {key: ([] if key == "content" else value) for key, value in data.items()}
+
+    def _shape(self, scope: str, key: tuple, examples: Iterable[Dict[str, Any]], count: int) -> None:
+        """Count a fingerprint, diffing an example the first time it is seen (lock held)."""
+        shape = self._shapes.get((scope, key))
+        if shape is None:
+            example = next(e for e in examples if fingerprint(e) == key)
+            schema = self.record_schema if scope == "record" else self.envelope_schema
+            shape = self._shapes[(scope, key)] = _Shape(scope, _diff(schema, example, scope))
+            if shape.issues:
+                self._log_shape(scope, shape.issues)
+        shape.count += count
+        if scope == "record":
+            self.records_checked += count
+        else:
+            self.envelopes_checked += count
+
+    def _log_shape(self, scope: str, issues: List[DriftIssue]) -> None:
+        """Warn about drift not reported before; log already known drift at INFO."""
+        kinds = Counter(issue.kind for issue in issues)
+        summary = ", ".join(f"{n} {kind}" for kind, n in sorted(kinds.items()))
+        signature = drift_signature(issues)
+        with _known_lock:
+            known = signature in _known_signatures
+            _known_signatures.add(signature)
+        if known:
+            logger.info(f"Schema drift: known {scope} shape differs from baseline ({summary})")
+            return
+        logger.warning(f"Schema drift: new {scope} shape differs from baseline ({summary})")
+        if self.state_path:
+            self._save_state()
+
+    def _load_state(self) -> None:
+        """Add the signatures stored in the state file to the known ones."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                signatures = json.load(f).get("signatures", [])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring schema drift state {self.state_path}: {e}")
+            return
+        with _known_lock:
+            _known_signatures.update(signatures)
+
+    def _save_state(self) -> None:
+        """Write the known signatures to the state file."""
+        with _known_lock:
+            signatures = sorted(_known_signatures)
+        temp_path = f"{self.state_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"signatures": signatures}, f, indent=2)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not save schema drift state {self.state_path}: {e}")
+
+    def report(self) -> DriftReport:
+        """Return every distinct issue with the number of records/envelopes showing it."""
+        with self._lock:
+            merged: Dict[tuple, DriftIssue] = {}
+            for shape in self._shapes.values():
+                for issue in shape.issues:
+                    identity = (issue.kind, issue.scope, issue.path, issue.baseline_path,
+                                issue.expected, issue.actual)
+                    if identity not in merged:
+                        merged[identity] = DriftIssue(*identity)
+                    merged[identity].occurrences += shape.count
+            return DriftReport(
+                records_checked=self.records_checked,
+                envelopes_checked=self.envelopes_checked,
+                shapes=len(self._shapes),
+                issues=sorted(merged.values(), key=lambda i: (i.scope, i.kind, i.path))
+            )
+
+    def reset(self) -> None:
+        """Forget counts and seen shapes."""
+        with self._lock:
+            self._shapes.clear()
+            self._pages.clear()
+            self.records_checked = 0
+            self.envelopes_checked = 0
@@ -0,0 +1,88 @@
+"""Tests for QualysAuthConfig environment loading and validation."""
+
+import os
+
+import pytest
+
+import auth_config
+from auth_config import ConfigError, QualysAuthConfig
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """An environment without QUALYS_* variables and without the .env file."""
+    monkeypatch.setattr(auth_config, "_env_loaded", True)
+    monkeypatch.setattr(auth_config, "_default_config", None)
+    for name in list(os.environ):
+        if name.startswith("QUALYS_"):
+            monkeypatch.delenv(name)
+    return monkeypatch
+
+
+def test_from_env_defaults(env):
+    config = QualysAuthConfig.from_env()
+
+    assert config == QualysAuthConfig(page_size_store="page_sizes.db")
+    assert config.username == "" and config.verify_ssl and not config.stream_decode
+
+
+def test_from_env_reads_every_kind_of_setting(env):
+    env.setenv("QUALYS_BASE_URL", "https://qualysapi.example")
+    env.setenv("QUALYS_USERNAME", "user")
+    env.setenv("QUALYS_PASSWORD", "secret")
+    env.setenv("QUALYS_TIMEOUT", "5")
+    env.setenv("QUALYS_VERIFY_SSL", "FALSE")
+    env.setenv("QUALYS_CACHE_TTL", "0.5")
+    env.setenv("QUALYS_STREAM_DECODE", "true")
+    env.setenv("QUALYS_DRIFT_STATE", "drift.json")
+
+    config = QualysAuthConfig.from_env()
+
+    assert config.base_url == "https://qualysapi.example"
+    assert config.get_auth_tuple() == ("user", "secret")
+    assert config.timeout == 5
+    assert config.verify_ssl is False
+    assert config.cache_ttl == 0.5
+    assert config.stream_decode is True
+    assert config.drift_state == "drift.json"
+    assert config.validate()
+
+
+@pytest.mark.parametrize("name, value", [
+    ("QUALYS_TIMEOUT", "thirty"),
+    ("QUALYS_MAX_WORKERS", "2.5"),
+    ("QUALYS_BACKOFF_MAX", "soon"),
+])
+def test_unparsable_setting_raises_config_error(env, name, value):
+    env.setenv(name, value)
+
+    with pytest.raises(ConfigError, match="Invalid QUALYS_\\* setting"):
+        QualysAuthConfig.from_env()
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"password": ""}, "QUALYS_USERNAME and QUALYS_PASSWORD"),
+    ({"max_workers": 0}, "QUALYS_MAX_WORKERS"),
+    ({"max_retries": -1}, "QUALYS_MAX_RETRIES"),
+    ({"rate_limit": -1}, "QUALYS_RATE_LIMIT"),
+    ({"page_size_min": 500, "page_size_max": 100}, "QUALYS_PAGE_SIZE_MIN"),
+])
+def test_validate_rejects_bad_settings(overrides, message):
+    config = QualysAuthConfig(**dict({"username": "user", "password": "secret"}, **overrides))
+
+    with pytest.raises(ConfigError, match=message):
+        config.validate()
+
+
+def test_config_error_is_a_value_error():
+    assert issubclass(ConfigError, ValueError)
+
+
+def test_default_config_is_built_once_on_first_use(env):
+    env.setenv("QUALYS_USERNAME", "user")
+
+    first = auth_config.default_config
+    env.setenv("QUALYS_USERNAME", "changed")
+
+    assert first.username == "user"
+    assert auth_config.get_default_config() is first
@@ -0,0 +1,95 @@
+"""Tests for the mock CloudView server and the offline benchmark."""
+
+import gzip
+import json
+import sys
+
+import pytest
+import requests
+
+import benchmark
+from benchmark import BenchResult
+from mock_qualys_server import ENDPOINT, MockQualysServer, make_record
+
+
+def _get(server, headers=None, **params):
+    return requests.get(server.base_url + ENDPOINT, params=params, headers=headers or {})
+
+
+def test_mock_server_pages_the_inventory():
+    with MockQualysServer(records=120) as server:
+        last = _get(server, pageNo=2, pageSize=50).json()
+        beyond = _get(server, pageNo=3, pageSize=50).json()
+        missing = requests.get(server.base_url + "/nope")
+
+    assert [r["connectorId"] for r in last["content"]] == [make_record(i)["connectorId"] for i in range(100, 120)]
+    assert (last["totalPages"], last["totalElements"], last["last"]) == (3, 120, True)
+    assert beyond["content"] == []
+    assert missing.status_code == 404
+
+
+def test_mock_server_caps_page_size_and_compresses():
+    with MockQualysServer(records=300, max_page_size=100) as server:
+        response = requests.get(
+            server.base_url + ENDPOINT, params={"pageSize": 250},
+            headers={"Accept-Encoding": "gzip"}, stream=True
+        )
+        raw = response.raw.read(decode_content=False)
+
+    body = json.loads(gzip.decompress(raw))
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(body["content"]) == body["pageable"]["pageSize"] == 100
+
+
+def test_mock_server_revalidates_and_injects_errors():
+    with MockQualysServer(records=10) as server:
+        etag = _get(server).headers["ETag"]
+        not_modified = _get(server, headers={"If-None-Match": etag})
+        server.update_record(0, state="ERROR")
+        changed = _get(server, headers={"If-None-Match": etag})
+        server.error_rate = 1.0
+        failed = _get(server)
+        stats = dict(server.stats)
+
+    assert not_modified.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()["content"][0]["state"] == "ERROR"
+    assert (failed.status_code, failed.headers["Retry-After"]) == (503, "0")
+    assert (stats["not_modified"], stats["errors"]) == (1, 1)
+
+
+def test_mock_server_filters_with_both_shapes():
+    for shape in ("camel", "snake"):
+        with MockQualysServer(records=60, shape=shape) as server:
+            body = _get(server, pageSize=100, filter="state:ERROR and isDisabled:false").json()
+
+        expected = [i for i in range(60) if make_record(i)["state"] == "ERROR" and not make_record(i)["isDisabled"]]
+        ids = [r.get("connectorId", r.get("connector_id")) for r in body["content"]]
+        assert ids == [make_record(i)["connectorId"] for i in expected]
+
+
+def test_bench_result_percentiles_and_rates():
+    result = BenchResult("x", wall=2.0, pages=10, records=500, latencies=[0.4, 0.1, 0.3, 0.2, 0.5])
+
+    assert (result.pages_per_sec, result.records_per_sec) == (5.0, 250.0)
+    assert (result.percentile(50), result.percentile(99)) == (0.3, 0.5)
+    assert BenchResult("empty").percentile(50) == 0.0
+    assert result.to_dict()["requests"] == 5
+
+
+@pytest.mark.parametrize("extra", [[], ["--stream-decode", "--hand-parser", "--error-rate", "0.1"]])
+def test_benchmark_runs_every_scenario(monkeypatch, capsys, extra):
+    monkeypatch.setattr(sys, "argv", [
+        "benchmark.py", "--records", "150", "--page-size", "50", "--iterations", "1",
+        "--lookups", "5", "--no-memory", "--json", *extra,
+    ])
+
+    benchmark.main()
+    report = json.loads(capsys.readouterr().out)
+
+    results = {r["name"]: r for r in report["results"]}
+    assert set(results) == set(benchmark.SCENARIOS)
+    for name in ("fetch_connectors", "get_all_connectors", "get_all_connectors[concurrent]"):
+        assert results[name]["records"] == 150
+    assert results["get_connector_by_id"]["requests"] == 5
+    assert report["server"]["requests"] > 0
@@ -0,0 +1,70 @@
+"""Tests for the exit codes of cli.py."""
+
+import pytest
+
+import cli
+from auth_config import ConfigError
+from connector import ResponseFormatError
+
+
+class _BrokenConnector:
+    def iter_connectors(self, page_size=50):
+        raise ResponseFormatError("Invalid API response format: 'content'")
+
+
+def _fail_if_called():
+    pytest.fail("the connector should not be built")
+
+
+def test_config_error_exits_with_config_code(monkeypatch, capsys):
+    def missing_credentials():
+        raise ConfigError("QUALYS_USERNAME and QUALYS_PASSWORD environment variables must be set")
+    monkeypatch.setattr(cli, "_connector", missing_credentials)
+
+    assert cli.main(["count"]) == cli.EXIT_CONFIG_ERROR
+    assert "Configuration error" in capsys.readouterr().err
+
+
+def test_unparseable_response_exits_with_api_code(monkeypatch, capsys):
+    monkeypatch.setattr(cli, "_connector", _BrokenConnector)
+
+    assert cli.main(["list"]) == cli.EXIT_API_ERROR
+    assert "API error: Invalid API response format" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [
+    ["list", "--page", "0", "--state", "ERROR"],
+    ["list", "--sort=-no_such_field"],
+])
+def test_invalid_arguments_exit_with_usage_error(monkeypatch, capsys, argv):
+    monkeypatch.setattr(cli, "_connector", _fail_if_called)
+
+    assert cli.main(argv) == cli.EXIT_CONFIG_ERROR
+    assert "Usage error" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [
+    ["list", "--limit", "-1"],
+    ["list", "--limit", "0"],
+    ["list", "--page-size", "0"],
+    ["list", "--page", "-1"],
+    ["export", "--batch-size", "0"],
+])
+def test_non_positive_numbers_are_rejected_by_argparse(monkeypatch, capsys, argv):
+    monkeypatch.setattr(cli, "_connector", _fail_if_called)
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(argv)
+
+    assert exit_info.value.code == cli.EXIT_CONFIG_ERROR
+    assert "must be a" in capsys.readouterr().err
+
+
+def test_other_value_errors_are_not_reported_as_api_errors(monkeypatch):
+    class _Failing:
+        def iter_connectors(self, page_size=50):
+            raise ValueError("bug in the command")
+    monkeypatch.setattr(cli, "_connector", _Failing)
+
+    with pytest.raises(ValueError, match="bug in the command"):
+        cli.main(["list"])
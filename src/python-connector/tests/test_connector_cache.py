@@ -0,0 +1,102 @@
+"""Tests for the indexed TTL cache behind the connector lookups."""
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from connector_cache import ConnectorCache
+from mock_qualys_server import MockQualysServer, make_record
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _parsed(count):
+    connector = QualysAWSConnector(QualysAuthConfig(username="x", password="x"))
+    return [connector._parse_connector(make_record(i)) for i in range(count)]
+
+
+def test_snapshot_expires_after_ttl():
+    clock = _Clock()
+    cache = ConnectorCache(ttl=60, clock=clock)
+    assert not cache.is_fresh()
+
+    cache.load(_parsed(3))
+    clock.now += 59
+    assert cache.is_fresh()
+    clock.now += 1
+    assert not cache.is_fresh()
+
+
+def test_zero_ttl_is_never_fresh():
+    cache = ConnectorCache(ttl=0, clock=_Clock())
+    cache.load(_parsed(3))
+
+    assert not cache.is_fresh()
+
+
+def test_indexes_cover_ids_fields_and_each_tag():
+    connectors = _parsed(12)
+    cache = ConnectorCache(ttl=60)
+    cache.load(connectors)
+
+    assert cache.get(connectors[5].connector_id) is connectors[5]
+    assert cache.get("missing") is None
+    assert cache.find("status", "ERROR") == [c for c in connectors if c.status == "ERROR"]
+    assert cache.find("region_code", "us-east-1") == [c for c in connectors if c.region_code == "us-east-1"]
+    assert cache.find("qualys_tags", "env:prod") == [c for c in connectors if "env:prod" in c.qualys_tags]
+    assert cache.find("aws_account_id", "nope") == []
+    with pytest.raises(KeyError):
+        cache.find("name", connectors[0].name)
+
+
+def test_invalidate_and_reload_replace_the_snapshot():
+    connectors = _parsed(6)
+    cache = ConnectorCache(ttl=60)
+    cache.load(connectors)
+    cache.invalidate()
+
+    assert not cache.is_fresh()
+    assert len(cache) == 0
+    assert cache.get(connectors[0].connector_id) is None
+
+    cache.load(connectors[:2])
+    assert len(cache) == 2
+    assert cache.find("status", connectors[3].status) == []
+
+
+def test_lookups_crawl_once_per_ttl_window():
+    with MockQualysServer(records=120) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x", cache_ttl=300)
+        connector = QualysAWSConnector(config)
+        record = make_record(42)
+
+        found = connector.get_connector_by_id(record["connectorId"])
+        errored = connector.get_connectors_by_status("ERROR")
+        crawled = server.stats["requests"]
+        connector.get_connectors_by_account_id(record["awsAccountId"])
+        cached = server.stats["requests"]
+        connector.get_connector_by_id(record["connectorId"], refresh=True)
+        refreshed = server.stats["requests"]
+
+    assert found.name == record["name"]
+    assert len(errored) == sum(make_record(i)["state"] == "ERROR" for i in range(120))
+    assert cached == crawled
+    assert refreshed > cached
+
+
+def test_zero_ttl_crawls_on_every_lookup():
+    with MockQualysServer(records=20) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x", cache_ttl=0)
+        connector = QualysAWSConnector(config)
+
+        connector.get_connector_by_id(make_record(1)["connectorId"])
+        first = server.stats["requests"]
+        connector.get_connector_by_id(make_record(2)["connectorId"])
+
+        assert server.stats["requests"] == 2 * first
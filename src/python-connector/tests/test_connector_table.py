@@ -0,0 +1,47 @@
+"""Tests for ConnectorTable (connector_table.py)."""
+
+import dataclasses
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from connector_table import ConnectorTable
+from mock_qualys_server import make_record
+
+
+@pytest.fixture
+def connectors():
+    connector = QualysAWSConnector(QualysAuthConfig(username="x", password="x", compiled_parser=False))
+    return [connector._parse_connector(make_record(i)) for i in range(5)]
+
+
+@pytest.mark.parametrize("total_assets", ["n/a", 1.5, [3]])
+def test_bad_row_leaves_table_unchanged(connectors, total_assets):
+    table = ConnectorTable.from_connectors(connectors)
+    bad = dataclasses.replace(connectors[0], name="bad", total_assets=total_assets)
+
+    with pytest.raises(TypeError):
+        table.append(bad)
+
+    assert len(table) == 5
+    assert table.row(4) == connectors[4]
+    table.append(connectors[1])
+    assert table.row(5) == connectors[1]
+    assert list(table.column("name")) == [c.name for c in connectors] + [connectors[1].name]
+
+
+def test_null_integers_are_stored_as_zero(connectors):
+    table = ConnectorTable()
+    table.append(dataclasses.replace(connectors[0], total_assets=None))
+
+    assert table.row(0).total_assets == 0
+
+
+def test_null_strings_and_take_filter(connectors):
+    connectors[2] = dataclasses.replace(connectors[2], status=None)
+    table = ConnectorTable.from_connectors(connectors)
+
+    assert table.row(2).status is None
+    assert [c.connector_id for c in table.take([4, 2])] == [connectors[4].connector_id, connectors[2].connector_id]
+    assert len(table.filter(status=None)) == 1
@@ -0,0 +1,79 @@
+"""Tests for DeltaSync change detection against the mock server."""
+
+import logging
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from delta_sync import DeltaSync, SnapshotStore, content_hash
+from mock_qualys_server import MockQualysServer, make_record
+
+
+def _run(server, store):
+    config = QualysAuthConfig(base_url=server.base_url, username="x", password="x")
+    return DeltaSync(QualysAWSConnector(config), store).run(page_size=10)
+
+
+@pytest.fixture
+def store():
+    with SnapshotStore(":memory:") as store:
+        yield store
+
+
+def _ids(connectors):
+    return sorted(c.connector_id for c in connectors)
+
+
+def test_first_run_adds_everything_and_second_run_is_quiet(store):
+    with MockQualysServer(records=25) as server:
+        first = _run(server, store)
+        second = _run(server, store)
+
+    assert len(first.added) == 25 and not first.changed and not first.removed
+    assert not second.has_changes
+    assert second.unchanged == 25
+
+
+def test_detects_added_removed_and_modified(store):
+    with MockQualysServer(records=20) as server:
+        _run(server, store)
+
+    with MockQualysServer(records=22) as server:
+        server.update_record(1, state="ERROR", error="AccessDenied")
+        grown = _run(server, store)
+
+    with MockQualysServer(records=18) as server:
+        shrunk = _run(server, store)
+
+    assert _ids(grown.added) == [make_record(20)["connectorId"], make_record(21)["connectorId"]]
+    assert _ids(grown.changed) == [make_record(1)["connectorId"]]
+    assert grown.changed[0].status == "ERROR"
+    assert grown.unchanged == 19
+    # Record 1 reverts to its generated state, 18-21 are gone
+    assert _ids(shrunk.changed) == [make_record(1)["connectorId"]]
+    assert sorted(shrunk.removed) == [make_record(i)["connectorId"] for i in range(18, 22)]
+
+
+def test_sync_timestamps_are_not_changes(store):
+    with MockQualysServer(records=5) as server:
+        _run(server, store)
+        server.update_record(1, lastSyncedOn="2024-02-01T00:00:00.000+0000",
+                             nextSyncedOn="2024-02-01T04:00:00.000+0000")
+        result = _run(server, store)
+
+    assert not result.has_changes
+    assert content_hash(make_record(1)) == content_hash(
+        dict(make_record(1), lastSyncedOn="2030-01-01T00:00:00.000+0000")
+    )
+
+
+def test_records_without_connector_id_are_skipped(store, caplog):
+    with MockQualysServer(records=5) as server:
+        server.update_record(2, connectorId="")
+        with caplog.at_level(logging.WARNING, logger="delta_sync"):
+            result = _run(server, store)
+
+    assert len(result.added) == 4
+    assert "" not in store.load_hashes()
+    assert "without a connectorId" in caplog.text
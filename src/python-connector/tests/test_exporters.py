@@ -0,0 +1,87 @@
+"""Tests for the generated encoders in exporters.py."""
+
+import csv
+import io
+import json
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from exporters import (
+    TAG_SEPARATOR, CSVExporter, NDJSONExporter, compile_json_encoder, compile_row_encoder, flat_columns
+)
+from mock_qualys_server import make_record
+
+
+def _hand_parsed(record):
+    config = QualysAuthConfig(username="x", password="x", compiled_parser=False)
+    connector = QualysAWSConnector(config)
+    return connector, connector._parse_connector(record)
+
+
+def test_null_fields_encode_as_null():
+    record = make_record(7)
+    record.update(error=None, description=None, totalAssets=None, isDisabled=None, qualysTags=None)
+    record["pollingFrequency"] = {"hours": None, "minutes": 0}
+    connector, parsed = _hand_parsed(record)
+
+    encoded = compile_json_encoder("baseline")(parsed)
+
+    assert json.loads(encoded) == connector.to_normalized_dict(parsed)
+    assert json.loads(encoded)["error"] is None
+
+
+def test_wrongly_typed_values_fall_back_to_json():
+    record = make_record(3)
+    record.update(totalAssets="n/a", name=42, isGovCloud="maybe")
+    connector, parsed = _hand_parsed(record)
+
+    encoded = compile_json_encoder("baseline")(parsed)
+
+    assert json.loads(encoded) == connector.to_normalized_dict(parsed)
+
+
+def test_ndjson_exporter_writes_null_error():
+    record = make_record(1)
+    record["error"] = None
+    _, parsed = _hand_parsed(record)
+    stream = io.StringIO()
+
+    with NDJSONExporter(stream) as exporter:
+        exporter.write(parsed)
+
+    assert json.loads(stream.getvalue())["error"] is None
+
+
+def _csv_rows(connectors):
+    stream = io.StringIO()
+    with CSVExporter(stream) as exporter:
+        exporter.write_all(connectors)
+    return list(csv.DictReader(io.StringIO(stream.getvalue())))
+
+
+def test_csv_round_trips_tag_lists_and_scalar_tags():
+    listed = make_record(1)
+    listed["qualysTags"] = ["env:prod", "team:core"]
+    scalar = make_record(2)
+    scalar["qualysTags"] = "env:dev"  # A lone tag sent as a string
+    missing = make_record(3)
+    missing["qualysTags"] = None
+    connector, _ = _hand_parsed(listed)
+
+    rows = _csv_rows([connector._parse_connector(r) for r in (listed, scalar, missing)])
+
+    assert rows[0]["qualys_tags"].split(TAG_SEPARATOR) == ["env:prod", "team:core"]
+    assert rows[1]["qualys_tags"] == "env:dev"
+    assert rows[2]["qualys_tags"] == ""
+    assert rows[1]["name"] == scalar["name"]
+
+
+def test_columnar_keeps_a_scalar_tag_as_one_tag():
+    record = make_record(2)
+    record["qualysTags"] = "env:dev"
+    _, parsed = _hand_parsed(record)
+
+    row = compile_row_encoder("baseline", join_tags=False)(parsed)
+    columns = [name for name, _, _ in flat_columns("baseline")]
+
+    assert row[columns.index("qualys_tags")] == ["env:dev"]
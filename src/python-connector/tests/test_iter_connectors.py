@@ -0,0 +1,64 @@
+"""Tests for the streaming iter_pages / iter_connectors generators."""
+
+import itertools
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer, make_record
+
+
+def _connector(server, **kwargs):
+    return QualysAWSConnector(QualysAuthConfig(base_url=server.base_url, username="x", password="x", **kwargs))
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+@pytest.mark.parametrize("stream_decode", [False, True])
+def test_iter_connectors_yields_every_record_in_page_order(prefetch, stream_decode):
+    with MockQualysServer(records=237) as server:
+        connector = _connector(server, stream_decode=stream_decode)
+        ids = [c.connector_id for c in connector.iter_connectors(page_size=50, prefetch=prefetch)]
+        requests = server.stats["requests"]
+
+    assert ids == [make_record(i)["connectorId"] for i in range(237)]
+    assert requests == 5
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_connectors_fetches_lazily(prefetch):
+    with MockQualysServer(records=1000) as server:
+        connectors = _connector(server).iter_connectors(page_size=50, prefetch=prefetch)
+        first_page = list(itertools.islice(connectors, 50))
+        connectors.close()
+        requests = server.stats["requests"]
+
+    assert len(first_page) == 50
+    # Page 0, plus page 1 if its prefetch started before close(); never the whole inventory
+    assert 1 <= requests <= (2 if prefetch else 1)
+
+
+def test_iter_pages_and_raw_records_match_parsed_connectors():
+    with MockQualysServer(records=120) as server:
+        connector = _connector(server)
+        pages = list(connector.iter_pages(page_size=50))
+        raw = list(connector.iter_raw_connectors(page_size=50))
+
+    assert [len(page.connectors) for page in pages] == [50, 50, 20]
+    assert [page.is_last for page in pages] == [False, False, True]
+    assert [r["connectorId"] for r in raw] == [c.connector_id for page in pages for c in page.connectors]
+
+
+def test_empty_inventory_yields_nothing():
+    with MockQualysServer(records=0) as server:
+        assert list(_connector(server).iter_connectors(page_size=50)) == []
+
+
+def test_each_iteration_is_one_crawl():
+    with MockQualysServer(records=120) as server:
+        connector = _connector(server)
+        list(connector.iter_connectors(page_size=50))
+        stats = connector.metrics.snapshot().last_crawl
+
+    assert stats.requests == 3
+    assert stats.records == stats.parsed_records == 120
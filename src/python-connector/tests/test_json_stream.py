@@ -0,0 +1,83 @@
+"""Tests for stream-decoded pages matching buffered decoding."""
+
+import json
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from json_stream import ContentStream, loads
+from mock_qualys_server import MockQualysServer, make_page, make_record
+
+
+def _chunked(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def _decode(body, size):
+    stream = ContentStream(_chunked(body, size))
+    return list(stream), stream
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096, 10 ** 6])
+def test_stream_matches_buffered_decode_for_any_chunking(size):
+    body = json.dumps(make_page([make_record(i) for i in range(20)], 100, 0, 20)).encode()
+
+    items, stream = _decode(body, size)
+    expected = loads(body)
+
+    assert items == expected["content"]
+    assert stream.envelope == dict(expected, content=[])
+    assert stream.items_decoded == 20
+    assert stream.bytes_read == len(body)
+
+
+def test_envelope_fields_before_content_and_multibyte_text():
+    page = {"totalPages": 1, "content": [{"name": "connecteur-é-東京", "n": 12345}], "last": True}
+    body = json.dumps(page, ensure_ascii=False).encode("utf-8")
+
+    items, stream = _decode(body, 1)  # Splits every multibyte character
+
+    assert items == page["content"]
+    assert stream.envelope == {"totalPages": 1, "content": [], "last": True}
+
+
+def test_empty_content_and_empty_object():
+    assert _decode(b'{"content": [], "last": true}', 3)[0] == []
+    assert _decode(b"{}", 1)[0] == []
+
+
+@pytest.mark.parametrize("body", [b'{"content": [{"a": 1}, {"a": 2', b'{"content": [1] "last": true}', b"[1, 2]"])
+def test_truncated_or_malformed_bodies_raise_value_error(body):
+    with pytest.raises(ValueError):
+        _decode(body, 4)
+
+
+@pytest.mark.parametrize("shape", ["camel", "snake"])
+def test_stream_decoded_crawl_matches_buffered_crawl(shape):
+    with MockQualysServer(records=260, shape=shape) as server:
+        def crawl(stream_decode):
+            config = QualysAuthConfig(base_url=server.base_url, username="x", password="x",
+                                      stream_decode=stream_decode)
+            connector = QualysAWSConnector(config)
+            connectors = connector.get_all_connectors(page_size=100)
+            return connector, [connector.to_normalized_dict(c) for c in connectors]
+
+        buffered_connector, buffered = crawl(False)
+        streamed_connector, streamed = crawl(True)
+
+    assert len(streamed) == 260
+    assert streamed == buffered
+    assert streamed_connector.metrics.snapshot().last_crawl.records == 260
+    assert buffered_connector.metrics.snapshot().last_crawl.records == 260
+
+
+def test_fetch_connectors_keeps_pagination_when_streamed():
+    with MockQualysServer(records=130) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x", stream_decode=True)
+        response = QualysAWSConnector(config).fetch_connectors(page=1, page_size=50)
+
+    assert [c.connector_id for c in response.connectors] == [make_record(i)["connectorId"] for i in range(50, 100)]
+    assert response.pagination.total_pages == 3
+    assert response.pagination.total_elements == 130
+    assert not response.is_last
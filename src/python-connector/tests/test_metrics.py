@@ -0,0 +1,120 @@
+"""Tests for metrics aggregation and the Prometheus text export."""
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from metrics import LATENCY_BUCKETS, ConnectorMetrics, RequestMetrics
+from mock_qualys_server import MockQualysServer
+
+
+def _request(crawl=0, total=0.2, status=200, **fields):
+    return RequestMetrics(page=0, page_size=50, crawl=crawl, total=total, status=status, **fields)
+
+
+def _samples(text):
+    """Prometheus text -> {series: value}, skipping HELP/TYPE lines."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_requests_aggregate_into_totals_and_their_own_crawl():
+    metrics = ConnectorMetrics()
+    first = metrics.start_crawl()
+    second = metrics.start_crawl()
+
+    metrics.record_request(_request(first, records=50, retries=2, response_bytes=1000, wire_bytes=200))
+    metrics.record_request(_request(first, status=503, error="HTTPError", throttled=1))
+    metrics.record_request(_request(second, records=10, not_modified=True))
+    metrics.record_request(_request(records=5))  # Outside any crawl
+    metrics.record_parse(0.5, 50, first)
+    first_stats = metrics.end_crawl(first)
+    second_stats = metrics.end_crawl(second)
+    totals = metrics.snapshot().totals
+
+    assert (first_stats.requests, first_stats.records, first_stats.retries) == (2, 50, 2)
+    assert (first_stats.errors, first_stats.throttled) == (1, 1)
+    assert first_stats.status_codes == {200: 1, 503: 1}
+    assert (first_stats.parse_seconds, first_stats.parsed_records) == (0.5, 50)
+    assert (second_stats.requests, second_stats.records, second_stats.not_modified) == (1, 10, 1)
+    assert (totals.requests, totals.records, totals.response_bytes, totals.wire_bytes) == (4, 65, 1000, 200)
+    assert metrics.end_crawl(first) is None
+
+
+def test_last_crawl_is_the_most_recently_started():
+    metrics = ConnectorMetrics()
+    assert metrics.snapshot().last_crawl is None
+
+    with metrics.track_crawl():
+        with metrics.track_crawl() as inner:
+            metrics.record_request(_request(inner))
+
+    assert metrics.snapshot().last_crawl.requests == 1
+    assert metrics.snapshot().last_crawl.wall_seconds > 0
+
+
+def test_callbacks_receive_requests_parses_and_crawls():
+    metrics = ConnectorMetrics()
+    seen = []
+    metrics.on_request(lambda m: seen.append(("request", m.records)))
+    metrics.on_parse(lambda seconds, records: seen.append(("parse", records)))
+    metrics.on_crawl(lambda stats: seen.append(("crawl", stats.requests)))
+
+    with metrics.track_crawl() as crawl_id:
+        metrics.record_request(_request(crawl_id, records=3))
+        metrics.record_parse(0.1, 3, crawl_id)
+
+    assert seen == [("request", 3), ("parse", 3), ("crawl", 1)]
+
+
+def test_prometheus_text_counters_and_histogram():
+    metrics = ConnectorMetrics()
+    metrics.record_request(_request(total=0.01, retries=1, records=7))
+    metrics.record_request(_request(total=0.3, status=429, throttled=1))
+    metrics.record_request(_request(total=60.0))  # Beyond the last bucket
+
+    text = metrics.prometheus_text(prefix="q")
+    samples = _samples(text)
+
+    assert "# TYPE q_requests_total counter" in text
+    assert "# TYPE q_request_duration_seconds histogram" in text
+    assert samples['q_requests_total{status="200"}'] == 2
+    assert samples['q_requests_total{status="429"}'] == 1
+    assert samples["q_retries_total"] == 1
+    assert samples["q_throttled_total"] == 1
+    assert samples["q_records_total"] == 7
+    assert samples['q_request_duration_seconds_bucket{le="0.05"}'] == 1
+    assert samples['q_request_duration_seconds_bucket{le="0.5"}'] == 2
+    assert samples[f'q_request_duration_seconds_bucket{{le="{LATENCY_BUCKETS[-1]}"}}'] == 2
+    assert samples['q_request_duration_seconds_bucket{le="+Inf"}'] == 3
+    assert samples["q_request_duration_seconds_count"] == 3
+    assert abs(samples["q_request_duration_seconds_sum"] - 60.31) < 1e-6
+
+
+def test_empty_metrics_export_zero_requests():
+    samples = _samples(ConnectorMetrics().prometheus_text())
+
+    assert samples["qualys_connector_requests_total"] == 0
+    assert samples['qualys_connector_request_duration_seconds_bucket{le="+Inf"}'] == 0
+
+
+def test_crawl_against_mock_server_is_counted():
+    with MockQualysServer(records=230, error_rate=0.2) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x",
+                                  max_retries=10, backoff_base=0.001, backoff_max=0.01)
+        connector = QualysAWSConnector(config)
+        connector.get_all_connectors(page_size=50)
+        errors = server.stats["errors"]
+
+    stats = connector.metrics.snapshot().last_crawl
+    samples = _samples(connector.metrics.prometheus_text())
+
+    assert stats.requests == 5
+    assert stats.records == stats.parsed_records == 230
+    assert stats.status_codes == {200: 5}
+    assert stats.retries == errors
+    assert 0 < stats.wire_bytes < stats.response_bytes  # gzip on the wire
+    assert samples['qualys_connector_requests_total{status="200"}'] == 5
+    assert samples["qualys_connector_records_total"] == 230
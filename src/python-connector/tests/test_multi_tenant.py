@@ -0,0 +1,99 @@
+"""Tests for multi-tenant crawls: one failing tenant must not affect the others."""
+
+import json
+import socket
+
+import pytest
+
+from auth_config import ConfigError, QualysAuthConfig
+from mock_qualys_server import MockQualysServer, make_record
+from multi_tenant import MultiTenantRunner, load_tenant_configs
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _config(base_url, **kwargs):
+    return QualysAuthConfig(base_url=base_url, username="x", password="x", max_retries=0, **kwargs)
+
+
+@pytest.mark.parametrize("mode", ["thread", "async", "process"])
+def test_failing_tenants_do_not_affect_the_others(mode):
+    if mode == "async":
+        pytest.importorskip("aiohttp")
+    with MockQualysServer(records=130) as small, MockQualysServer(records=420, shape="snake") as large, \
+            MockQualysServer(records=50, error_rate=1.0) as broken:
+        configs = {
+            "small": _config(small.base_url),
+            "unreachable": _config(_closed_port_url()),
+            "large": _config(large.base_url, max_workers=3),
+            "broken": _config(broken.base_url),
+            "adaptive": _config(small.base_url, adaptive_paging=True, page_size_store=""),
+        }
+        results = MultiTenantRunner(configs, max_workers=4, mode=mode).run(page_size=50)
+
+    assert list(results) == list(configs)
+    for name, records in (("small", 130), ("large", 420), ("adaptive", 130)):
+        result = results[name]
+        assert result.ok, result.error
+        assert [c.connector_id for c in result.connectors] == [
+            make_record(i)["connectorId"] for i in range(records)
+        ]
+    for name in ("unreachable", "broken"):
+        assert not results[name].ok
+        assert results[name].connectors == []
+    assert "ConnectionError" in results["unreachable"].error or "ClientConnector" in results["unreachable"].error
+
+
+def test_failure_after_some_pages_drops_the_partial_inventory():
+    with MockQualysServer(records=500) as server:
+        configs = {"flaky": _config(server.base_url), "steady": _config(server.base_url)}
+        runner = MultiTenantRunner(configs, max_workers=2)
+        server.error_rate = 0.3  # Fails some pages; no retries are allowed
+        results = runner.run(page_size=20)
+
+    assert any(not result.ok for result in results.values())
+    for result in results.values():
+        if not result.ok:
+            assert result.connectors == []
+        else:
+            assert len(result.connectors) == 500
+
+
+def _tenants_file(tmp_path, document):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps(document))
+    return str(path)
+
+
+def test_load_tenant_configs_applies_defaults_and_password_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("TENANT_B_PASSWORD", "from-env")
+    path = _tenants_file(tmp_path, {
+        "defaults": {"timeout": 60, "username": "api"},
+        "tenants": [
+            {"name": "a", "password": "p", "max_workers": 2},
+            {"name": "b", "password_env": "TENANT_B_PASSWORD", "timeout": 5},
+        ],
+    })
+
+    configs = load_tenant_configs(path)
+
+    assert list(configs) == ["a", "b"]
+    assert (configs["a"].timeout, configs["a"].max_workers) == (60, 2)
+    assert (configs["b"].timeout, configs["b"].password) == (5, "from-env")
+
+
+@pytest.mark.parametrize("document, message", [
+    ({"tenants": []}, "no tenants"),
+    ({"tenants": [{"username": "u", "password": "p"}]}, "needs a name"),
+    ({"tenants": [{"name": "a", "username": "u", "password": "p"}] * 2}, "duplicate"),
+    ({"tenants": [{"name": "a", "username": "u", "password": "p", "colour": "red"}]}, "unknown settings"),
+    ({"tenants": [{"name": "a", "username": "u"}]}, "tenant 'a'"),
+])
+def test_load_tenant_configs_rejects_bad_files(tmp_path, document, message):
+    with pytest.raises(ConfigError, match=message):
+        load_tenant_configs(_tenants_file(tmp_path, document))
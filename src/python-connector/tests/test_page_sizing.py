@@ -0,0 +1,97 @@
+"""Tests for adaptive paging against a server that caps pageSize."""
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer
+from page_sizing import PageSizeStore, PageSizeTuner, served_page_size
+
+
+def test_served_caps_the_ladder_and_rebases_offsets():
+    tuner = PageSizeTuner(initial=200, min_size=25, max_size=800, max_seconds=15)
+    assert tuner.next_request() == (0, 200, 0)
+
+    assert tuner.served(0, 200, 100) == 0
+    tuner.advance(100)
+
+    assert tuner.sizes == [25, 50, 100]
+    assert tuner.next_request() == (1, 100, 0)
+
+
+def test_served_page_past_offset_is_re_requested():
+    tuner = PageSizeTuner(initial=200, min_size=25, max_size=800, max_seconds=15)
+    tuner.advance(400)
+
+    # pageNo=2 at the capped size 100 starts at record 200, already delivered
+    assert tuner.served(2, 200, 100) == 200
+    # pageNo=5 at 100 starts at record 500, past the records delivered so far
+    assert tuner.served(5, 200, 100) is None
+
+
+def test_served_page_size_reads_envelope():
+    assert served_page_size({"pageable": {"pageSize": 100}}, 400) == 100
+    assert served_page_size({"size": 50}, 400) == 50
+    assert served_page_size({"last": False, "numberOfElements": 80}, 400) == 80
+    assert served_page_size({"last": True, "numberOfElements": 7}, 400) == 400
+
+
+@pytest.mark.parametrize("stream_decode", [False, True])
+@pytest.mark.parametrize("page_size", [50, 400])
+def test_adaptive_paging_with_capped_server_yields_each_record_once(stream_decode, page_size):
+    with MockQualysServer(records=3000, max_page_size=100, latency=0.005) as server:
+        config = QualysAuthConfig(
+            base_url=server.base_url, username="x", password="x",
+            adaptive_paging=True, page_size_store="", stream_decode=stream_decode
+        )
+        connector = QualysAWSConnector(config)
+        ids = [c.connector_id for c in connector.iter_connectors(page_size=page_size)]
+
+    assert len(ids) == 3000
+    assert len(set(ids)) == 3000
+
+
+def test_page_size_store_persists_per_tenant(tmp_path):
+    path = str(tmp_path / "page_sizes.db")
+    store = PageSizeStore(path)
+    store.set("a@https://one", 200)
+    store.set("b@https://one", 75)
+    store.set("a@https://one", 400)
+
+    reopened = PageSizeStore(path)
+    assert reopened.get("a@https://one") == 400
+    assert reopened.get("b@https://one") == 75
+    assert reopened.get("a@https://two") is None
+
+
+def _adaptive_crawl(server, path, username="x", adaptive=True):
+    config = QualysAuthConfig(base_url=server.base_url, username=username, password="x",
+                              adaptive_paging=adaptive, page_size_store=path)
+    connector = QualysAWSConnector(config)
+    sizes = []
+    connector.metrics.on_request(lambda m: sizes.append(m.page_size))
+    connector.get_all_connectors(page_size=50)
+    return connector, sizes
+
+
+def test_adaptive_crawl_resumes_from_the_stored_size(tmp_path):
+    path = str(tmp_path / "page_sizes.db")
+    with MockQualysServer(records=2000) as server:
+        first, first_sizes = _adaptive_crawl(server, path)
+        stored = PageSizeStore(path).get(first._tenant_key())
+        _, second_sizes = _adaptive_crawl(server, path)
+        _, other_sizes = _adaptive_crawl(server, path, username="other")
+
+    assert first_sizes[0] == 50
+    assert stored is not None and stored > 50
+    assert second_sizes[0] == stored
+    assert other_sizes[0] == 50  # Another tenant does not share the size
+
+
+def test_fixed_page_size_crawls_store_nothing(tmp_path):
+    path = str(tmp_path / "page_sizes.db")
+    with MockQualysServer(records=200) as server:
+        connector, sizes = _adaptive_crawl(server, path, adaptive=False)
+
+    assert set(sizes) == {50}
+    assert PageSizeStore(path).get(connector._tenant_key()) is None
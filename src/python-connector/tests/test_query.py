@@ -0,0 +1,34 @@
+"""Tests for connector queries (query.py) and filter pushdown."""
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer
+from query import compile_predicate
+
+
+def test_filter_pushdown_is_off_by_default():
+    assert QualysAuthConfig().filter_pushdown is False
+
+
+@pytest.mark.parametrize("shape", ["camel", "snake"])
+def test_pushdown_matches_client_side_filtering(shape):
+    with MockQualysServer(records=200, shape=shape) as server:
+        results = {}
+        for pushdown in (False, True):
+            config = QualysAuthConfig(base_url=server.base_url, username="x", password="x",
+                                      filter_pushdown=pushdown)
+            connectors = QualysAWSConnector(config).query(status="ERROR", is_disabled=False)
+            results[pushdown] = [c.connector_id for c in connectors]
+
+    assert results[True] == results[False]
+    assert results[True]
+
+
+def test_predicate_does_not_match_malformed_values():
+    matches = compile_predicate({"is_disabled": True, "qualys_tags": ["env:prod"]})
+
+    assert matches({"isDisabled": True, "qualysTags": ["env:prod"]})
+    assert not matches({"isDisabled": "maybe", "qualysTags": ["env:prod"]})
+    assert not matches({"isDisabled": True, "qualysTags": "env:prod"})
@@ -0,0 +1,88 @@
+"""Tests for the response cache and conditional page requests."""
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer
+from response_cache import ResponseCache
+
+_HEADERS = {"ETag": '"v1"'}
+
+
+def _connector(server, path):
+    return QualysAWSConnector(QualysAuthConfig(
+        base_url=server.base_url, username="x", password="x", response_cache=str(path)
+    ))
+
+
+def test_store_evicts_periodically_not_every_time(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_bytes=10_000)
+    passes = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: passes.append(1) or evict())
+
+    for i in range(ResponseCache.EVICT_EVERY * 2):
+        cache.store(f"page-{i}", _HEADERS, b"{}")
+
+    assert len(passes) == 2
+
+
+def test_store_evicts_as_soon_as_the_cap_may_be_exceeded(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_bytes=1000)
+
+    for i in range(5):
+        cache.store(f"page-{i}", _HEADERS, b"x" * 400)
+
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.lookup("page-4") is not None
+    assert cache.lookup("page-0") is None
+
+
+def test_second_crawl_is_served_from_304s(tmp_path):
+    with MockQualysServer(records=120) as server:
+        connector = _connector(server, tmp_path / "responses.db")
+        first = connector.get_all_connectors(page_size=50)
+        second = connector.get_all_connectors(page_size=50)
+        not_modified = server.stats["not_modified"]
+
+    assert [c.connector_id for c in first] == [c.connector_id for c in second]
+    assert not_modified == 3
+    assert connector.metrics.snapshot().last_crawl.not_modified == 3
+
+
+def test_304_without_a_cached_page_is_a_miss(tmp_path, monkeypatch):
+    with MockQualysServer(records=120) as server:
+        connector = _connector(server, tmp_path / "responses.db")
+        first = connector.get_all_connectors(page_size=50)
+        # Entries vanish between the lookup and the load (evicted meanwhile)
+        monkeypatch.setattr(connector.response_cache, "load", lambda entry: None)
+        requests_before = server.stats["requests"]
+        second = connector.get_all_connectors(page_size=50)
+        requests = server.stats["requests"] - requests_before
+
+    assert [c.connector_id for c in first] == [c.connector_id for c in second]
+    assert requests == 6  # Every 304 was followed by an unconditional request
+    assert connector.metrics.snapshot().last_crawl.not_modified == 0
+
+
+def test_unsolicited_304_is_requested_again(tmp_path, monkeypatch):
+    class _NotModified:
+        status_code = 304
+        headers = {}
+
+        def close(self):
+            pass
+
+    with MockQualysServer(records=10) as server:
+        connector = _connector(server, tmp_path / "responses.db")
+        get = connector.transport.get
+        calls = []
+
+        def get_once_304(url, **kwargs):
+            calls.append(kwargs.get("headers"))
+            return _NotModified() if len(calls) == 1 else get(url, **kwargs)
+
+        monkeypatch.setattr(connector.transport, "get", get_once_304)
+        connectors = connector.get_all_connectors(page_size=50)
+
+    assert len(connectors) == 10
+    assert calls == [None, None]
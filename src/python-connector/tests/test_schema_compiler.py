@@ -0,0 +1,55 @@
+"""Tests for the schema-compiled parsers (schema_compiler.py)."""
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer, make_record
+
+
+def _connector(**overrides):
+    return QualysAWSConnector(QualysAuthConfig(username="x", password="x", **overrides))
+
+
+def _malformed_record():
+    record = make_record(5)
+    record.update(totalAssets="n/a", isDisabled="maybe", qualysTags="env:prod",
+                  name=42, pollingFrequency={"hours": "four", "minutes": None})
+    return record
+
+
+def test_verify_compiled_parser_on_generated_samples():
+    assert _connector().verify_compiled_parser() == []
+
+
+@pytest.mark.parametrize("shape", ["camel", "snake"])
+def test_verify_compiled_parser_on_mock_server_records(shape):
+    with MockQualysServer(records=120, shape=shape) as server:
+        connector = _connector(base_url=server.base_url)
+        records = list(connector.iter_raw_connectors(page_size=50))
+
+    assert len(records) == 120
+    assert connector.verify_compiled_parser(records + [_malformed_record()]) == []
+
+
+def test_uncoercible_values_are_read_as_none():
+    parsed = _connector().parsers.connector(_malformed_record())
+
+    assert parsed.total_assets is None
+    assert parsed.is_disabled is None
+    assert parsed.qualys_tags is None
+    assert parsed.polling_frequency.hours is None
+    assert parsed.polling_frequency.minutes == 0
+    assert parsed.name == "42"
+
+
+def test_check_equivalence_reports_mismatches_and_errors():
+    from schema_compiler import check_equivalence
+
+    def failing(record):
+        raise ValueError("boom")
+
+    records = [make_record(1), make_record(2)]
+    assert check_equivalence(lambda r: r["name"], lambda r: r["name"], records) == []
+    assert len(check_equivalence(lambda r: r["name"], lambda r: r["name"].upper(), records)) == 2
+    assert len(check_equivalence(lambda r: r["name"], failing, records)) == 2
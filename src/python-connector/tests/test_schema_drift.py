@@ -0,0 +1,52 @@
+"""Tests for how schema_drift.py logs drift it has already reported."""
+
+import logging
+import os
+
+import pytest
+
+import schema_drift
+from connector import ConnectorParsing
+from mock_qualys_server import make_record
+from schema_drift import SchemaDriftDetector
+
+
+@pytest.fixture(autouse=True)
+def fresh_known_signatures(monkeypatch):
+    monkeypatch.setattr(schema_drift, "_known_signatures", set())
+
+
+def _drift_logs(caplog, level):
+    return [r for r in caplog.records if r.name == "schema_drift" and r.levelno == level]
+
+
+def test_second_detector_logs_known_shape_at_info(caplog):
+    caplog.set_level(logging.INFO, logger="schema_drift")
+    records = [make_record(i) for i in range(3)]
+
+    SchemaDriftDetector(ConnectorParsing.SCHEMA_PATH).check_records(records)
+    assert len(_drift_logs(caplog, logging.WARNING)) == 1
+
+    caplog.clear()
+    SchemaDriftDetector(ConnectorParsing.SCHEMA_PATH).check_records(records)
+    assert not _drift_logs(caplog, logging.WARNING)
+    assert len(_drift_logs(caplog, logging.INFO)) == 1
+
+
+def test_state_file_remembers_drift_across_runs(tmp_path, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger="schema_drift")
+    state = os.path.join(tmp_path, "drift.json")
+    records = [make_record(1)]
+
+    SchemaDriftDetector(ConnectorParsing.SCHEMA_PATH, state).check_records(records)
+    assert os.path.exists(state)
+
+    # A new process starts with nothing known but the state file
+    monkeypatch.setattr(schema_drift, "_known_signatures", set())
+    caplog.clear()
+    SchemaDriftDetector(ConnectorParsing.SCHEMA_PATH, state).check_records(records)
+    assert not _drift_logs(caplog, logging.WARNING)
+
+    changed = dict(make_record(1), regionCode=None)
+    SchemaDriftDetector(ConnectorParsing.SCHEMA_PATH, state).check_records([changed])
+    assert len(_drift_logs(caplog, logging.WARNING)) == 1
@@ -0,0 +1,108 @@
+"""Tests for the retry policy shared by Transport and the asyncio connector."""
+
+import asyncio
+
+import pytest
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer
+from metrics import RequestMetrics, set_current_request
+from transport import RetryPolicy, TokenBucket, _TimedConnectionMixin
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_retry_status_prefers_server_wait():
+    policy = RetryPolicy(max_retries=2, backoff_base=0.5, backoff_max=30)
+
+    assert policy.retry_status("url", 503, 0, wait=3.0) == 3.0
+    assert 0 <= policy.retry_status("url", 500, 1, wait=None) <= 1.0
+    assert policy.retry_status("url", 404, 0, wait=None) is None
+    assert policy.retry_status("url", 503, 2, wait=None) is None
+
+
+def test_throttle_pauses_bucket_and_counts():
+    policy = RetryPolicy(max_retries=2, backoff_base=0.5, backoff_max=30)
+    bucket = TokenBucket(0)
+
+    assert policy.throttle(_Response({"Retry-After": "5"}), 429, bucket) == 5.0
+    assert bucket.try_acquire() > 4
+
+
+def test_throttle_caps_server_wait_at_backoff_max():
+    policy = RetryPolicy(max_retries=2, backoff_base=0.5, backoff_max=30)
+    bucket = TokenBucket(0)
+
+    assert policy.throttle(_Response({"Retry-After": "86400"}), 503, bucket) == 30
+    assert policy.throttle(
+        _Response({"X-RateLimit-Remaining": "0", "X-RateLimit-ToWait-Sec": "3600"}), 200, bucket
+    ) == 30
+    assert 29 < bucket.try_acquire() <= 30
+
+
+def test_dns_timing_falls_back_without_urllib3_internals():
+    class _Connection:
+        # A urllib3 connection that no longer has _dns_host
+        port = 443
+
+        def _new_conn(self):
+            return "socket"
+
+    class _Timed(_TimedConnectionMixin, _Connection):
+        pass
+
+    metrics = RequestMetrics(page=0, page_size=1)
+    set_current_request(metrics)
+    try:
+        assert _Timed()._new_conn() == "socket"
+    finally:
+        set_current_request(None)
+    assert metrics.dns == 0
+
+
+def _config(server, **kwargs):
+    return QualysAuthConfig(base_url=server.base_url, username="x", password="x",
+                            max_retries=10, backoff_base=0.001, backoff_max=0.01, **kwargs)
+
+
+def test_blocking_connector_retries_injected_errors():
+    with MockQualysServer(records=300, error_rate=0.3) as server:
+        connectors = QualysAWSConnector(_config(server)).get_all_connectors(page_size=50)
+        errors = server.stats["errors"]
+
+    assert len(connectors) == 300
+    assert errors > 0
+
+
+@pytest.mark.parametrize("stream_decode", [False, True])
+def test_blocking_connector_retries_truncated_bodies(stream_decode):
+    with MockQualysServer(records=300, truncate_rate=0.3) as server:
+        connector = QualysAWSConnector(_config(server, stream_decode=stream_decode))
+        fetched = connector.get_all_connectors(page_size=50)
+        streamed = list(connector.iter_connectors(page_size=50))
+        truncated = server.stats["truncated"]
+
+    assert [c.connector_id for c in fetched] == [c.connector_id for c in streamed]
+    assert len({c.connector_id for c in fetched}) == 300
+    assert truncated > 0
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_async_connector_retries_injected_errors(concurrent):
+    pytest.importorskip("aiohttp")
+    from async_connector import AsyncQualysAWSConnector
+
+    async def crawl(server):
+        async with AsyncQualysAWSConnector(_config(server)) as connector:
+            return await connector.get_all_connectors(page_size=50, concurrent=concurrent)
+
+    with MockQualysServer(records=300, error_rate=0.3) as server:
+        connectors = asyncio.run(crawl(server))
+        errors = server.stats["errors"]
+
+    assert len(connectors) == 300
+    assert errors > 0
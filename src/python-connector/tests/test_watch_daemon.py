@@ -0,0 +1,90 @@
+"""Tests for WatchDaemon surviving API errors."""
+
+import asyncio
+
+import requests
+
+from auth_config import QualysAuthConfig
+from connector import QualysAWSConnector
+from mock_qualys_server import MockQualysServer
+from watch_daemon import WatchDaemon
+
+
+def _fail_first_call(connector, name):
+    method = getattr(connector, name)
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise requests.ConnectionError("connection reset")
+        return method(*args, **kwargs)
+
+    setattr(connector, name, flaky)
+    return calls
+
+
+def _run_until(daemon, condition, timeout=10.0):
+    async def main():
+        task = asyncio.create_task(daemon.run())
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition() and asyncio.get_running_loop().time() < deadline and not task.done():
+            await asyncio.sleep(0.01)
+        daemon.stop()
+        await task
+
+    asyncio.run(main())
+
+
+def test_daemon_retries_failed_syncs_and_refreshes():
+    with MockQualysServer(records=30) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x")
+        connector = QualysAWSConnector(config)
+        full_syncs = _fail_first_call(connector, "get_all_connectors")
+        refreshes = _fail_first_call(connector, "fetch_connectors")
+        # Mock connectors are overdue, so they come due after retry_delay
+        daemon = WatchDaemon(connector, on_event=lambda event: None, page_size=10,
+                             settle=0.0, retry_delay=0.05, batch_window=0.0, full_sync_interval=3600)
+
+        _run_until(daemon, lambda: daemon.stats["refreshed"] > 0)
+
+    assert len(full_syncs) == 2
+    assert len(refreshes) > 1
+    assert daemon.stats["errors"] == 2
+    assert daemon.stats["refreshed"] > 0
+    # Every enabled connector is still scheduled after the failed refresh
+    assert set(daemon._due) == {cid for cid, c in daemon.known.items() if not c.is_disabled}
+
+
+def _daemon(connector, **overrides):
+    options = dict(page_size=10, settle=0.0, retry_delay=0.05, batch_window=0.0, full_sync_interval=3600)
+    options.update(overrides)
+    return WatchDaemon(connector, on_event=lambda event: None, **options)
+
+
+def test_malformed_records_are_skipped_not_fatal():
+    with MockQualysServer(records=30) as server:
+        server.update_record(1, pollingFrequency={"hours": "four", "minutes": 0})
+        server.update_record(2, totalAssets="n/a")
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x")
+        daemon = _daemon(QualysAWSConnector(config))
+
+        _run_until(daemon, lambda: daemon.stats["refreshed"] > 0)
+
+    assert daemon.stats["errors"] == 0
+    assert daemon.stats["refreshed"] > 0
+    bad_id = "00000000-0000-4000-8000-000000000001"
+    assert bad_id not in daemon.known
+    assert "00000000-0000-4000-8000-000000000003" in daemon.known
+
+
+def test_refresh_uses_the_served_page_size():
+    with MockQualysServer(records=60, max_page_size=10) as server:
+        config = QualysAuthConfig(base_url=server.base_url, username="x", password="x")
+        daemon = _daemon(QualysAWSConnector(config), page_size=25)
+
+        _run_until(daemon, lambda: daemon.stats["refreshed"] >= 60 and daemon.page_size == 10)
+
+    assert daemon.page_size == 10
+    for cid, position in daemon.positions.items():
+        assert position == int(cid.rsplit("-", 1)[1])
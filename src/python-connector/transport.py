@@ -0,0 +1,422 @@
+"""
+HTTP transport for the Qualys API: pooled session, retries and rate limiting.
+
+- Transient failures (connection errors, timeouts, HTTP 429/5xx) are retried
+  with jittered exponential backoff. The policy (RetryPolicy) is shared with
+  the asyncio connector, which runs its own non-blocking loop around it.
+  A connection dropped while the body is read is retried the same way.
+- Retry-After and Qualys rate-limit headers (X-RateLimit-Remaining,
+  X-RateLimit-ToWait-Sec) pause all threads sharing the transport, for at
+  most backoff_max seconds.
+- A client-side token bucket caps the request rate across threads.
+- When a RequestMetrics is passed to Transport.get, DNS, connect, TTFB and
+  download timings are filled in (see metrics.py). DNS timing relies on
+  urllib3 internals; without them DNS is counted as connect time.
+"""
+
+import email.utils
+import logging
+import random
+import socket
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from auth_config import QualysAuthConfig
+from metrics import RequestMetrics, current_request, set_current_request
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Network-level failures worth another attempt, including a body cut off part-way
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# Only codings the standard library can decode (no br/zstd negotiation)
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting requests per second.
+
+    A rate of 0 disables limiting. pause() blocks every caller until a
+    deadline, which is how server-side rate-limit signals are shared.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate: Tokens added per second (0 disables limiting)
+            capacity: Maximum burst size. Defaults to max(1, rate).
+            clock: Monotonic time source
+            sleep: Sleep function (overridable for testing)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Block all acquirers for the given number of seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if one is available, without blocking.
+
+        Returns:
+            0 if a token was taken, else the seconds to wait before trying
+            again (how asyncio callers sleep without blocking the loop)
+        """
+        with self._lock:
+            now = self._clock()
+            wait = self._paused_until - now
+            if wait > 0:
+                return wait
+            if not self.rate:
+                return 0.0
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def server_wait(response: Any) -> Optional[float]:
+    """
+    Return how long the server asked us to wait, if at all.
+
+    Honours Retry-After and the Qualys X-RateLimit-* headers. Works with any
+    response exposing a headers mapping (requests or aiohttp).
+    """
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(0.0, float(response.headers.get("X-RateLimit-ToWait-Sec", "")))
+        except ValueError:
+            return None
+    return None
+
+
+class RetryPolicy:
+    """
+    Which failures are retried and how long to wait before each retry.
+
+    The caller runs the loop and does the sleeping, so the blocking Transport
+    and the asyncio connector share one policy.
+    """
+
+    def __init__(self, max_retries: int, backoff_base: float, backoff_max: float):
+        """
+        Args:
+            max_retries: Attempts after the first
+            backoff_base: Backoff bound of the first retry (seconds), doubled per retry
+            backoff_max: Upper bound of any backoff (seconds)
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @classmethod
+    def from_config(cls, config: QualysAuthConfig) -> "RetryPolicy":
+        return cls(config.max_retries, config.backoff_base, config.backoff_max)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def throttle(
+        self,
+        response: Any,
+        status: int,
+        bucket: TokenBucket,
+        metrics: Optional[RequestMetrics] = None
+    ) -> Optional[float]:
+        """
+        Apply a server-requested wait to the shared token bucket.
+
+        Waits longer than backoff_max are capped, so a bogus or hostile
+        Retry-After cannot stall the crawl.
+
+        Returns:
+            The wait in seconds (see server_wait), or None
+        """
+        wait = server_wait(response)
+        if wait is not None and wait > self.backoff_max:
+            logger.warning(f"Server asked to wait {wait:.0f}s; waiting backoff_max ({self.backoff_max:.0f}s)")
+            wait = self.backoff_max
+        if wait is not None:
+            # Throttle every request sharing the bucket, not just this one
+            bucket.pause(wait)
+        if metrics is not None and (wait is not None or status == 429):
+            metrics.throttled += 1
+        return wait
+
+    def retry_status(self, url: str, status: int, attempt: int, wait: Optional[float]) -> Optional[float]:
+        """
+        Decide whether a response status is retried.
+
+        Returns:
+            Seconds to wait before the retry (the server's wait if it gave
+            one), or None if the response is final
+        """
+        if status not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+            return None
+        delay = wait if wait is not None else self.backoff(attempt)
+        logger.warning(f"HTTP {status} from {url}; retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    def retry_error(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Decide whether a network-level failure is retried.
+
+        Returns:
+            Seconds to wait before the retry, or None if retries are exhausted
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt)
+        logger.warning(
+            f"Request failed ({type(error).__name__}: {error}); "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+
+class _TimedConnectionMixin:
+    """
+    Records DNS and connect (TCP + TLS) time into the current RequestMetrics.
+
+    DNS is resolved here so it can be timed on its own; each resolved address
+    is then tried in turn, as urllib3 would. This overrides urllib3 internals
+    (_new_conn and the _dns_host it connects to); if a urllib3 release drops
+    _dns_host, connections are left to urllib3 and DNS counts as connect time.
+    """
+
+    def connect(self) -> None:
+        metrics = current_request()
+        if metrics is None:
+            return super().connect()
+        dns_before = metrics.dns
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            metrics.connect += time.perf_counter() - start - (metrics.dns - dns_before)
+
+    def _new_conn(self) -> socket.socket:
+        metrics = current_request()
+        host = getattr(self, "_dns_host", None)
+        if metrics is None or not isinstance(host, str):
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            return super()._new_conn()  # Let urllib3 raise its own resolution error
+        finally:
+            metrics.dns += time.perf_counter() - start
+
+        last_error: Optional[Exception] = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except NewConnectionError as e:
+                    last_error = e
+        finally:
+            self._dns_host = host
+        raise last_error
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report DNS/connect timings."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def build_session(config: QualysAuthConfig) -> requests.Session:
+    """Create an authenticated session with a pool sized from config."""
+    session = requests.Session()
+    session.auth = config.get_auth_tuple()
+    session.verify = config.verify_ssl
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if not config.keep_alive:
+        session.headers["Connection"] = "close"
+    # Retries are handled by Transport, not urllib3
+    adapter = InstrumentedHTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=max(config.pool_maxsize, config.max_workers),
+        max_retries=0
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class Transport:
+    """
+    Retrying, rate-limited GET on top of a shared requests.Session.
+
+    One Transport is shared by every thread of a QualysAWSConnector, so the
+    token bucket and any server-requested pause apply to the whole crawl.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        config: QualysAuthConfig,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.session = session
+        self.retry = RetryPolicy.from_config(config)
+        self._sleep = sleep
+        self.bucket = TokenBucket(config.rate_limit, config.rate_burst or None, sleep=sleep)
+
+    def get(self, url: str, metrics: Optional[RequestMetrics] = None, **kwargs: Any) -> requests.Response:
+        """
+        Send a GET request, retrying transient failures.
+
+        Args:
+            url: Request URL
+            metrics: Optional RequestMetrics to fill in with status, retries,
+                throttled attempts, timings and response size
+            **kwargs: Passed to requests.Session.get
+
+        Returns:
+            The final response. A retryable status that persists after
+            max_retries is returned as-is for the caller to raise_for_status().
+
+        Raises:
+            requests.RequestException: If the last attempt fails at the network level
+        """
+        # Without stream=True the body is read here, inside the retried section
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                response = self._send(url, metrics, kwargs)
+            except RETRYABLE_ERRORS as e:
+                delay = self.retry.retry_error(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                wait = self.retry.throttle(response, response.status_code, self.bucket, metrics)
+                delay = self.retry.retry_status(url, response.status_code, attempt, wait)
+                if delay is None:
+                    return response
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+            if metrics is not None:
+                metrics.retries = attempt
+
+    def retry_read(self, error: BaseException, attempt: int) -> bool:
+        """
+        Wait before re-requesting a streamed body that failed part-way.
+
+        Streamed bodies are read after get() returns, so their callers retry
+        the request themselves, under the same policy.
+
+        Returns:
+            False if the error is not retryable or retries are exhausted
+        """
+        if not isinstance(error, RETRYABLE_ERRORS):
+            return False
+        delay = self.retry.retry_error(error, attempt)
+        if delay is None:
+            return False
+        self._sleep(delay)
+        return True
+
+    def _send(self, url: str, metrics: Optional[RequestMetrics], kwargs: dict) -> requests.Response:
+        """Send one attempt, timing it into metrics when given."""
+        if metrics is None:
+            return self.session.get(url, **kwargs)
+
+        stream = kwargs.get("stream", False)
+        set_current_request(metrics)
+        start = time.perf_counter()
+        try:
+            # Stream so headers arrive (TTFB) before the body is read
+            response = self.session.get(url, **dict(kwargs, stream=True))
+            metrics.ttfb = time.perf_counter() - start
+            metrics.status = response.status_code
+            if not stream:
+                metrics.response_bytes = len(response.content)
+                metrics.wire_bytes = response.raw.tell()  # Before decompression
+                metrics.total = time.perf_counter() - start
+        finally:
+            set_current_request(None)
+        return response
+
+    def close(self) -> None:
+        """Close the underlying session and its pooled connections."""
+        self.session.close()
+
@@ -0,0 +1,355 @@
+"""
+Due-time watch daemon for Qualys AWS connectors.
+
+Instead of re-crawling the whole inventory on a fixed interval, WatchDaemon
+keeps a heap of (due time, connector ID) built from each connector's
+nextSyncedOn (or lastSyncedOn + pollingFrequency) and sleeps until the
+earliest one. Connectors coming due within batch_window of each other are
+refreshed together, and only the pages that held them in the last crawl are
+requested: due connectors sharing a page cost one request. Each refreshed
+record is diffed against its previous copy to emit ChangeEvents:
+
+- state_changed:  state moved (e.g. QUEUED -> SUCCESS)
+- error:          a new non-empty error value
+- assets_changed: totalAssets changed (delta = new - old)
+- synced:         lastSyncedOn advanced
+- added/removed:  connector appeared or disappeared
+
+A connector still not synced after its due time (sync running late) is
+retried with exponential backoff, capped at its polling interval. Disabled
+connectors are not scheduled. A full crawl at start-up and every
+full_sync_interval seconds picks up added and removed connectors and
+re-learns page positions. A round failing with a request error or an
+unparseable response is logged and retried with the same backoff: a failed
+full crawl is re-run, and the connectors a failed refresh popped are
+rescheduled. A record whose fields cannot be diffed or scheduled (e.g. a
+malformed pollingFrequency) is logged and skipped until the next crawl.
+Refreshes use the page size the server actually served, so a platform that
+caps pageSize does not shift every page position.
+"""
+
+import asyncio
+import heapq
+import inspect
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+
+from connector import AWSConnector, ConnectorResponse, PollingFrequency, QualysAWSConnector
+from page_sizing import served_page_size
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """
+    Parse a Qualys timestamp (e.g. 2024-01-01T04:00:00.000+0000) to epoch seconds.
+
+    Returns:
+        Seconds since the epoch, or None if the value is empty or malformed
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return None  # Ambiguous: not scheduled on a guessed timezone
+    return parsed.timestamp()
+
+
+def polling_interval(frequency: PollingFrequency) -> float:
+    """Return a polling frequency in seconds."""
+    return frequency.hours * 3600.0 + frequency.minutes * 60.0 + frequency.seconds
+
+
+@dataclass
+class ChangeEvent:
+    """One observed change of a connector."""
+    kind: str  # added, removed, state_changed, error, assets_changed or synced
+    connector_id: str
+    name: str = ""
+    old: Any = None
+    new: Any = None
+    delta: int = 0  # new - old for assets_changed
+    at: float = 0.0  # Epoch seconds when the change was observed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def diff_connectors(old: AWSConnector, new: AWSConnector, at: float) -> List[ChangeEvent]:
+    """Return the change events between two copies of the same connector."""
+    events = []
+    if new.status != old.status:
+        events.append(ChangeEvent("state_changed", new.connector_id, new.name, old.status, new.status, at=at))
+    if new.error and new.error != old.error:
+        events.append(ChangeEvent("error", new.connector_id, new.name, old.error, new.error, at=at))
+    if new.total_assets != old.total_assets:
+        events.append(ChangeEvent("assets_changed", new.connector_id, new.name, old.total_assets,
+                                  new.total_assets, delta=new.total_assets - old.total_assets, at=at))
+    if new.last_synced_on != old.last_synced_on:
+        events.append(ChangeEvent("synced", new.connector_id, new.name, old.last_synced_on,
+                                  new.last_synced_on, at=at))
+    return events
+
+
+def _served_size(response: ConnectorResponse, requested: int) -> int:
+    """served_page_size() for a parsed page."""
+    pagination = response.pagination
+    return served_page_size({
+        "pageable": {"pageSize": pagination.page_size},
+        "last": response.is_last,
+        "numberOfElements": pagination.number_of_elements,
+    }, requested)
+
+
+class WatchDaemon:
+    """
+    Asyncio scheduler that refreshes connectors when their syncs are due.
+
+    Example:
+        daemon = WatchDaemon(QualysAWSConnector(), on_event=lambda e: print(e.to_dict()))
+        asyncio.run(daemon.run())  # until daemon.stop()
+    """
+
+    def __init__(
+        self,
+        connector: QualysAWSConnector,
+        on_event: Callable[[ChangeEvent], Any],
+        page_size: int = 200,
+        settle: float = 30.0,
+        retry_delay: float = 60.0,
+        batch_window: float = 5.0,
+        full_sync_interval: float = 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            connector: Connector used for the API calls (run on worker threads)
+            on_event: Called with every ChangeEvent (may be a coroutine function)
+            page_size: Page size of full crawls and targeted page refreshes
+            settle: Seconds after nextSyncedOn before a connector is refreshed,
+                giving the sync time to finish
+            retry_delay: First retry delay for connectors found not yet synced
+                and for rounds that failed with an API error
+            batch_window: Connectors due within this many seconds of the
+                earliest one are refreshed in the same round
+            full_sync_interval: Seconds between full crawls
+            clock: Time source (seconds since the epoch)
+        """
+        self.connector = connector
+        self.on_event = on_event
+        self.page_size = page_size
+        self.settle = settle
+        self.retry_delay = retry_delay
+        self.batch_window = batch_window
+        self.full_sync_interval = full_sync_interval
+        self._clock = clock
+        self.known: Dict[str, AWSConnector] = {}
+        self.positions: Dict[str, int] = {}  # connector ID -> index in the inventory order
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}  # Current due time per ID (older heap entries are stale)
+        self._attempts: Dict[str, int] = {}
+        self._last_full_sync = 0.0
+        self._next_full_sync = 0.0
+        self._failures = 0  # Consecutive failed rounds
+        self._stopping: Optional[asyncio.Event] = None
+        self.stats = {"full_syncs": 0, "page_requests": 0, "refreshed": 0, "events": 0, "errors": 0}
+
+    def stop(self) -> None:
+        """Ask run() to return after the current round."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self) -> None:
+        """
+        Crawl once, then refresh connectors as they come due until stop() is called.
+
+        Request errors and unparseable responses do not stop the daemon: the
+        failed round is retried after a backoff.
+        """
+        self._stopping = asyncio.Event()
+        self._next_full_sync = self._clock()
+        while not self._stopping.is_set():
+            next_full = self._next_full_sync
+            wake = min(self._heap[0][0], next_full) if self._heap else next_full
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(0.0, wake - self._clock()))
+                break
+            except asyncio.TimeoutError:
+                pass
+            now = self._clock()
+            due: List[str] = []
+            try:
+                if now >= next_full:
+                    await self.full_sync(initial=not self.stats["full_syncs"])
+                    continue
+                due = self._pop_due(now + self.batch_window)
+                if due:
+                    await self.refresh(due)
+            except (requests.RequestException, ValueError) as e:
+                self._retry_later(e, due)
+                continue
+            self._failures = 0
+
+    async def full_sync(self, initial: bool = False) -> None:
+        """Crawl the whole inventory, emit added/removed/changed events and reschedule everything."""
+        connectors = await asyncio.to_thread(
+            self.connector.get_all_connectors, page_size=self.page_size, concurrent=True
+        )
+        now = self._clock()
+        self.stats["full_syncs"] += 1
+        self._last_full_sync = now
+        self._next_full_sync = now + self.full_sync_interval
+        self._failures = 0
+        seen = set()
+        events: List[ChangeEvent] = []
+        for index, connector in enumerate(connectors):
+            seen.add(connector.connector_id)
+            self.positions[connector.connector_id] = index
+            events.extend(self._update_record(connector, now, announce=not initial))
+        for connector_id in [cid for cid in self.known if cid not in seen]:
+            old = self.known.pop(connector_id)
+            self.positions.pop(connector_id, None)
+            self._due.pop(connector_id, None)
+            self._attempts.pop(connector_id, None)
+            events.append(ChangeEvent("removed", connector_id, old.name, at=now))
+        logger.info(f"Watch: full sync of {len(connectors)} connectors, {len(self._due)} scheduled")
+        await self._emit(events)
+
+    async def refresh(self, connector_ids: Iterable[str]) -> None:
+        """
+        Re-fetch the pages holding the given connectors and emit their changes.
+
+        Connectors that moved off their page (inventory shifted) trigger a
+        full sync.
+        """
+        wanted = set(connector_ids)
+        pages = sorted({self.positions[cid] // self.page_size for cid in wanted if cid in self.positions})
+        semaphore = asyncio.Semaphore(self.connector.config.max_workers)
+
+        async def fetch(page: int) -> Tuple[int, ConnectorResponse]:
+            async with semaphore:
+                response = await asyncio.to_thread(
+                    self.connector.fetch_connectors, page=page, page_size=self.page_size
+                )
+            return page, response
+
+        results = await asyncio.gather(*[fetch(page) for page in pages])
+        now = self._clock()
+        self.stats["page_requests"] += len(pages)
+        events: List[ChangeEvent] = []
+        found: Set[str] = set()
+        requested = self.page_size
+        for page, response in results:
+            served = _served_size(response, requested)
+            if served < self.page_size:
+                logger.info(f"Watch: server capped pageSize at {served}; refreshing with that size")
+                self.page_size = served
+            for offset, connector in enumerate(response.connectors):
+                found.add(connector.connector_id)
+                self.positions[connector.connector_id] = page * served + offset
+                events.extend(self._update_record(connector, now, announce=True))
+        self.stats["refreshed"] += len(found)
+        logger.info(f"Watch: {len(wanted)} due connectors refreshed with {len(pages)} page requests")
+        await self._emit(events)
+        if wanted - found:
+            logger.info(f"Watch: {len(wanted - found)} connectors moved or disappeared; running a full sync")
+            await self.full_sync()
+
+    def _retry_later(self, error: Exception, connector_ids: List[str]) -> None:
+        """
+        Log a failed round and retry it after an exponential backoff.
+
+        With connector_ids (a failed refresh) those not rescheduled since
+        they were popped are pushed back; otherwise the full sync is retried.
+        """
+        self._failures += 1
+        self.stats["errors"] += 1
+        delay = min(self.retry_delay * 2 ** (self._failures - 1), self.full_sync_interval)
+        retry_at = self._clock() + delay
+        if connector_ids:
+            for connector_id in connector_ids:
+                if connector_id in self.known and connector_id not in self._due:
+                    self._due[connector_id] = retry_at
+                    heapq.heappush(self._heap, (retry_at, connector_id))
+            logger.warning(f"Watch: refresh of {len(connector_ids)} connectors failed ({error}); "
+                           f"retrying in {delay:.1f}s")
+        else:
+            self._next_full_sync = retry_at
+            logger.warning(f"Watch: full sync failed ({error}); retrying in {delay:.1f}s")
+
+    def _update_record(self, connector: AWSConnector, now: float, announce: bool) -> List[ChangeEvent]:
+        """_update(), logging and skipping a connector whose fields cannot be diffed or scheduled."""
+        try:
+            return self._update(connector, now, announce)
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Watch: skipping connector {connector.connector_id!r} ({type(e).__name__}: {e})")
+            return []
+
+    def _update(self, connector: AWSConnector, now: float, announce: bool) -> List[ChangeEvent]:
+        """Store a fresh copy of a connector, reschedule it and return its events."""
+        old = self.known.get(connector.connector_id)
+        if old is None:
+            events = [ChangeEvent("added", connector.connector_id, connector.name, at=now)] if announce else []
+        else:
+            events = diff_connectors(old, connector, now)
+        synced = old is None or connector.last_synced_on != old.last_synced_on
+        self._schedule(connector, now, synced)
+        self.known[connector.connector_id] = connector
+        return events
+
+    def _schedule(self, connector: AWSConnector, now: float, synced: bool) -> None:
+        connector_id = connector.connector_id
+        if connector.is_disabled:
+            self._due.pop(connector_id, None)  # Disabled connectors do not sync
+            return
+        interval = polling_interval(connector.polling_frequency)
+        next_sync = parse_timestamp(connector.next_synced_on)
+        if next_sync is None:
+            last_sync = parse_timestamp(connector.last_synced_on)
+            if last_sync is not None and interval:
+                next_sync = last_sync + interval
+        if synced:
+            self._attempts.pop(connector_id, None)
+
+        if next_sync is not None and next_sync + self.settle > now:
+            due = next_sync + self.settle
+        else:
+            # Sync overdue or unknown: back off until it shows up
+            attempts = self._attempts[connector_id] = self._attempts.get(connector_id, 0) + 1
+            cap = interval or self.full_sync_interval
+            due = now + min(self.retry_delay * 2 ** (attempts - 1), cap)
+        if self._due.get(connector_id) != due:
+            self._due[connector_id] = due
+            heapq.heappush(self._heap, (due, connector_id))
+            if len(self._heap) > 2 * len(self._due) + 1024:
+                # Mostly stale entries: rebuild from the current due times
+                self._heap = [(when, cid) for cid, when in self._due.items()]
+                heapq.heapify(self._heap)
+
+    def _pop_due(self, until: float) -> List[str]:
+        """Pop every connector due at or before `until`, skipping stale heap entries."""
+        due = []
+        while self._heap and self._heap[0][0] <= until:
+            when, connector_id = heapq.heappop(self._heap)
+            if self._due.get(connector_id) == when:
+                del self._due[connector_id]
+                due.append(connector_id)
+        return due
+
+    async def _emit(self, events: List[ChangeEvent]) -> None:
+        for event in events:
+            self.stats["events"] += 1
+            result = self.on_event(event)
+            if inspect.isawaitable(result):
+                await result